@@ -0,0 +1,3 @@
+"""
+CareerJet job listing scraper and importer.
+"""
@@ -1,10 +1,12 @@
 import os
+import sys
 import json
 import time
 import random
 import logging
+import argparse
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from urllib.parse import urljoin, urlencode
 
 import requests
@@ -12,86 +14,126 @@ from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from tqdm import tqdm
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("logs/careerjet_scraper.log"),
-        logging.StreamHandler(),
-    ],
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.utils.metrics import (
+    FETCH_SECONDS,
+    ITEMS_TOTAL,
+    METRICS_DIR,
+    PARSE_SECONDS,
+    REGISTRY,
+    RESPONSE_BYTES,
+    RETRIES_TOTAL,
 )
+from src.utils.http_cache import HttpCache
+from src.utils.log_setup import ItemLogSampler, setup_logging
+from src.utils.normalize import normalize_text
+from src.utils.parse_pool import ParsePool
+from src.utils.profiling import enable as enable_profiling, enable_from_env, profile_stage
+from src.utils.throttle import AdaptiveThrottle, host_of
+
 logger = logging.getLogger(__name__)
 
 
+def parse_job_listing(html_content: str) -> Tuple[List[Dict], List[str]]:
+    """Parse job listings from CareerJet's page using BeautifulSoup.
+
+    Runs in a parse worker process, so problems with individual job cards
+    are returned alongside the jobs for the scraper to log.
+    """
+    jobs = []
+    errors = []
+    soup = BeautifulSoup(html_content, "html.parser")
+    # The job cards are likely under ul > li > article
+    job_cards = soup.select("ul li article")
+
+    for card in job_cards:  # No limit on the number of jobs
+        try:
+            # Title is in the first <p> inside <article>
+            title_elem = card.find("p")
+            title = normalize_text(title_elem.text.strip()) if title_elem else None
+
+            # Location is in the second <ul> inside <article>
+            location_elem = card.find("ul", class_="location")
+            location = (
+                normalize_text(location_elem.find("li").text.strip())
+                if location_elem
+                else None
+            )
+
+            # Salary is in the third <ul> inside <article>
+            salary_elem = card.find("ul", class_="salary")
+            salary = (
+                normalize_text(salary_elem.find("li").text.strip())
+                if salary_elem
+                else None
+            )
+
+            # Description is in the <div> inside <article>
+            description_elem = card.find("div")
+            description = (
+                normalize_text(description_elem.text.strip())
+                if description_elem
+                else None
+            )
+
+            # Posted date is in the <footer> inside <article>
+            date_elem = card.find("footer").find("ul").find("li").find("span")
+            posted_date = date_elem.text.strip() if date_elem else None
+
+            # Link to job details
+            link_elem = card.find("a", href=True)
+            job_url = link_elem["href"] if link_elem else None
+
+            job = {
+                "title": title,
+                "location": location,
+                "url": job_url,
+                "description": description,
+                "salary": salary,
+                "posted_date": posted_date,
+                "source": "CareerJet",
+                "scraped_at": datetime.utcnow().isoformat(),
+            }
+            jobs.append(job)
+
+        except Exception as e:
+            errors.append(f"Error parsing job card: {e}")
+            continue
+
+    return jobs, errors
+
+
 class CareerJetScraper:
-    def __init__(self):
+    def __init__(
+        self,
+        http_cache: Optional[HttpCache] = None,
+        parse_workers: Optional[int] = None,
+    ):
         self.setup_directories()
         self.base_url = "https://www.careerjet.com.au/jobs?l=Australia&nw=1&s="
         self.max_retries = 3
-        self.retry_delay = 5
+        # Starts at the old two seconds between pages, then speeds up while
+        # the site keeps up and backs off on errors, 429/503 and Retry-After
+        self.throttle = AdaptiveThrottle(initial_delay=2.0, name="careerjet")
+        # One line per job made the log huge, so only a sample is logged
+        self.job_log = ItemLogSampler(logger, "CareerJet jobs")
+        self.http_cache = http_cache
+        # Processes parsing pages while the next ones download (None means
+        # one per spare core, 0 parses inline)
+        self.parse_workers = parse_workers
+        # Keeps connections to the site open between pages, and between
+        # scrapes when the refresh daemon reuses the scraper
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+        )
 
     def setup_directories(self):
         """Create necessary directories if they don't exist."""
         os.makedirs("logs", exist_ok=True)
         os.makedirs("data", exist_ok=True)
 
-    def parse_job_listing(self, html_content: str) -> List[Dict]:
-        """Parse job listings from CareerJet's page using BeautifulSoup."""
-        jobs = []
-        soup = BeautifulSoup(html_content, "html.parser")
-        # The job cards are likely under ul > li > article
-        job_cards = soup.select("ul li article")
-
-        for card in job_cards:  # No limit on the number of jobs
-            try:
-                # Title is in the first <p> inside <article>
-                title_elem = card.find("p")
-                title = title_elem.text.strip() if title_elem else None
-
-                # Location is in the second <ul> inside <article>
-                location_elem = card.find("ul", class_="location")
-                location = (
-                    location_elem.find("li").text.strip() if location_elem else None
-                )
-
-                # Salary is in the third <ul> inside <article>
-                salary_elem = card.find("ul", class_="salary")
-                salary = salary_elem.find("li").text.strip() if salary_elem else None
-
-                # Description is in the <div> inside <article>
-                description_elem = card.find("div")
-                description = (
-                    description_elem.text.strip() if description_elem else None
-                )
-
-                # Posted date is in the <footer> inside <article>
-                date_elem = card.find("footer").find("ul").find("li").find("span")
-                posted_date = date_elem.text.strip() if date_elem else None
-
-                # Link to job details
-                link_elem = card.find("a", href=True)
-                job_url = link_elem["href"] if link_elem else None
-
-                job = {
-                    "title": title,
-                    "location": location,
-                    "url": job_url,
-                    "description": description,
-                    "salary": salary,
-                    "posted_date": posted_date,
-                    "source": "CareerJet",
-                    "scraped_at": datetime.utcnow().isoformat(),
-                }
-                jobs.append(job)
-                logger.info(f"Successfully scraped job: {job['title']}")
-
-            except Exception as e:
-                logger.error(f"Error parsing job card: {e}")
-                continue
-
-        return jobs
-
     def save_to_json(self, jobs: List[Dict], filename: str):
         """Save jobs to a JSON file in the Job_Board directory."""
         if not jobs:
@@ -105,51 +147,137 @@ class CareerJetScraper:
         except Exception as e:
             logger.error(f"Failed to save jobs to JSON: {e}")
 
+    def fetch_cached(self, url: str) -> Optional[str]:
+        """The cached body of url, if the HTTP cache is on and has it.
+
+        In offline mode a miss raises CacheMiss instead of going online.
+        """
+        if self.http_cache is None:
+            return None
+        entry = self.http_cache.get(HttpCache.key("GET", url))
+        return entry["body"].decode("utf-8") if entry else None
+
+    def handle_parsed(
+        self, page: int, jobs: List[Dict], errors: List[str], seconds: float
+    ) -> List[Dict]:
+        """Log and count the result of parsing one page."""
+        for error in errors:
+            logger.error(error)
+        for job in jobs:
+            self.job_log.log("Successfully scraped job: %s", job["title"])
+        PARSE_SECONDS.observe(seconds, spider="careerjet")
+        ITEMS_TOTAL.inc(len(jobs), spider="careerjet")
+        if jobs:
+            logger.info(f"Found {len(jobs)} jobs on page {page}")
+        return jobs
+
+    def scrape_page(self, page: int) -> List[Dict]:
+        """Fetch and parse a single results page in this process."""
+        html = self.fetch_page(page)
+        start = time.perf_counter()
+        jobs, errors = parse_job_listing(html)
+        return self.handle_parsed(page, jobs, errors, time.perf_counter() - start)
+
+    def fetch_page(self, page: int) -> str:
+        """Fetch a single results page, retrying on request errors."""
+        url = f"{self.base_url}&p={page}"
+        logger.info(f"Scraping page {page}: {url}")
+
+        html = self.fetch_cached(url)
+        if html is not None:
+            return html
+
+        # Retry mechanism for page loading, paced by the throttle
+        host = host_of(url)
+        for attempt in range(self.max_retries):
+            self.throttle.wait(host)
+            start = time.perf_counter()
+            try:
+                with FETCH_SECONDS.time(spider="careerjet"):
+                    response = self.session.get(url, timeout=30)
+                self.throttle.record(
+                    host,
+                    time.perf_counter() - start,
+                    ok=response.ok,
+                    status=response.status_code,
+                    retry_after=response.headers.get("Retry-After"),
+                )
+                response.raise_for_status()
+                RESPONSE_BYTES.observe(len(response.content), spider="careerjet")
+                if self.http_cache is not None:
+                    self.http_cache.put(
+                        HttpCache.key("GET", url),
+                        url,
+                        response.status_code,
+                        {name: [value] for name, value in response.headers.items()},
+                        response.content,
+                    )
+                return response.text
+            except requests.RequestException as e:
+                if e.response is None:
+                    # No response at all: connection error or timeout
+                    self.throttle.record(host, None, ok=False)
+                if attempt == self.max_retries - 1:
+                    logger.error(
+                        f"Failed to load page {page} after {self.max_retries} attempts: {e}"
+                    )
+                    raise
+                logger.warning(
+                    f"Failed to load page {page}, retrying... ({attempt + 1}/{self.max_retries})"
+                )
+                RETRIES_TOTAL.inc(spider="careerjet")
+
+    def collect(self, pending: Dict, results: Dict, last_page: int, wait=False):
+        """Move finished parses from pending into results.
+
+        Returns the last page worth keeping: pagination stops at the first
+        page without jobs.
+        """
+        for page, future in list(pending.items()):
+            if not (wait or future.done()):
+                continue
+            del pending[page]
+            try:
+                (jobs, errors), seconds = future.result()
+            except Exception as e:
+                logger.error(f"Error parsing page {page}: {e}")
+                last_page = min(last_page, page - 1)
+                continue
+            results[page] = self.handle_parsed(page, jobs, errors, seconds)
+            if not jobs and page <= last_page:
+                logger.info(f"No more jobs found on page {page}, stopping pagination")
+                last_page = page - 1
+        return last_page
+
     def scrape(self, max_pages: int = 70):
-        """Main scraping method."""
+        """Main scraping method. Returns the number of jobs found.
+
+        Pages are parsed in worker processes while the next ones download.
+        The pool holds a few pages at most, so fetching waits when parsing
+        falls behind; pages fetched past the end of the results are dropped.
+        """
         logger.info("Starting to scrape CareerJet jobs")
         all_jobs = []
+        pending, results = {}, {}
+        last_page = max_pages
 
-        try:
-            for page in tqdm(range(1, max_pages + 1), desc="Scraping pages"):
-                url = f"{self.base_url}&p={page}"
-                logger.info(f"Scraping page {page}: {url}")
-
-                # Retry mechanism for page loading
-                for attempt in range(self.max_retries):
-                    try:
-                        headers = {
-                            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-                        }
-                        response = requests.get(url, headers=headers)
-                        response.raise_for_status()
-                        jobs = self.parse_job_listing(response.text)
+        with ParsePool(self.parse_workers) as pool:
+            try:
+                for page in tqdm(range(1, max_pages + 1), desc="Scraping pages"):
+                    if page > last_page:
                         break
-                    except requests.RequestException as e:
-                        if attempt == self.max_retries - 1:
-                            logger.error(
-                                f"Failed to load page {page} after {self.max_retries} attempts: {e}"
-                            )
-                            raise
-                        logger.warning(
-                            f"Failed to load page {page}, retrying... ({attempt + 1}/{self.max_retries})"
-                        )
-                        time.sleep(self.retry_delay)
-
-                if not jobs:
-                    logger.info(
-                        f"No more jobs found on page {page}, stopping pagination"
-                    )
-                    break
-
-                all_jobs.extend(jobs)
-                logger.info(f"Found {len(jobs)} jobs on page {page}")
+                    html = self.fetch_page(page)
+                    pending[page] = pool.submit(parse_job_listing, html)
+                    last_page = self.collect(pending, results, last_page)
 
-                # Fixed delay between pages
-                time.sleep(2)
+            except Exception as e:
+                logger.error(f"Error during scraping: {e}")
+            last_page = self.collect(pending, results, last_page, wait=True)
 
-        except Exception as e:
-            logger.error(f"Error during scraping: {e}")
+        for page in sorted(results):
+            if page > last_page:
+                break
+            all_jobs.extend(results[page])
 
         if all_jobs:
             self.save_to_json(
@@ -157,13 +285,48 @@ class CareerJetScraper:
                 f'careerjet_jobs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json',
             )
 
+        self.job_log.summary()
+        logger.info(f"Throttle state: {self.throttle.snapshot()}")
         logger.info(f"Completed scraping CareerJet. Total jobs found: {len(all_jobs)}")
+        REGISTRY.write_snapshot(METRICS_DIR / "careerjet.json")
+        return len(all_jobs)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Scrape job listings from CareerJet.")
+    parser.add_argument(
+        "--profile", action="store_true", help="profile the scrape into logs/profiles/"
+    )
+    parser.add_argument(
+        "--http-cache",
+        action="store_true",
+        help="reuse pages cached in data/cache/http (see QUT_HTTP_CACHE)",
+    )
+    parser.add_argument(
+        "--offline", action="store_true", help="only replay cached pages"
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        help="processes parsing pages (default: one per spare core, 0 for inline)",
+    )
+    args = parser.parse_args()
+
+    setup_logging(
+        "careerjet_scraper",
+        log_format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
     load_dotenv()
-    scraper = CareerJetScraper()
-    scraper.scrape(max_pages=70)
+    if args.profile:
+        enable_profiling()
+    else:
+        enable_from_env()
+    scraper = CareerJetScraper(
+        http_cache=HttpCache.from_env(enabled=args.http_cache, offline=args.offline),
+        parse_workers=args.parse_workers,
+    )
+    with profile_stage("careerjet.scrape"):
+        scraper.scrape(max_pages=70)
 
 
 if __name__ == "__main__":
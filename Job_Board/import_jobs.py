@@ -0,0 +1,44 @@
+import argparse
+import sys
+import json
+import logging
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+JOB_BOARD_DIR = Path(__file__).parent
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from src.utils.mongodb_handler import MongoDBHandler
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def import_latest_jobs():
+    """Import the most recent careerjet_jobs_*.json file into MongoDB.
+
+    Returns the number of jobs saved, or None when there is no job file.
+    """
+    job_files = sorted(JOB_BOARD_DIR.glob("careerjet_jobs_*.json"))
+    if not job_files:
+        logger.warning("No CareerJet job files found")
+        return None
+
+    latest = job_files[-1]
+    with open(latest, "r", encoding="utf-8") as f:
+        jobs = json.load(f)
+
+    handler = MongoDBHandler()
+    saved = handler.save_jobs(jobs)
+    handler.close()
+    logger.info(f"Imported {saved} jobs from {latest.name}")
+    return saved
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description="Import the latest job listings into MongoDB.").parse_args()
+    import_latest_jobs()
@@ -0,0 +1,139 @@
+"""Speed of normalize_text against the old chained replace + NFKC version.
+
+Benchmarks on real scraped text: the highlights, descriptions and section
+paragraphs of course details in data/raw/*.json, plus the job titles and
+descriptions in Job_Board/careerjet_jobs_*.json and
+data/json/joblist_jobs_*.json. Without a crawl in data/raw, the course
+text comes from the sample in benchmarks/data/course_text.json.
+
+The first pass is the cost of a crawl, where each string is seen about
+once; the warm passes show what the cache adds for repeated strings. Run
+from the project root:
+
+    python benchmarks/normalize_text.py --repeat 20
+"""
+import sys
+import glob
+import json
+import time
+import argparse
+import unicodedata
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from src.utils.normalize import _normalize_unicode, normalize_text
+
+COURSE_TEXT_FIELDS = ("course_name", "main_description", "highlights")
+JOB_TEXT_FIELDS = ("title", "company", "location", "salary", "description")
+SAMPLE_COURSES = Path(__file__).parent / "data" / "course_text.json"
+
+
+def legacy_normalize(text):
+    # What MySpider.normalize_text meant to do: one pass per quote, then NFKC
+    text = text.replace("’", "'")  # right single quote
+    text = text.replace("‘", "'")  # left single quote
+    text = text.replace("“", '"')  # left double quote
+    text = text.replace("”", '"')  # right double quote
+    text = unicodedata.normalize("NFKC", text)  # normalize Unicode
+    return text
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+
+
+def load_courses():
+    courses = []
+    for path in glob.glob(str(PROJECT_ROOT / "data" / "raw" / "*.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                course = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(course, dict) and "course_code" in course:
+            courses.append(course)
+    if courses:
+        return courses, "data/raw"
+    with open(SAMPLE_COURSES, "r", encoding="utf-8") as f:
+        return json.load(f), SAMPLE_COURSES.relative_to(PROJECT_ROOT).as_posix()
+
+
+def load_corpus():
+    courses, source = load_courses()
+    texts = []
+    for course in courses:
+        for field in COURSE_TEXT_FIELDS:
+            texts.extend(_strings(course.get(field)))
+        texts.extend(_strings(course.get("what_to_expect-careers_and_outcome")))
+    course_texts = len(texts)
+
+    job_files = glob.glob(str(PROJECT_ROOT / "Job_Board" / "careerjet_jobs_*.json"))
+    job_files += glob.glob(str(PROJECT_ROOT / "data" / "json" / "joblist_jobs_*.json"))
+    for path in job_files:
+        with open(path, "r", encoding="utf-8") as f:
+            for job in json.load(f):
+                texts.extend(_strings([job.get(field) for field in JOB_TEXT_FIELDS]))
+    print(
+        f"{course_texts} course strings from {source}, "
+        f"{len(texts) - course_texts} job strings"
+    )
+    return [text.strip() for text in texts if text and text.strip()]
+
+
+def bench(func, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the text")
+    args = parser.parse_args()
+
+    texts = load_corpus()
+    if not texts:
+        parser.error("no scraped text found in data/raw or the job exports")
+    non_ascii = sum(not text.isascii() for text in texts)
+    print(
+        f"{len(texts)} strings ({non_ascii} non-ASCII, "
+        f"{len(set(texts))} distinct), {args.repeat} passes"
+    )
+
+    differ = sum(legacy_normalize(text) != normalize_text(text) for text in texts)
+    if differ:
+        print(f"{differ} strings normalize differently (quotes the old table missed)")
+
+    legacy_cold = bench(legacy_normalize, texts, 1)
+    _normalize_unicode.cache_clear()
+    current_cold = bench(normalize_text, texts, 1)
+    legacy = bench(legacy_normalize, texts, args.repeat)
+    current = bench(normalize_text, texts, args.repeat)
+
+    calls = len(texts) * args.repeat
+    print(f"{'':>16}  {'first pass':>12}  {'warm':>12}")
+    for name, cold, warm in (
+        ("replace + NFKC", legacy_cold, legacy),
+        ("normalize_text", current_cold, current),
+    ):
+        print(
+            f"{name:>16}  {cold / len(texts) * 1e6:9.3f} us  "
+            f"{warm / calls * 1e6:9.3f} us"
+        )
+    print(
+        f"{'speedup':>16}  {legacy_cold / current_cold:10.1f}x  "
+        f"{legacy / current:10.1f}x"
+    )
+
+if __name__ == "__main__":
+    main()
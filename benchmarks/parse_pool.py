@@ -0,0 +1,122 @@
+"""Pages per second for CareerJet parsing inline and in the parse pool.
+
+Rebuilds result pages from a saved careerjet_jobs_*.json (20 jobs a
+page, the same markup parse_job_listing reads) and runs them through the
+same fetch/parse loop as CareerJetScraper.scrape, with --fetch-latency
+standing in for the network. Run from the project root:
+
+    python benchmarks/parse_pool.py --workers 0 2 4 --fetch-latency 0.05
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from html import escape
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "Job_Board"))
+from careerjet_scraper import parse_job_listing
+from src.utils.parse_pool import ParsePool
+
+JOBS_PER_PAGE = 20
+
+
+def render_card(job):
+    return (
+        "<li><article>"
+        f'<header><h2><a href="{escape(job.get("url") or "")}">'
+        f"{escape(job.get('title') or '')}</a></h2></header>"
+        f"<p>{escape(job.get('title') or '')}</p>"
+        f'<ul class="location"><li>{escape(job.get("location") or "")}</li></ul>'
+        f'<ul class="salary"><li>{escape(job.get("salary") or "")}</li></ul>'
+        f"<div>{escape(job.get('description') or '')}</div>"
+        f"<footer><ul><li><span>{escape(job.get('posted_date') or '')}</span>"
+        "</li></ul></footer>"
+        "</article></li>"
+    )
+
+
+def render_pages(jobs, pages):
+    rendered = []
+    for page in range(pages):
+        start = (page * JOBS_PER_PAGE) % max(1, len(jobs) - JOBS_PER_PAGE)
+        page_jobs = jobs[start : start + JOBS_PER_PAGE]
+        cards = "".join(render_card(job) for job in page_jobs)
+        rendered.append(f"<html><body><ul>{cards}</ul></body></html>")
+    return rendered
+
+
+def run(pages, workers, fetch_latency):
+    """Fetch (sleep) and parse every page; returns (seconds, jobs parsed)."""
+    start = time.perf_counter()
+    parsed = 0
+    with ParsePool(workers) as pool:
+        futures = []
+        for html in pages:
+            time.sleep(fetch_latency)
+            futures.append(pool.submit(parse_job_listing, html))
+        for future in futures:
+            (jobs, _), _ = future.result()
+            parsed += len(jobs)
+    return time.perf_counter() - start, parsed
+
+
+def startup(page, workers):
+    """Seconds to start a pool, parse one page in it and shut it down.
+
+    The fixed cost each ECI.py run pays before its workers are useful,
+    since main.py starts one per batch of courses.
+    """
+    start = time.perf_counter()
+    with ParsePool(workers) as pool:
+        pool.submit(parse_job_listing, page).result()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--jobs-file",
+        help="saved CareerJet jobs (default: newest Job_Board/careerjet_jobs_*.json)",
+    )
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    parser.add_argument(
+        "--fetch-latency",
+        type=float,
+        default=0.0,
+        help="seconds each simulated fetch takes",
+    )
+    args = parser.parse_args()
+
+    jobs_file = args.jobs_file
+    if jobs_file is None:
+        pattern = PROJECT_ROOT / "Job_Board" / "careerjet_jobs_*.json"
+        saved = sorted(glob.glob(str(pattern)))
+        if not saved:
+            parser.error("no saved careerjet_jobs_*.json, pass --jobs-file")
+        jobs_file = saved[-1]
+    with open(jobs_file, "r", encoding="utf-8") as f:
+        jobs = json.load(f)
+    pages = render_pages(jobs, args.pages)
+
+    print(
+        f"{args.pages} pages from {jobs_file}, fetch latency {args.fetch_latency}s, "
+        f"{os.cpu_count()} cores"
+    )
+    for workers in args.workers:
+        seconds, parsed = run(pages, workers, args.fetch_latency)
+        label = "inline" if workers == 0 else f"{workers} workers"
+        print(
+            f"{label:>10}: {args.pages / seconds:8.1f} pages/s "
+            f"({parsed} jobs in {seconds:.2f}s, "
+            f"pool startup {startup(pages[0], workers) * 1000:.0f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Skilled occupation lists and the ANZSCO hierarchy.
+"""
@@ -0,0 +1,179 @@
+import sys
+import json
+import argparse
+from bisect import bisect_left
+from pathlib import Path
+
+# Get the occupations directory
+OCCUPATIONS_DIR = Path(__file__).parent
+INDEX_FILE = OCCUPATIONS_DIR / "data" / "anzsco_index.json"
+
+# ANZSCO levels by code length: 2 = major group 2, 26 = sub-major group,
+# 261 = minor group, 2613 = unit group, 261313 = occupation
+LEVELS = {
+    1: "major_group",
+    2: "sub_major_group",
+    3: "minor_group",
+    4: "unit_group",
+    6: "occupation",
+}
+CODE_LENGTHS = sorted(LEVELS)
+OCCUPATION = "occupation"
+# Sorts after every digit, so [prefix, prefix + END) holds a whole subtree
+END = ":"
+
+
+def level_of(code):
+    """The ANZSCO level of a code, or None when it is not an ANZSCO code."""
+    if not code or not code.isdigit():
+        return None
+    return LEVELS.get(len(code))
+
+
+def ancestor_codes(code):
+    """Codes of the groups above code, major group first."""
+    return [code[:length] for length in CODE_LENGTHS if length < len(code)]
+
+
+def hierarchy_fields(code):
+    """Level and ancestor group codes of an occupation, for storing with it."""
+    fields = {"level": level_of(code)}
+    if fields["level"] is None:
+        return fields
+    for ancestor in ancestor_codes(code):
+        fields[LEVELS[len(ancestor)]] = ancestor
+    return fields
+
+
+class AnzscoIndex:
+    """The ANZSCO tree built from code prefixes.
+
+    Codes are kept sorted, so everything under a group is one contiguous
+    range found with two binary searches, and ancestors are prefixes of
+    the code, so walking up is O(depth). The number of occupations under
+    every group is rolled up once when the index is built. Groups that
+    only appear as prefixes of occupation codes are added without a title.
+    """
+
+    def __init__(self, titles):
+        self.titles = {}
+        for code, title in titles.items():
+            if level_of(code) is None:
+                continue
+            # A group listed after its occupations replaces their placeholder
+            if self.titles.get(code) is None:
+                self.titles[code] = title
+            for ancestor in ancestor_codes(code):
+                self.titles.setdefault(ancestor, None)
+
+        self.codes = sorted(self.titles)
+        self.children = {}
+        self.counts = dict.fromkeys(self.codes, 0)
+        for code in self.codes:
+            ancestors = ancestor_codes(code)
+            if ancestors:
+                self.children.setdefault(ancestors[-1], []).append(code)
+            if level_of(code) == OCCUPATION:
+                for ancestor in ancestors:
+                    self.counts[ancestor] += 1
+                self.counts[code] = 1
+
+    @classmethod
+    def from_occupations(cls, occupations):
+        """Build the index from occupation dicts with ``code`` and ``title``."""
+        titles = {}
+        for occupation in occupations:
+            code = str(occupation.get("code") or "").strip()
+            titles.setdefault(code, occupation.get("title"))
+        return cls(titles)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(dict(json.load(f)["nodes"]))
+
+    def save(self, path=INDEX_FILE):
+        """Write the codes and titles as one compact, sorted JSON file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        nodes = [[code, self.titles[code]] for code in self.codes]
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"nodes": nodes}, f, ensure_ascii=False, separators=(",", ":"))
+        tmp_path.replace(path)
+
+    def __contains__(self, code):
+        return code in self.titles
+
+    def __len__(self):
+        return len(self.codes)
+
+    def node(self, code):
+        return {"code": code, "title": self.titles.get(code), "level": level_of(code)}
+
+    def ancestors(self, code):
+        return [self.node(ancestor) for ancestor in ancestor_codes(code)]
+
+    def range(self, prefix):
+        """Sorted codes starting with prefix (the prefix itself included)."""
+        start = bisect_left(self.codes, prefix)
+        end = bisect_left(self.codes, prefix + END, start)
+        return self.codes[start:end]
+
+    def descendants(self, code, level=None):
+        """Everything below code, optionally only at one level."""
+        descendants = [other for other in self.range(code) if other != code]
+        if level is not None:
+            descendants = [d for d in descendants if level_of(d) == level]
+        return [self.node(descendant) for descendant in descendants]
+
+    def occupations_under(self, code):
+        return self.descendants(code, OCCUPATION)
+
+    def count(self, code):
+        """Number of occupations under a group (1 for an occupation)."""
+        return self.counts.get(code, 0)
+
+    def rollup(self, level="major_group"):
+        """Occupation counts for every group at a level."""
+        return {
+            code: self.counts[code] for code in self.codes if level_of(code) == level
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the ANZSCO hierarchy.")
+    parser.add_argument("code", nargs="?", help="group or occupation code, e.g. 26")
+    parser.add_argument(
+        "--build",
+        metavar="PATH",
+        help="rebuild the index from an occupations JSON file first",
+    )
+    parser.add_argument("--index", default=str(INDEX_FILE))
+    args = parser.parse_args(argv)
+
+    if args.build:
+        with open(args.build, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = AnzscoIndex.from_occupations(data.get("occupations", []))
+        index.save(args.index)
+        print(f"Indexed {len(index)} ANZSCO codes into {args.index}")
+    else:
+        index = AnzscoIndex.load(args.index)
+
+    if not args.code:
+        for code, count in index.rollup().items():
+            print(f"{code}  {index.titles[code] or ''}  ({count} occupations)")
+        return
+    if args.code not in index:
+        sys.exit(f"{args.code} is not in the index")
+
+    for ancestor in index.ancestors(args.code):
+        print(f"{ancestor['code']}  {ancestor['title'] or ''}")
+    print(f"{args.code}  {index.titles[args.code] or ''}  ({index.count(args.code)})")
+    for occupation in index.occupations_under(args.code):
+        print(f"  {occupation['code']}  {occupation['title'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Occupation storage.
+"""
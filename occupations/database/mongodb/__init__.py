@@ -0,0 +1,3 @@
+"""
+MongoDB import and reporting scripts for occupations.
+"""
@@ -1,56 +1,123 @@
+import sys
 import json
-from pymongo import MongoClient
+import argparse
 from datetime import datetime
 from pathlib import Path
+from pymongo import ReplaceOne
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+from occupations.anzsco import LEVELS, AnzscoIndex, hierarchy_fields
+from occupations.occupation_store import OccupationStore
+from src.utils.metrics import METRICS_DIR, MONGO_WRITE_SECONDS, REGISTRY
+from src.utils.mongo_client import bump_data_version, get_database
 
-def import_occupations_to_mongodb():
-    # Get the project root directory
-    PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.parent
-    DATA_DIR = PROJECT_ROOT / "src" / "occupations" / "data"
+# When the last sync from the occupation store to MongoDB started
+LAST_SYNC = "mongodb_last_sync"
+BATCH_SIZE = 500
+
+
+def import_occupations_to_mongodb(full=False):
+    """Sync changed occupations to MongoDB.
+
+    Returns the number of occupations written, or None when the import failed.
+    """
+    # Get the occupations directory
+    OCCUPATIONS_DIR = Path(__file__).parent.parent.parent
+    DATA_DIR = OCCUPATIONS_DIR / "data"
     RAW_DIR = DATA_DIR / "raw"
 
     # Connect to MongoDB
-    client = MongoClient("mongodb://localhost:27017/")
-    db = client["qut_courses"]  # Using the same database as courses
+    db = get_database("qut_courses")  # Using the same database as courses
     occupations_collection = db["occupations"]
-
-    # Clear existing data
-    occupations_collection.delete_many({})
+    store = OccupationStore()
+    import_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    metadata = {"import_date": import_date}
 
     try:
-        # Read the occupations JSON file
+        # A hand-made occupations.json is merged into the store like any
+        # scraped source; the scraper writes to the store directly
         occupations_file = RAW_DIR / "occupations.json"
-        with open(occupations_file, "r", encoding="utf-8") as file:
-            data = json.load(file)
+        if occupations_file.exists():
+            with open(occupations_file, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            source_name = data.get("source") or "occupations.json"
+            counts = store.record(source_name, data["occupations"])
+            print(f"Merged {occupations_file.name} into the store: {counts}")
+            metadata["source"] = data.get("source")
+            metadata["date_scraped"] = data.get("date_scraped")
 
-            # Add import date
-            data["import_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        last_sync = None if full else store.get_meta(LAST_SYNC)
+        sync_started = datetime.now().isoformat()
+        if last_sync is None:
+            # Documents from the old delete-and-reinsert import have no
+            # source_name and would be duplicated by the upserts
+            occupations_collection.delete_many(
+                {"code": {"$exists": True}, "source_name": {"$exists": False}}
+            )
 
-            # Insert the metadata
-            metadata = {
-                "source": data["source"],
-                "date_scraped": data["date_scraped"],
-                "import_date": data["import_date"],
-            }
-            occupations_collection.insert_one(metadata)
+        # Only occupations changed since the last sync are written
+        operations = []
+        synced = 0
+        for occupation in store.changed_since(last_sync):
+            # last_seen moves on every scrape; it stays in the store only
+            occupation.pop("last_seen")
+            occupation.update(hierarchy_fields(occupation["code"]))
+            occupation["import_date"] = import_date
+            key = {"source_name": occupation["source_name"], "code": occupation["code"]}
+            operations.append(ReplaceOne(key, occupation, upsert=True))
+            if len(operations) >= BATCH_SIZE:
+                with MONGO_WRITE_SECONDS.time(collection="occupations"):
+                    occupations_collection.bulk_write(operations, ordered=False)
+                synced += len(operations)
+                operations = []
+        if operations:
+            with MONGO_WRITE_SECONDS.time(collection="occupations"):
+                occupations_collection.bulk_write(operations, ordered=False)
+            synced += len(operations)
+        store.set_meta(LAST_SYNC, sync_started)
 
-            # Insert all occupations
-            if data["occupations"]:
-                occupations_collection.insert_many(data["occupations"])
+        # The one document without a code describes the import
+        occupations_collection.update_one(
+            {"code": {"$exists": False}}, {"$set": metadata}, upsert=True
+        )
+        print(f"Upserted {synced} changed occupations to MongoDB")
 
-            print(f"Imported {len(data['occupations'])} occupations to MongoDB")
+        current = [o for o in store.changed_since() if not o["stale"]]
+        index = AnzscoIndex.from_occupations(current)
+        index.save()
+        print(f"Saved the ANZSCO hierarchy ({len(index)} codes)")
 
     except Exception as e:
         print(f"Error importing occupations: {e}")
+        return None
+    finally:
+        store.close()
 
     # Create indexes for better query performance
+    occupations_collection.create_index(
+        [("source_name", 1), ("code", 1)],
+        unique=True,
+        partialFilterExpression={"code": {"$exists": True}},
+    )
     occupations_collection.create_index("code")
     occupations_collection.create_index("title")
+    for level in LEVELS.values():
+        occupations_collection.create_index([(level, 1), ("code", 1)], sparse=True)
+    occupations_collection.create_index("level")
+    bump_data_version(db, "occupations")
 
     print("MongoDB import completed successfully!")
     print("Collection: occupations")
 
+    REGISTRY.write_snapshot(METRICS_DIR / "import_occupations.json")
+    return synced
+
 
 if __name__ == "__main__":
-    import_occupations_to_mongodb()
+    parser = argparse.ArgumentParser(description="Import occupations into MongoDB.")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="rewrite every occupation, not just those changed since the last import",
+    )
+    import_occupations_to_mongodb(full=parser.parse_args().full)
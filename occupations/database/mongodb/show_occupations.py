@@ -1,11 +1,15 @@
-from pymongo import MongoClient
+import argparse
+import sys
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+from src.utils.mongo_client import get_database
 
 
 def show_occupation_data():
     # Connect to MongoDB
-    client = MongoClient("mongodb://localhost:27017/")
-    db = client["qut_courses"]
+    db = get_database("qut_courses")
     occupations_collection = db["occupations"]
 
     # Get total count of occupations
@@ -44,4 +48,5 @@ def show_occupation_data():
 
 
 if __name__ == "__main__":
+    argparse.ArgumentParser(description="Summarise the occupations collection in MongoDB.").parse_args()
     show_occupation_data()
@@ -1,30 +1,26 @@
-from playwright.sync_api import sync_playwright
+import argparse
 from datetime import datetime
-import json
+import sys
 from pathlib import Path
 import logging
 import time
 import asyncio
 
-# Get the project root directory
-PROJECT_ROOT = Path(__file__).parent.parent.parent
-DATA_DIR = PROJECT_ROOT / "src" / "occupations" / "data"
+# Get the occupations directory
+OCCUPATIONS_DIR = Path(__file__).parent
+DATA_DIR = OCCUPATIONS_DIR / "data"
 RAW_DIR = DATA_DIR / "raw"
 
-# Create data directories if they don't exist
-RAW_DIR.mkdir(parents=True, exist_ok=True)
-
-# Set up logging
-logging.basicConfig(
-    filename=RAW_DIR / "scraper.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+sys.path.insert(0, str(OCCUPATIONS_DIR.parent))
+from src.utils.log_setup import ItemLogSampler, setup_logging
+from occupations.anzsco import hierarchy_fields
+from occupations.occupation_store import OccupationStore
 
 
 def scrape_immi_website(page, url):
     """Scrape occupations from the Department of Home Affairs website."""
     occupations = []
+    found = ItemLogSampler(logging.getLogger(), "IMMI occupations")
     try:
         logging.info(f"Accessing {url}")
         page.goto(url)
@@ -55,7 +51,7 @@ def scrape_immi_website(page, url):
                                 "date_scraped": datetime.now().strftime("%Y-%m-%d"),
                             }
                             occupations.append(occupation)
-                            logging.info(f"Found occupation: {code} - {title}")
+                            found.log("Found occupation: %s - %s", code, title)
                 except Exception as e:
                     logging.error(f"Error parsing row: {str(e)}")
                     continue
@@ -63,12 +59,14 @@ def scrape_immi_website(page, url):
     except Exception as e:
         logging.error(f"Error scraping IMMI website: {str(e)}")
 
+    found.summary()
     return occupations
 
 
 def scrape_abs_website(page, url):
     """Scrape occupations from the ABS website."""
     occupations = []
+    found = ItemLogSampler(logging.getLogger(), "ABS occupations")
     try:
         logging.info(f"Accessing {url}")
         page.goto(url)
@@ -90,22 +88,19 @@ def scrape_abs_website(page, url):
                         code_text = columns[0].inner_text().strip()
                         title_text = columns[1].inner_text().strip()
                         if code_text and title_text:
-                            # Extract skill level from code (first digit)
-                            skill_level = (
-                                code_text[0]
-                                if code_text and code_text[0].isdigit()
-                                else ""
-                            )
+                            # The first digit is the major group, not the
+                            # skill level, which these tables do not give
                             occupation = {
                                 "code": code_text,
                                 "title": title_text,
-                                "skill_level": skill_level,
+                                "skill_level": "",
+                                **hierarchy_fields(code_text),
                                 "source": "Australian Bureau of Statistics",
                                 "date_scraped": datetime.now().strftime("%Y-%m-%d"),
                             }
                             occupations.append(occupation)
-                            logging.info(
-                                f"Found occupation: {code_text} - {title_text}"
+                            found.log(
+                                "Found occupation: %s - %s", code_text, title_text
                             )
                 except Exception as e:
                     logging.error(f"Error parsing row: {str(e)}")
@@ -114,47 +109,38 @@ def scrape_abs_website(page, url):
     except Exception as e:
         logging.error(f"Error scraping ABS website: {str(e)}")
 
+    found.summary()
     return occupations
 
 
 def save_occupations(occupations, source_name):
-    """Save occupations to a JSON file."""
-    if occupations:
-        output_file = RAW_DIR / f"occupations_{source_name}.json"
-
-        # If file exists, load and merge with existing data
-        existing_occupations = []
-        if output_file.exists():
-            try:
-                with open(output_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    existing_occupations = data.get("occupations", [])
-            except Exception as e:
-                logging.error(f"Error reading existing file: {str(e)}")
-
-        # Merge existing and new occupations, removing duplicates based on code
-        all_occupations = {
-            o["code"]: o for o in existing_occupations + occupations
-        }.values()
-
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    "source": source_name,
-                    "date_scraped": datetime.now().strftime("%Y-%m-%d"),
-                    "occupations": list(all_occupations),
-                },
-                f,
-                indent=4,
-                ensure_ascii=False,
-            )
-        logging.info(f"Saved {len(all_occupations)} occupations to {output_file}")
-    else:
+    """Merge a scrape into the occupation store, rewriting only changed rows.
+
+    Returns the number of occupations saved.
+    """
+    if not occupations:
+        # An empty scrape is a failed one, not a source with no occupations
         logging.warning(f"No occupations found for {source_name}")
+        return 0
+
+    store = OccupationStore()
+    try:
+        counts = store.record(source_name, occupations)
+    finally:
+        store.close()
+    logging.info(
+        f"Saved {len(occupations)} {source_name} occupations to {store.path}: "
+        f"{counts['added']} added, {counts['changed']} changed, "
+        f"{counts['unchanged']} unchanged, {counts['stale']} no longer listed"
+    )
+    return len(occupations)
 
 
 def run_scraper():
-    """Run the scraper for all sources."""
+    """Run the scraper for all sources. Returns the number of occupations saved."""
+    from playwright.sync_api import sync_playwright
+
+    saved = 0
     with sync_playwright() as p:
         try:
             # Launch browser
@@ -187,7 +173,7 @@ def run_scraper():
                         f"Starting to scrape {source['name']} from {source['url']}"
                     )
                     occupations = source["scraper"](page, source["url"])
-                    save_occupations(occupations, source["name"])
+                    saved += save_occupations(occupations, source["name"])
                 except Exception as e:
                     logging.error(f"Error processing {source['name']}: {str(e)}")
                     continue
@@ -198,7 +184,12 @@ def run_scraper():
 
         except Exception as e:
             logging.error(f"Error running scraper: {str(e)}")
+    return saved
 
 
 if __name__ == "__main__":
+    argparse.ArgumentParser(description="Scrape the skilled occupation lists.").parse_args()
+    # File only, as before, but under logs/ so the raw data directory only
+    # changes when occupations do
+    setup_logging("occupation_scraper", console_level=None)
     run_scraper()
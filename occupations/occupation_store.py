@@ -0,0 +1,179 @@
+import json
+import sqlite3
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+# Get the occupations directory
+OCCUPATIONS_DIR = Path(__file__).parent
+STORE_FILE = OCCUPATIONS_DIR / "data" / "raw" / "occupations.db"
+
+# Fields that change on every scrape without the occupation changing
+VOLATILE_FIELDS = ("_id", "date_scraped", "import_date")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS occupations (
+    source TEXT NOT NULL,
+    code TEXT NOT NULL,
+    data TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    last_changed TEXT NOT NULL,
+    stale_since TEXT,
+    PRIMARY KEY (source, code)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS occupations_last_changed ON occupations (last_changed);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def occupation_hash(occupation):
+    content = {
+        key: value for key, value in occupation.items() if key not in VOLATILE_FIELDS
+    }
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class OccupationStore:
+    """Scraped occupations in SQLite, one row per source and code.
+
+    ``record`` compares each scraped occupation's content hash with the
+    stored one and only rewrites rows that changed; unchanged rows just
+    get ``last_seen`` bumped. Codes a source no longer lists are marked
+    stale rather than deleted. Every row change sets ``last_changed``, so
+    the MongoDB importer only has to sync ``changed_since`` its last run.
+    """
+
+    def __init__(self, path=STORE_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def record(self, source, occupations, seen_at=None):
+        """Merge a complete scrape of a source. Returns what changed.
+
+        Codes the source listed before but not in this scrape are marked
+        stale. Use ``upsert`` for a partial scrape.
+        """
+        seen_at = seen_at or datetime.now().isoformat()
+        counts = self.upsert(source, occupations, seen_at)
+        counts["stale"] = self.mark_stale(source, seen_at)
+        return counts
+
+    def upsert(self, source, occupations, seen_at=None):
+        seen_at = seen_at or datetime.now().isoformat()
+        known = {
+            row["code"]: (row["content_hash"], row["stale_since"])
+            for row in self.conn.execute(
+                "SELECT code, content_hash, stale_since FROM occupations "
+                "WHERE source = ?",
+                (source,),
+            )
+        }
+
+        counts = {"added": 0, "changed": 0, "unchanged": 0}
+        changed_rows, seen_codes = [], []
+        latest = {o["code"]: o for o in occupations if o.get("code")}
+        for code, occupation in latest.items():
+            digest = occupation_hash(occupation)
+            previous = known.get(code)
+            if previous and previous[0] == digest and previous[1] is None:
+                counts["unchanged"] += 1
+                seen_codes.append((seen_at, source, code))
+                continue
+            counts["changed" if previous else "added"] += 1
+            data = json.dumps(occupation, ensure_ascii=False, default=str)
+            changed_rows.append(
+                (source, code, data, digest, seen_at, seen_at, seen_at)
+            )
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO occupations (source, code, data, content_hash, "
+                "first_seen, last_seen, last_changed) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (source, code) DO UPDATE SET data = excluded.data, "
+                "content_hash = excluded.content_hash, "
+                "last_seen = excluded.last_seen, "
+                "last_changed = excluded.last_changed, stale_since = NULL",
+                changed_rows,
+            )
+            self.conn.executemany(
+                "UPDATE occupations SET last_seen = ? WHERE source = ? AND code = ?",
+                seen_codes,
+            )
+        return counts
+
+    def mark_stale(self, source, seen_at):
+        """Mark codes of a source not seen since seen_at as stale."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE occupations SET stale_since = ?, last_changed = ? "
+                "WHERE source = ? AND last_seen < ? AND stale_since IS NULL",
+                (seen_at, seen_at, source, seen_at),
+            )
+        return cursor.rowcount
+
+    def stale(self, source=None):
+        """(source, code, stale_since) of every stale occupation."""
+        query = (
+            "SELECT source, code, stale_since FROM occupations "
+            "WHERE stale_since IS NOT NULL"
+        )
+        params = ()
+        if source:
+            query += " AND source = ?"
+            params = (source,)
+        return [tuple(row) for row in self.conn.execute(query, params)]
+
+    def changed_since(self, since=None):
+        """Occupations changed at or after since (all when since is None).
+
+        Each comes with its store ``source_name``, first and last seen
+        dates and whether it is stale.
+        """
+        query = "SELECT * FROM occupations"
+        params = ()
+        if since:
+            query += " WHERE last_changed >= ?"
+            params = (since,)
+        for row in self.conn.execute(query + " ORDER BY source, code", params):
+            occupation = json.loads(row["data"])
+            occupation.update(
+                source_name=row["source"],
+                code=row["code"],
+                first_seen=row["first_seen"],
+                last_seen=row["last_seen"],
+                stale=row["stale_since"] is not None,
+            )
+            yield occupation
+
+    def sources(self):
+        """Each source with its row count and latest last_seen."""
+        return {
+            row["source"]: {"count": row["count"], "last_seen": row["last_seen"]}
+            for row in self.conn.execute(
+                "SELECT source, COUNT(*) AS count, MAX(last_seen) AS last_seen "
+                "FROM occupations GROUP BY source"
+            )
+        }
+
+    def get_meta(self, key):
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    def close(self):
+        self.conn.close()
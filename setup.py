@@ -11,6 +11,10 @@ setup(
         "scrapy-playwright",
         "python-dotenv",
     ],
+    extras_require={
+        "export": ["pyarrow"],
+        "test": ["pytest"],
+    },
     author="QUT Courses Team",
     author_email="",
     description="A tool for processing and analyzing QUT course data",
@@ -25,7 +29,7 @@ setup(
     python_requires=">=3.8",
     entry_points={
         "console_scripts": [
-            "qut-courses=src.main:main",
+            "qut-courses=src.cli:main",
         ],
     },
 )
@@ -0,0 +1,316 @@
+import sys
+import json
+import asyncio
+import logging
+import argparse
+from functools import partial
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from src.utils.mongo_client import data_versions, get_database
+from src.utils.response_cache import ResponseCache
+
+logger = logging.getLogger("api")
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+MAX_HEADER_BYTES = 16 * 1024
+
+
+class HttpError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+def _limit(query):
+    try:
+        limit = int(query.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "limit must be a number")
+    return max(1, min(limit, MAX_LIMIT))
+
+
+class CourseApi:
+    """Read-only queries on the qut_courses collections.
+
+    List endpoints page with ``?after=<key>&limit=N``: a range query on an
+    indexed unique key rather than skip/offset, so every page costs the
+    same however deep it is. Courses are keyed on courseCode; occupations
+    on code and source_name, since a code is listed once per source, and
+    their key is written ``code,source_name``. The response carries
+    ``next`` for the following page. Methods are blocking and run in the
+    executor.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def ensure_indexes(self):
+        self.db["courses"].create_index("courseCode")
+        self.db["course_details"].create_index("course_code")
+        self.db["occupations"].create_index("code")
+        self.db["occupations"].create_index([("code", 1), ("source_name", 1)])
+        self.db["courses"].create_index([("course_title", "text")])
+        self.db["occupations"].create_index([("title", "text")])
+
+    def _page(self, collection, keys, query):
+        limit = _limit(query)
+        condition = {keys[0]: {"$exists": True}}
+        if query.get("after"):
+            # Everything after the key in (keys[0], keys[1], ...) order
+            after = query["after"].split(",", len(keys) - 1)
+            alternatives = [
+                {
+                    **{key: value for key, value in zip(keys, after[:i])},
+                    keys[i]: {"$gt": after[i]},
+                }
+                for i in range(len(after))
+            ]
+            condition = (
+                alternatives[0] if len(alternatives) == 1 else {"$or": alternatives}
+            )
+        items = list(
+            self.db[collection]
+            .find(condition, {"_id": 0})
+            .sort([(key, 1) for key in keys])
+            .limit(limit)
+        )
+        next_key = None
+        if len(items) == limit:
+            next_key = ",".join(str(items[-1].get(key, "")) for key in keys)
+        return {"items": items, "next": next_key}
+
+    def courses(self, query):
+        return self._page("courses", ["courseCode"], query)
+
+    def course(self, code):
+        course = self.db["course_details"].find_one({"course_code": code}, {"_id": 0})
+        if course is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"No course {code}")
+        return course
+
+    def occupations(self, query):
+        return self._page("occupations", ["code", "source_name"], query)
+
+    def search(self, query):
+        text = query.get("q", "").strip()
+        if not text:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "q is required")
+        limit = min(_limit(query), DEFAULT_LIMIT)
+        score = {"score": {"$meta": "textScore"}}
+
+        def find(collection):
+            return list(
+                self.db[collection]
+                .find({"$text": {"$search": text}}, {"_id": 0, **score})
+                .sort([("score", {"$meta": "textScore"})])
+                .limit(limit)
+            )
+
+        return {"courses": find("courses"), "occupations": find("occupations")}
+
+
+class ApiServer:
+    """A small HTTP/1.1 server on asyncio streams serving CourseApi as JSON.
+
+    Responses are cached in memory and tagged with the collections they
+    were built from; a background task polls data_versions and drops the
+    tagged entries whenever an importer changes a collection. Every
+    response has an ETag, and ``If-None-Match`` gets a 304.
+    """
+
+    def __init__(self, api, cache, poll_interval=2.0):
+        self.api = api
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.versions = {}
+        self.polled = False
+
+    def route(self, path, query):
+        """Return (handler, cache tags) for a request path."""
+        parts = [unquote(part) for part in path.strip("/").split("/") if part]
+        if parts == ["courses"]:
+            return partial(self.api.courses, query), ("courses",)
+        if len(parts) == 2 and parts[0] == "courses":
+            return partial(self.api.course, parts[1]), ("course_details",)
+        if parts == ["occupations"]:
+            return partial(self.api.occupations, query), ("occupations",)
+        if parts == ["search"]:
+            return partial(self.api.search, query), ("courses", "occupations")
+        raise HttpError(HTTPStatus.NOT_FOUND)
+
+    async def respond(self, target):
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        cache_key = target
+
+        entry = self.cache.get(cache_key)
+        if entry is None:
+            handler, tags = self.route(url.path, query)
+            # An import while the handler runs makes its result stale
+            generation = self.cache.generation(tags)
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, handler)
+            body = json.dumps(result, default=str, ensure_ascii=False).encode()
+            entry = self.cache.put(cache_key, body, tags, generation)
+        return entry
+
+    async def poll_versions(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                versions = await loop.run_in_executor(
+                    None, data_versions, self.api.db
+                )
+                changed = [
+                    name
+                    for name, version in versions.items()
+                    if self.versions.get(name) != version
+                ]
+                # The first poll only learns the versions. A collection
+                # without a version yet is new when an importer adds one.
+                if changed and self.polled:
+                    dropped = self.cache.invalidate(*changed)
+                    logger.info(
+                        f"{', '.join(changed)} changed, "
+                        f"dropped {dropped} cached responses"
+                    )
+                self.versions = versions
+                self.polled = True
+            except Exception as e:
+                logger.warning(f"Could not check data versions: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self.write(writer, HTTPStatus.BAD_REQUEST, keep_alive=False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                # GET bodies carry nothing we use, but must not be read as
+                # the start of the next request
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    await self.write(writer, HTTPStatus.BAD_REQUEST, keep_alive=False)
+                    break
+                if length:
+                    await reader.readexactly(length)
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" and (
+                    version == "HTTP/1.1" or connection == "keep-alive"
+                )
+                await self.handle_request(writer, method, target, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, writer, method, target, headers, keep_alive):
+        if method not in ("GET", "HEAD"):
+            await self.write(
+                writer, HTTPStatus.METHOD_NOT_ALLOWED, keep_alive=keep_alive
+            )
+            return
+        try:
+            entry = await self.respond(target)
+        except HttpError as e:
+            body = json.dumps({"error": str(e)}).encode()
+            await self.write(writer, e.status, body, keep_alive=keep_alive)
+            return
+        except Exception as e:
+            logger.error(f"Error serving {target}: {e}")
+            body = json.dumps({"error": "internal error"}).encode()
+            await self.write(
+                writer, HTTPStatus.INTERNAL_SERVER_ERROR, body, keep_alive=keep_alive
+            )
+            return
+
+        extra = {
+            "ETag": entry.etag,
+            "Cache-Control": f"max-age={self.cache.ttl}",
+        }
+        if entry.etag in headers.get("if-none-match", ""):
+            await self.write(writer, HTTPStatus.NOT_MODIFIED, b"", extra, keep_alive)
+        else:
+            body = b"" if method == "HEAD" else entry.body
+            length = len(entry.body)
+            await self.write(writer, HTTPStatus.OK, body, extra, keep_alive, length)
+
+    async def write(
+        self, writer, status, body=b"", headers=None, keep_alive=True, length=None
+    ):
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        if status != HTTPStatus.NOT_MODIFIED:
+            lines.append("Content-Type: application/json; charset=utf-8")
+            lines.append(f"Content-Length: {len(body) if length is None else length}")
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host, port):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.api.ensure_indexes)
+        poller = asyncio.ensure_future(self.poll_versions())
+        server = await asyncio.start_server(
+            self.handle_connection, host, port, limit=MAX_HEADER_BYTES
+        )
+        logger.info(f"Serving the course API on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            poller.cancel()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve course and occupation data.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--cache-size", type=int, default=1024, help="responses kept in memory"
+    )
+    parser.add_argument(
+        "--cache-ttl", type=int, default=60, help="seconds a cached response is used"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    server = ApiServer(
+        CourseApi(get_database("qut_courses")),
+        ResponseCache(args.cache_size, args.cache_ttl),
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import argparse
 import os
 from pathlib import Path
 
@@ -28,4 +29,5 @@ def cleanup_json_files():
 
 
 if __name__ == "__main__":
+    argparse.ArgumentParser(description="Remove the scraped course JSON files from data/raw.").parse_args()
     cleanup_json_files()
@@ -0,0 +1,102 @@
+"""One entry point for every script in the project.
+
+    qut-courses crawl --resume
+    qut-courses import-courses
+    qut-courses anzsco 26
+
+Each subcommand runs its script as ``__main__`` with the remaining
+arguments, so only that script's modules are imported: ``cleanup`` does
+not pay for scrapy, and ``anzsco`` does not pay for pymongo.
+"""
+import sys
+import runpy
+import argparse
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Subcommand -> (module run as __main__, what it does)
+COMMANDS = {
+    "crawl": ("src.main", "scrape QUT course information"),
+    "course-list": (
+        "src.course_processor.scripts.PCI",
+        "fetch the list of active QUT courses",
+    ),
+    "course": (
+        "src.course_processor.scripts.ECI",
+        "scrape course pages (what crawl runs per batch)",
+    ),
+    "import-courses": (
+        "src.database.mongodb.import_to_mongodb",
+        "import scraped courses into MongoDB",
+    ),
+    "cleanup": ("src.cleanup", "remove the scraped course JSON files"),
+    "show": (
+        "src.database.mongodb.show_mongodb_data",
+        "summarise the course collections",
+    ),
+    "changes": (
+        "src.course_processor.course_changes",
+        "show course changes between scrapes",
+    ),
+    "coverage": (
+        "src.course_processor.coverage_report",
+        "report courses that failed or are missing fields",
+    ),
+    "jobs": ("Job_Board.careerjet_scraper", "scrape job listings from CareerJet"),
+    "import-jobs": ("Job_Board.import_jobs", "import the latest job listings"),
+    "occupations": (
+        "occupations.occupation_scraper",
+        "scrape skilled occupation lists",
+    ),
+    "import-occupations": (
+        "occupations.database.mongodb.import_occupations",
+        "import occupations into MongoDB",
+    ),
+    "show-occupations": (
+        "occupations.database.mongodb.show_occupations",
+        "summarise the occupations collection",
+    ),
+    "anzsco": ("occupations.anzsco", "query the ANZSCO hierarchy"),
+    "pipeline": ("src.run_full_process", "run the full refresh pipeline"),
+    "worker": ("src.crawl_worker", "process queued crawl work"),
+    "export": ("src.database.export_parquet", "export collections to Parquet"),
+    "api": ("src.api_server", "serve the read-only HTTP API"),
+    "daemon": (
+        "src.daemon",
+        "refresh courses, occupations and jobs on a schedule",
+    ),
+}
+
+
+def build_parser():
+    commands = "\n".join(
+        f"  {name:<20}{summary}" for name, (_, summary) in COMMANDS.items()
+    )
+    parser = argparse.ArgumentParser(
+        prog="qut-courses",
+        description="Scrape, import and serve QUT course, occupation and job data.",
+        epilog=f"commands:\n{commands}\n\n"
+        "Run 'qut-courses COMMAND --help' for a command's options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="COMMAND")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    module, _ = COMMANDS[args.command]
+
+    # The scripts import their siblings as src.*, occupations.* and
+    # Job_Board.*, which needs the project root on the path
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    sys.argv = [sys.argv[0], *args.args]
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+
+if __name__ == "__main__":
+    main()
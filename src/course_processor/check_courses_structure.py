@@ -1,11 +1,14 @@
-from pymongo import MongoClient
+import sys
 import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.utils.mongo_client import get_database
 
 
 def check_courses_structure():
     # Connect to MongoDB
-    client = MongoClient("mongodb://localhost:27017/")
-    db = client["qut_courses"]
+    db = get_database("qut_courses")
 
     # Get collections
     courses_collection = db["courses"]
@@ -32,8 +35,6 @@ def check_courses_structure():
     print(f"Courses with list URL: {with_list}")
     print(f"Courses with empty source: {empty}")
 
-    client.close()
-
 
 if __name__ == "__main__":
     check_courses_structure()
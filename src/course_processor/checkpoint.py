@@ -0,0 +1,88 @@
+import os
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+CHECKPOINT_DIR = PROJECT_ROOT / "data" / "checkpoints"
+JOURNAL_FILE = CHECKPOINT_DIR / "crawl_journal.jsonl"
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+
+
+class CrawlJournal:
+    """Append-only JSON Lines journal of finished course crawls.
+
+    One line is written and fsynced as each course completes, so a crawl
+    that dies part way through can be resumed from the last finished course.
+    The latest line for a course code wins.
+    """
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = Path(path)
+        self.entries = {}
+        self._torn_tail = False
+
+    def load(self):
+        """Read the journal, ignoring a torn last line from a crash."""
+        self.entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    self._torn_tail = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping corrupt checkpoint line: {line!r}")
+                        continue
+                    self.entries[entry["course_code"]] = entry
+        except FileNotFoundError:
+            pass
+        return self.entries
+
+    def start_new(self):
+        """Begin a fresh journal, keeping the previous one as a backup."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            os.replace(self.path, self.path.with_suffix(".prev.jsonl"))
+        self.entries = {}
+        self._torn_tail = False
+
+    def record(self, course_code, status, error=None):
+        previous = self.entries.get(course_code, {})
+        entry = {
+            "course_code": course_code,
+            "status": status,
+            "attempts": previous.get("attempts", 0) + 1,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        }
+        if error:
+            entry["error"] = error
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            if self._torn_tail:
+                f.write("\n")
+                self._torn_tail = False
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries[course_code] = entry
+        return entry
+
+    def completed_codes(self):
+        return {
+            code for code, entry in self.entries.items() if entry["status"] == STATUS_OK
+        }
+
+    def failed_codes(self):
+        return {
+            code
+            for code, entry in self.entries.items()
+            if entry["status"] == STATUS_FAILED
+        }
@@ -0,0 +1,80 @@
+import sys
+import json
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.course_processor.snapshots import (
+    CHANGE_ADDED,
+    CHANGE_CHANGED,
+    CHANGE_REMOVED,
+    CourseSnapshots,
+)
+
+
+def describe_change(change):
+    if "old" in change:
+        return f"{change['field']}: {change['old']!r} -> {change['new']!r}"
+    parts = []
+    if change["added"]:
+        parts.append(f"+{change['added']}")
+    if change["removed"]:
+        parts.append(f"-{change['removed']}")
+    return f"{change['field']}: {' '.join(parts)}"
+
+
+def show_course_changes(since, course_code=None, kinds=None, output_file=None):
+    snapshots = CourseSnapshots()
+
+    records = []
+    for record in snapshots.changes_since(since, course_code, kinds):
+        record["changed_at"] = record["changed_at"].strftime("%Y-%m-%d %H:%M:%S")
+        records.append(record)
+
+    counts = {CHANGE_ADDED: 0, CHANGE_CHANGED: 0, CHANGE_REMOVED: 0}
+    for record in records:
+        counts[record["kind"]] += 1
+
+    print(f"\nCourse changes since {since:%Y-%m-%d}:")
+    for kind, count in counts.items():
+        print(f"  {kind}: {count}")
+
+    for record in records:
+        print(f"\n{record['changed_at']} {record['course_code']} [{record['kind']}]")
+        for change in record["changes"]:
+            print(f"  {describe_change(change)}")
+
+    if output_file:
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2, ensure_ascii=False, default=str)
+        print(f"\nFull list has been saved to '{output_file}'")
+
+    snapshots.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Show what changed between crawls.")
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        default=datetime.now() - timedelta(days=7),
+        help="YYYY-MM-DD (default: 7 days ago)",
+    )
+    parser.add_argument("--code", help="only this course")
+    parser.add_argument(
+        "--kind",
+        nargs="+",
+        choices=[CHANGE_ADDED, CHANGE_CHANGED, CHANGE_REMOVED],
+        help="only these kinds of change",
+    )
+    parser.add_argument("--output", help="also save the changes to this JSON file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    show_course_changes(args.since, args.code, args.kind, args.output)
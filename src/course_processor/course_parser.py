@@ -0,0 +1,132 @@
+import json
+from datetime import datetime
+
+from parsel import Selector
+
+from src.utils.normalize import normalize_text
+
+
+class CourseParseError(ValueError):
+    """The page has no course title or course code."""
+
+
+def parse_course_page(html, course_url=None):
+    """Extract a course's details from its rendered page.
+
+    A pure function of the page, so MySpider can run it in a worker
+    process. Raises CourseParseError when the title or code is missing.
+    """
+    page = Selector(text=html)
+
+    # Extract course name
+    course_name = page.css('span[data-course-map-key="courseTitle"]::text').get()
+    course_name = course_name.strip() if course_name else None
+
+    # Extract course code from the ATAR/Selection rank section
+    course_code = page.css('dd[data-course-map-key="reqTabCourseCode"]::text').get()
+    course_code = course_code.strip() if course_code else None
+
+    if not course_name:
+        raise CourseParseError("Course name is missing")
+
+    if not course_code:
+        raise CourseParseError("Course code is missing")
+
+    # Extract durations (Domestic and International)
+    durations = page.css("div.duration-icon li[data-course-audience]")
+    duration_data = []
+    for duration in durations:
+        audience = duration.css("::attr(data-course-audience)").get()  # DOM or INT
+        text = duration.css("::text").get().strip()  # Duration text
+        duration_data.append({"audience": audience, "duration": text})
+
+    # Extract main description
+    main_description = page.css("#details-and-units-tab p::text").get()
+
+    # Extract delivery location
+    delivery_location = page.css(
+        'div.col-sm-10 b:contains("Delivery") + ul li::text'
+    ).get()
+
+    # Extract ATAR/Selection Rank
+    atar_rank = page.css("dd.rank.inverted::text").get()
+
+    # Extract QTAC Code
+    qtac_code = page.css(
+        'b[data-course-audience="DOM"]:contains("QTAC code") + ul li::text'
+    ).get()
+
+    # Extract CRICOS Code
+    cricos_code = page.css(
+        'b[data-course-audience="INT"]:contains("CRICOS") + ul li::text'
+    ).get()
+
+    # Extract details and units
+    details_and_units = page.css("#details-and-units-tab ol li::text").getall()
+    seen = set()
+    cleaned_details_and_units = []
+    for detail in details_and_units:
+        stripped_detail = detail.strip()
+        if stripped_detail and stripped_detail not in seen:
+            cleaned_details_and_units.append(stripped_detail)
+            seen.add(stripped_detail)
+
+    # Extract highlights
+    highlights = page.css(
+        'div.container.course-highlights[data-course-audience="DOM"] ul li::text'
+    ).getall()
+    cleaned_highlights = [
+        normalize_text(highlight.strip())
+        for highlight in highlights
+        if highlight and highlight.strip()
+    ]
+
+    # Extract all sections dynamically
+    panel = page.css("div.panel-content.row")
+    dynamic_sections = {}
+
+    # Go through all .course-detail-item blocks inside this panel
+    for section in panel.css("div.course-detail-item"):
+        audience = section.attrib.get("data-course-audience", "")
+        if "DOM" not in audience:
+            continue  # Skip if it's not for DOM
+
+        # Extract title
+        title = section.css("h3::text").get()
+        title = title.strip() if title else "Untitled Section"
+
+        # Extract all text including inside <a> tags
+        raw_texts = section.xpath(".//p//text()").getall()
+        content = [normalize_text(text.strip()) for text in raw_texts if text.strip()]
+
+        dynamic_sections[title] = content
+
+    # Extract possible careers
+    possible_careers = page.css(
+        'div.course-possible-careers[data-course-map-key="careerOutcomesList"] ul li::text'
+    ).getall()
+    possible_careers = [career.strip() for career in possible_careers if career.strip()]
+
+    if possible_careers:
+        dynamic_sections["Possible Careers"] = possible_careers
+
+    # Extract JSON-LD and get courseCode + identifier
+    json_ld = page.xpath('//script[@type="application/ld+json"]/text()').get()
+    identifier = json.loads(json_ld).get("identifier", None) if json_ld else None
+
+    return {
+        "course_name": course_name,
+        "course_code": course_code,
+        "identifier": identifier,
+        "durations": duration_data,
+        "delivery_location": delivery_location,
+        "atar_rank": atar_rank,
+        "qtac_code": qtac_code,
+        "cricos_code": cricos_code,
+        "main_description": main_description,
+        "details_and_units": cleaned_details_and_units,
+        "highlights": cleaned_highlights,
+        "what_to_expect-careers_and_outcome": dynamic_sections,
+        "url": course_url,
+        "day_obtained": datetime.now().strftime("%Y-%m-%d"),
+    }
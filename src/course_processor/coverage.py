@@ -0,0 +1,141 @@
+import logging
+from datetime import datetime
+from pymongo import UpdateOne
+
+from src.utils.mongo_client import get_client
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = "ok"
+STATUS_MISSING_FIELD = "missing-field"
+STATUS_FAILED = "failed"
+STATUS_FILTERED = "filtered"
+
+# Statuses that mean a course still needs to be (re)crawled
+GAP_STATUSES = (STATUS_MISSING_FIELD, STATUS_FAILED, STATUS_FILTERED)
+
+# Fields a course page must provide before it counts as fully crawled
+REQUIRED_FIELDS = ("durations", "main_description", "delivery_location")
+
+
+def find_missing_fields(course_detail):
+    """Return the required fields that are empty in an extracted course."""
+    return [field for field in REQUIRED_FIELDS if not course_detail.get(field)]
+
+
+class CrawlCoverage:
+    """Per-course crawl status stored in the ``crawl_status`` collection.
+
+    Every course from the active list has exactly one document keyed by
+    ``course_code`` holding its latest status, so "what is missing right
+    now" is a single indexed query on ``status``.
+    """
+
+    def __init__(
+        self,
+        connection_string=None,
+        database_name="qut_courses",
+        client=None,
+    ):
+        self.client = client or get_client(connection_string)
+        self.db = self.client[database_name]
+        self.collection = self.db["crawl_status"]
+
+        self.collection.create_index("course_code", unique=True)
+        self.collection.create_index([("status", 1), ("updated_at", 1)])
+
+    def seed_courses(self, courses):
+        """Register courses from courses.json without touching known statuses.
+
+        New courses start as ``filtered``: listed but not yet crawled.
+        """
+        now = datetime.now()
+        operations = []
+        for course in courses:
+            course_code = course.get("courseCode")
+            if not course_code:
+                continue
+            operations.append(
+                UpdateOne(
+                    {"course_code": course_code},
+                    {
+                        "$set": {"course_title": course.get("course_title", "")},
+                        "$setOnInsert": {
+                            "status": STATUS_FILTERED,
+                            "attempts": 0,
+                            "first_seen": now,
+                            "updated_at": now,
+                        },
+                    },
+                    upsert=True,
+                )
+            )
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def record(self, course_code, status, **fields):
+        """Record the outcome of a crawl attempt for one course."""
+        now = datetime.now()
+        update = {
+            "$set": {"status": status, "updated_at": now, **fields},
+            "$setOnInsert": {"first_seen": now},
+        }
+        if status != STATUS_FILTERED:
+            update["$inc"] = {"attempts": 1}
+        if status == STATUS_OK:
+            update["$set"]["last_success"] = now
+            update["$unset"] = {"error": "", "missing_fields": ""}
+        try:
+            self.collection.update_one(
+                {"course_code": course_code}, update, upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error recording crawl status for {course_code}: {e}")
+
+    def gaps(self, statuses=GAP_STATUSES):
+        """Return a cursor over courses whose latest status is a gap."""
+        return self.collection.find(
+            {"status": {"$in": list(statuses)}},
+            {"_id": 0},
+        ).sort("course_code", 1)
+
+    def gap_codes(self, statuses=GAP_STATUSES):
+        return [course["course_code"] for course in self.gaps(statuses)]
+
+    def last_success_dates(self):
+        """Return course code -> datetime of the last successful crawl."""
+        return {
+            course["course_code"]: course["last_success"]
+            for course in self.collection.find(
+                {"last_success": {"$exists": True}},
+                {"_id": 0, "course_code": 1, "last_success": 1},
+            )
+        }
+
+    def status_counts(self):
+        counts = {}
+        for row in self.collection.aggregate(
+            [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        ):
+            counts[row["_id"]] = row["count"]
+        return counts
+
+    def close(self):
+        # The client is shared by the whole process and closed at exit
+        self.client = self.db = self.collection = None
+
+
+def connect_coverage(**kwargs):
+    """Return a CrawlCoverage, or None when MongoDB is unreachable.
+
+    Coverage tracking must never stop a crawl, so connection problems are
+    logged and tracking is simply switched off.
+    """
+    try:
+        coverage = CrawlCoverage(**kwargs)
+        coverage.client.admin.command("ping")
+        return coverage
+    except Exception as e:
+        logger.warning(f"Crawl coverage tracking disabled: {e}")
+        return None
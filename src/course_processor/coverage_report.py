@@ -0,0 +1,47 @@
+import argparse
+import sys
+import json
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.course_processor.coverage import GAP_STATUSES, CrawlCoverage
+
+
+def show_coverage_report(output_file="coverage_gaps.json"):
+    coverage = CrawlCoverage()
+
+    counts = coverage.status_counts()
+    gaps = []
+    for course in coverage.gaps():
+        for key in ("first_seen", "updated_at", "last_success"):
+            if key in course:
+                course[key] = course[key].strftime("%Y-%m-%d %H:%M:%S")
+        gaps.append(course)
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(gaps, f, indent=2, ensure_ascii=False)
+
+    print(f"\nCrawl coverage:")
+    print(f"Total tracked courses: {sum(counts.values())}")
+    for status, count in sorted(counts.items()):
+        print(f"  {status}: {count}")
+
+    print(f"\nCourses still missing ({', '.join(GAP_STATUSES)}): {len(gaps)}")
+    for course in gaps[:10]:
+        detail = course.get("error") or ", ".join(course.get("missing_fields", []))
+        print(
+            f"- {course['course_code']} [{course['status']}] "
+            f"{course.get('course_title', '')} {detail}".rstrip()
+        )
+
+    print(f"\nFull list has been saved to '{output_file}'")
+
+    coverage.close()
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description="Report courses that failed or are missing fields.").parse_args()
+    show_coverage_report()
@@ -1,65 +1,121 @@
 import json
-from pymongo import MongoClient
+import sys
+import time
 import os
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.utils.mongo_client import get_database
+
+
+def ensure_indexes(db):
+    """Create the indexes the filtered-courses lookup relies on."""
+    db["courses"].create_index("courseCode")
+    db["course_details"].create_index("course_code")
+    db["not_courses"].create_index("course_code")
+
+
+def filtered_courses_pipeline():
+    """Aggregation returning courses with no details and no not_courses entry.
+
+    Each $lookup is an indexed point query on ``course_code`` that stops at
+    the first match, so the difference is computed entirely on the server.
+    """
+
+    def lookup(collection, alias):
+        return {
+            "$lookup": {
+                "from": collection,
+                "let": {"code": "$courseCode"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$course_code", "$$code"]}}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 1}},
+                ],
+                "as": alias,
+            }
+        }
+
+    return [
+        {"$match": {"courseCode": {"$exists": True, "$nin": [None, ""]}}},
+        lookup("course_details", "_details"),
+        {"$match": {"_details": {"$size": 0}}},
+        lookup("not_courses", "_not_courses"),
+        {"$match": {"_not_courses": {"$size": 0}}},
+        {
+            "$project": {
+                "_id": 0,
+                "course_code": "$courseCode",
+                "course_title": {"$ifNull": ["$course_title", ""]},
+                "day_obtained": {"$ifNull": ["$day_obtained", ""]},
+                "import_date": {"$ifNull": ["$import_date", ""]},
+            }
+        },
+    ]
+
+
+def write_json_array(file, items, indent=2):
+    """Stream items to file as a JSON array, matching json.dump formatting."""
+    count = 0
+    pad = " " * indent
+    for item in items:
+        file.write("[\n" if count == 0 else ",\n")
+        body = json.dumps(item, indent=indent, ensure_ascii=False)
+        file.write("\n".join(pad + line for line in body.splitlines()))
+        count += 1
+    file.write("\n]" if count else "[]")
+    return count
 
 
 def find_filtered_courses():
+    start_time = time.perf_counter()
+
     # Connect to MongoDB
-    client = MongoClient("mongodb://localhost:27017/")
-    db = client["qut_courses"]
+    db = get_database("qut_courses")
 
     # Get all collections
     courses_collection = db["courses"]
     details_collection = db["course_details"]
     not_courses_collection = db["not_courses"]
 
+    ensure_indexes(db)
+
     # Get counts
-    total_courses = courses_collection.count_documents({})
-    processed_courses = details_collection.count_documents({})
-    unprocessed_courses = not_courses_collection.count_documents({})
-
-    # Get all course codes from processed and unprocessed courses
-    processed_codes = set()
-    for course in details_collection.find({}, {"course_code": 1}):
-        processed_codes.add(course["course_code"])
-
-    for course in not_courses_collection.find({}, {"course_code": 1}):
-        if "course_code" in course:
-            processed_codes.add(course["course_code"])
-
-    # Find filtered courses
-    filtered_courses = []
-    for course in courses_collection.find({}):
-        course_code = course.get("courseCode")
-        if course_code and course_code not in processed_codes:
-            filtered_courses.append(
-                {
-                    "course_code": course_code,
-                    "course_title": course.get("course_title", ""),
-                    "day_obtained": course.get("day_obtained", ""),
-                    "import_date": course.get("import_date", ""),
-                }
-            )
+    total_courses = courses_collection.estimated_document_count()
+    processed_courses = details_collection.estimated_document_count()
+    unprocessed_courses = not_courses_collection.estimated_document_count()
+
+    # Find filtered courses on the server and stream them straight to disk
+    cursor = courses_collection.aggregate(
+        filtered_courses_pipeline(), allowDiskUse=True, batchSize=500
+    )
+    sample = []
+
+    def collect_sample(results):
+        for course in results:
+            if len(sample) < 5:
+                sample.append(course)
+            yield course
 
     # Save to JSON file
     with open("filtered_courses.json", "w", encoding="utf-8") as f:
-        json.dump(filtered_courses, f, indent=2, ensure_ascii=False)
+        filtered_count = write_json_array(f, collect_sample(cursor))
+
+    elapsed = time.perf_counter() - start_time
 
     print(f"\nAnalysis results:")
     print(f"Total courses in database: {total_courses}")
     print(f"Successfully processed courses: {processed_courses}")
     print(f"Unprocessed courses: {unprocessed_courses}")
-    print(f"Filtered out courses: {len(filtered_courses)}")
+    print(f"Filtered out courses: {filtered_count}")
 
-    if filtered_courses:
+    if sample:
         print("\nSample of filtered courses:")
-        for course in filtered_courses[:5]:
+        for course in sample:
             print(f"- {course['course_code']}: {course['course_title']}")
 
     print("\nFull list has been saved to 'filtered_courses.json'")
-
-    # Close MongoDB connection
-    client.close()
+    print(f"Completed in {elapsed:.2f} seconds")
 
 
 if __name__ == "__main__":
@@ -1,12 +1,15 @@
 import json
-from pymongo import MongoClient
+import sys
 import os
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.utils.mongo_client import get_database
 
 
 def find_courses_with_missing_details():
     # Connect to MongoDB
-    client = MongoClient("mongodb://localhost:27017/")
-    db = client["qut_courses"]
+    db = get_database("qut_courses")
 
     # Get collections
     not_courses_collection = db["not_courses"]
@@ -31,6 +34,7 @@ def find_courses_with_missing_details():
     for course in not_courses:
         unprocessed_courses.append(
             {
+                "course_code": course.get("course_code", ""),
                 "url": course.get("url", ""),
                 "error": course.get("error", ""),
                 "import_date": course.get("import_date", ""),
@@ -56,9 +60,6 @@ def find_courses_with_missing_details():
 
     print("\nFull list has been saved to 'unprocessed_courses.json'")
 
-    # Close MongoDB connection
-    client.close()
-
 
 if __name__ == "__main__":
     find_courses_with_missing_details()
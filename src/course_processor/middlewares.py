@@ -0,0 +1,185 @@
+import json
+import logging
+from pathlib import Path
+
+from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.defer import maybe_deferred_to_future
+
+from src.utils.http_cache import CacheMiss, HttpCache
+from src.utils.metrics import FETCH_SECONDS, RESPONSE_BYTES, THROTTLE_WAIT_SECONDS
+from src.utils.throttle import AdaptiveThrottle, host_of
+
+logger = logging.getLogger(__name__)
+
+# Pages and the redirects leading to them
+CACHED_STATUSES = (200, 301, 302, 303, 307, 308)
+
+
+class MetricsDownloaderMiddleware:
+    """Records download latency and response size for every request.
+
+    Scrapy stores the time from sending the request to receiving the
+    response in ``request.meta["download_latency"]``. No Splash server is
+    configured, so SplashRequests are fetched directly and this is the
+    plain download time.
+    """
+
+    def process_response(self, request, response, spider):
+        if "cached" in response.flags:
+            return response
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            FETCH_SECONDS.observe(latency, spider=spider.name)
+        RESPONSE_BYTES.observe(len(response.body), spider=spider.name)
+        return response
+
+
+class DiskCacheMiddleware:
+    """Serves responses from the on-disk HTTP cache (src/utils/http_cache.py).
+
+    It sits after Scrapy's retry, redirect and cookie middlewares, so it
+    is keyed on the request that goes over the wire, and no Splash server
+    is configured, so that is the page request itself. Redirects are cached
+    along with pages, so a replay follows the same redirects to the cached
+    page. Enabled with the HTTP_CACHE_ENABLED / HTTP_CACHE_OFFLINE settings
+    or $QUT_HTTP_CACHE. In offline mode a miss fails the request instead of
+    fetching it.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        cache = HttpCache.from_env(
+            enabled=crawler.settings.getbool("HTTP_CACHE_ENABLED"),
+            offline=crawler.settings.getbool("HTTP_CACHE_OFFLINE"),
+        )
+        if cache is None:
+            raise NotConfigured
+        return cls(cache)
+
+    def process_request(self, request, spider):
+        key = HttpCache.key(request.method, request.url, request.body)
+        try:
+            entry = self.cache.get(key)
+        except CacheMiss as e:
+            raise IgnoreRequest(f"Offline and {request.url} is not cached") from e
+        if entry is None:
+            return None
+
+        headers = Headers(entry["headers"])
+        response_class = responsetypes.from_args(
+            headers=headers, url=entry["url"], body=entry["body"]
+        )
+        return response_class(
+            url=entry["url"],
+            status=entry["status"],
+            headers=headers,
+            body=entry["body"],
+            flags=["cached"],
+            request=request,
+        )
+
+    def process_response(self, request, response, spider):
+        if "cached" in response.flags or response.status not in CACHED_STATUSES:
+            return response
+        key = HttpCache.key(request.method, request.url, request.body)
+        headers = {
+            name.decode("latin-1"): [value.decode("latin-1") for value in values]
+            for name, values in response.headers.items()
+        }
+        try:
+            self.cache.put(key, response.url, response.status, headers, response.body)
+        except OSError as e:
+            spider.logger.warning(f"Could not cache {response.url}: {e}")
+        return response
+
+
+class ThrottleDownloaderMiddleware:
+    """Paces every request with an AdaptiveThrottle (src/utils/throttle.py).
+
+    Each request waits in process_request for its host's next slot, and
+    each response or transport error is fed back with its download latency,
+    so the delay adapts request by request, a Retry-After holds the host
+    back and an open circuit pauses the crawl until its probe. It sits
+    before RetryMiddleware in the response chain, so a retried 429/503
+    waits out the Retry-After instead of going straight back. Responses
+    from the HTTP cache are neither paced nor recorded.
+
+    THROTTLE_MIN_DELAY caps the rate, and with THROTTLE_STATE_FILE set the
+    throttle starts from the state the previous run saved there and saves
+    its own when the spider closes.
+    """
+
+    def __init__(self, throttle, state_file=None):
+        self.throttle = throttle
+        self.state_file = Path(state_file) if state_file else None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        throttle = AdaptiveThrottle(
+            initial_delay=settings.getfloat("THROTTLE_INITIAL_DELAY", 1.0),
+            min_delay=settings.getfloat("THROTTLE_MIN_DELAY", 0.25),
+            name=crawler.spidercls.name,
+        )
+        middleware = cls(throttle, settings.get("THROTTLE_STATE_FILE"))
+        middleware.load_state()
+        crawler.signals.connect(middleware.save_state, signal=signals.spider_closed)
+        return middleware
+
+    def load_state(self):
+        if self.state_file is None:
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                self.throttle.restore(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable throttle state {self.state_file}: {e}")
+
+    def save_state(self, spider):
+        logger.info(f"Throttle state: {self.throttle.snapshot()}")
+        if self.state_file is None:
+            return
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_file, "w", encoding="utf-8") as f:
+                json.dump(self.throttle.dump(), f)
+        except OSError as e:
+            logger.warning(f"Could not save the throttle state: {e}")
+
+    async def process_request(self, request, spider):
+        from twisted.internet import reactor
+        from twisted.internet.task import deferLater
+
+        delay = self.throttle.reserve(host_of(request.url))
+        THROTTLE_WAIT_SECONDS.observe(delay, throttle=self.throttle.name)
+        if delay > 0:
+            await maybe_deferred_to_future(deferLater(reactor, delay, lambda: None))
+        return None
+
+    def process_response(self, request, response, spider):
+        if "cached" in response.flags:
+            return response
+        retry_after = response.headers.get("Retry-After")
+        # Only 429/503 count against the host; any other status is the
+        # site answering
+        self.throttle.record(
+            host_of(request.url),
+            request.meta.get("download_latency"),
+            status=response.status,
+            retry_after=retry_after.decode("latin-1") if retry_after else None,
+        )
+        return response
+
+    def process_exception(self, request, exception, spider):
+        # IgnoreRequest is an offline cache miss, not the site failing
+        if not isinstance(exception, IgnoreRequest):
+            self.throttle.record(host_of(request.url), None, ok=False)
+        return None
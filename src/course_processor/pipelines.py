@@ -0,0 +1,151 @@
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from pymongo import UpdateOne
+
+from src.course_processor.coverage import STATUS_FAILED
+from src.course_processor.snapshots import CourseSnapshots
+from src.utils.metrics import MONGO_WRITE_SECONDS
+from src.utils.mongo_client import bump_data_version, get_client
+
+logger = logging.getLogger(__name__)
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+RAW_DIR = PROJECT_ROOT / "data" / "raw"
+
+
+def write_course_file(item):
+    """Write a course to data/raw/<course_code>.json for import_to_mongodb.py."""
+    if item.get("course_code"):
+        output_file = RAW_DIR / f"{item['course_code']}.json"
+    else:
+        output_file = RAW_DIR / f"{item['course_name'].replace(' ', '_').lower()}.json"
+
+    try:
+        RAW_DIR.mkdir(parents=True, exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(item, f, indent=4, ensure_ascii=False)
+    except Exception as e:
+        logger.error(f"Error writing to {output_file}: {e}")
+
+
+class JsonFilePipeline:
+    """Writes each course to data/raw/<course_code>.json for import_to_mongodb.py."""
+
+    def process_item(self, item, spider):
+        write_course_file(item)
+        return item
+
+
+class MongoBatchPipeline:
+    """Upserts courses into course_details in batches while the crawl runs.
+
+    Items are buffered and written with one bulk_write per MONGO_BATCH_SIZE
+    items (and once more when the spider closes), so data is queryable
+    without the separate file import pass. Each written batch is also
+    compared with course_versions, recording the course history that
+    import_to_mongodb.py would otherwise record from the files.
+
+    The crawl may run with this as its only sink, so no course is dropped:
+    if MongoDB cannot be reached the courses go to data/raw/<code>.json
+    instead, and the courses of a batch that fails to write are saved there
+    too and recorded as failed, so the crawl tries them again.
+    """
+
+    def __init__(self, mongo_uri, mongo_database, batch_size):
+        self.mongo_uri = mongo_uri
+        self.mongo_database = mongo_database
+        self.batch_size = batch_size
+        self.client = None
+        self.collection = None
+        self.snapshots = None
+        self.buffer = []
+        self.details = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            crawler.settings.get("MONGO_URI"),
+            crawler.settings.get("MONGO_DATABASE", "qut_courses"),
+            crawler.settings.getint("MONGO_BATCH_SIZE", 50),
+        )
+
+    def open_spider(self, spider):
+        try:
+            self.client = get_client(self.mongo_uri)
+            self.collection = self.client[self.mongo_database]["course_details"]
+            self.collection.create_index("course_code")
+            self.snapshots = CourseSnapshots(
+                database_name=self.mongo_database, client=self.client
+            )
+        except Exception as e:
+            logger.warning(f"MongoDB sink disabled: {e}")
+            self.client = self.collection = self.snapshots = None
+
+    def process_item(self, item, spider):
+        if self.collection is None or not item.get("course_code"):
+            write_course_file(item)
+            return item
+
+        document = dict(item)
+        document["import_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.buffer.append(
+            UpdateOne(
+                {"course_code": document["course_code"]},
+                {"$set": document},
+                upsert=True,
+            )
+        )
+        self.details.append(document)
+        if len(self.buffer) >= self.batch_size:
+            self.flush(spider)
+        return item
+
+    def save_unwritten(self, spider, error):
+        """Keep a batch MongoDB refused on disk and mark its courses failed."""
+        record_status = getattr(spider, "record_status", None)
+        for document in self.details:
+            item = {k: v for k, v in document.items() if k != "import_date"}
+            write_course_file(item)
+            if record_status:
+                record_status(
+                    item["course_code"],
+                    STATUS_FAILED,
+                    url=item.get("url"),
+                    error=f"Could not write the course to MongoDB: {error}",
+                )
+
+    def flush(self, spider):
+        if not self.buffer:
+            return
+        try:
+            with MONGO_WRITE_SECONDS.time(collection="course_details"):
+                result = self.collection.bulk_write(self.buffer, ordered=False)
+            logger.info(
+                f"Wrote {len(self.buffer)} courses to course_details "
+                f"({result.upserted_count} new, {result.modified_count} updated)"
+            )
+        except Exception as e:
+            logger.error(f"Error writing {len(self.buffer)} courses to MongoDB: {e}")
+            self.save_unwritten(spider, e)
+        else:
+            try:
+                counts = self.snapshots.record(self.details)
+                logger.info(
+                    f"Course changes: {counts['added']} added, "
+                    f"{counts['changed']} changed, {counts['unchanged']} unchanged"
+                )
+            except Exception as e:
+                logger.error(f"Error recording course versions: {e}")
+        self.buffer = []
+        self.details = []
+
+    def close_spider(self, spider):
+        if self.collection is not None:
+            self.flush(spider)
+            try:
+                bump_data_version(self.collection.database, "course_details")
+            except Exception as e:
+                logger.warning(f"Could not update the course_details version: {e}")
@@ -3,13 +3,10 @@ import sys
 import scrapy
 from scrapy_splash import SplashRequest
 from scrapy.crawler import CrawlerProcess
-import subprocess
-from datetime import datetime
-import re
+from scrapy.exceptions import IgnoreRequest
+from scrapy.spidermiddlewares.httperror import HttpError
 import json
-import unicodedata
-import pdfplumber
-import requests
+import argparse
 from pathlib import Path
 
 # Get the project root directory
@@ -17,47 +14,159 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 RAW_DIR = DATA_DIR / "raw"
 
-# Create data directories if they don't exist
-RAW_DIR.mkdir(parents=True, exist_ok=True)
+sys.path.insert(0, str(PROJECT_ROOT))
+from src.course_processor.coverage import (
+    STATUS_FAILED,
+    STATUS_MISSING_FIELD,
+    STATUS_OK,
+    connect_coverage,
+    find_missing_fields,
+)
+from src.course_processor.course_parser import CourseParseError, parse_course_page
+from src.utils.http_cache import CacheMiss, is_offline
+from src.utils.metrics import ITEMS_TOTAL, PARSE_SECONDS, REGISTRY, RETRIES_TOTAL
+from src.utils.parse_pool import ParsePool, default_workers, deferred_from_future
+from src.utils.profiling import enable_from_env, profile_stage
+
+# Item pipelines: per-course JSON files for import_to_mongodb.py and batched
+# upserts straight into course_details while the crawl runs
+FILE_SINK = "src.course_processor.pipelines.JsonFilePipeline"
+MONGO_SINK = "src.course_processor.pipelines.MongoBatchPipeline"
+METRICS_MIDDLEWARE = "src.course_processor.middlewares.MetricsDownloaderMiddleware"
+# After the retry, redirect and cookie middlewares, so the cache sees each
+# request as it is sent
+CACHE_MIDDLEWARE = "src.course_processor.middlewares.DiskCacheMiddleware"
+# After the cache, so only requests that go to the site are paced, and
+# before RetryMiddleware in the response chain, so retries wait too
+THROTTLE_MIDDLEWARE = "src.course_processor.middlewares.ThrottleDownloaderMiddleware"
+
+# Responses that mean the page is gone; retrying the course will not help
+GONE_STATUSES = (404, 410)
 
 
 class MySpider(scrapy.Spider):
     name = "course_spider"
     custom_settings = {
         "USER_AGENT": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36",
+        "MONGO_BATCH_SIZE": 50,
+        "DOWNLOADER_MIDDLEWARES": {
+            CACHE_MIDDLEWARE: 900,
+            THROTTLE_MIDDLEWARE: 925,
+            METRICS_MIDDLEWARE: 950,
+        },
+        # The throttle paces the QUT site at one page a second at most,
+        # slower when it struggles, instead of Scrapy's fixed delay
+        "DOWNLOAD_DELAY": 0,
+        "AUTOTHROTTLE_ENABLED": False,
+        "THROTTLE_INITIAL_DELAY": 1.0,
+        "THROTTLE_MIN_DELAY": 1.0,
     }
 
-    def __init__(self, courseLink=None, *args, **kwargs):
+    def __init__(self, courseLink=None, courseCode=None, courses=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.courseLink = courseLink
+        # Either one course (courseLink/courseCode) or a list of
+        # {"courseCode", "url"} dicts crawled in the same process
+        if courses is None:
+            courses = [{"courseCode": courseCode, "url": courseLink}]
+        self.courses = courses
+        self.coverage = (
+            connect_coverage() if any(c.get("courseCode") for c in courses) else None
+        )
+        self.statuses = {}
+        self.parse_pool = None
+        self.results_file = None
 
     def start_requests(self):
-        if self.courseLink:
-            yield SplashRequest(
-                url=self.courseLink,
-                callback=self.parse,
-                args={"wait": 10},  # Adjust wait time if needed
-            )
+        # main.py reads each course's outcome from here
+        self.results_file = self.settings.get("RESULTS_FILE")
+        # PARSE_WORKERS=0 parses inline. No bound on pending parses: Scrapy
+        # stops downloading while too many responses wait on callbacks
+        self.parse_pool = ParsePool(
+            self.settings.getint("PARSE_WORKERS", 0), max_pending=0
+        )
+        for course in self.courses:
+            meta = {
+                "course_code": course.get("courseCode"),
+                "course_url": course.get("url"),
+            }
+            if course.get("url") is False:
+                # The URL resolver found no page, skip the request entirely
+                self.handle_missing_course(
+                    None,
+                    course.get("error", "No course page found for course"),
+                    course_code=meta["course_code"],
+                    permanent=True,
+                )
+            elif course.get("url"):
+                yield SplashRequest(
+                    url=course["url"],
+                    callback=self.parse,
+                    errback=self.handle_request_error,
+                    args={"wait": 10},  # Adjust wait time if needed
+                    meta=meta,
+                )
+            else:
+                self.logger.error("No course link provided.")
+
+    @property
+    def status(self):
+        """Overall outcome: failed unless every course was scraped."""
+        statuses = [self.statuses.get(c.get("courseCode")) for c in self.courses]
+        if not statuses or None in statuses or STATUS_FAILED in statuses:
+            return STATUS_FAILED
+        return STATUS_OK
+
+    def closed(self, reason):
+        if self.parse_pool:
+            self.parse_pool.shutdown()
+        if self.coverage:
+            self.coverage.close()
+        retries = self.crawler.stats.get_value("retry/count", 0)
+        if retries:
+            RETRIES_TOTAL.inc(retries, spider=self.name)
+        # Hand the crawl metrics to main.py when it asked for them
+        REGISTRY.write_child_snapshot()
+
+    def record_status(self, course_code, status, url=None, permanent=False, **fields):
+        """Record a course's outcome in crawl_status and the results file.
+
+        ``permanent`` marks failures that another attempt would repeat.
+        """
+        self.statuses[course_code] = status
+        if self.coverage and course_code:
+            self.coverage.record(course_code, status, url=url or None, **fields)
+        if self.results_file and course_code:
+            result = {
+                "course_code": course_code,
+                "status": status,
+                "permanent": permanent,
+                **fields,
+            }
+            with open(self.results_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result, default=str) + "\n")
+
+    def handle_request_error(self, failure):
+        meta = failure.request.meta
+        if failure.check(HttpError):
+            permanent = failure.value.response.status in GONE_STATUSES
         else:
-            self.logger.error("No course link provided.")
-
-    @staticmethod
-    def normalize_text(text):
-        # Replace smart quotes and other typographic characters with ASCII equivalents
-        text = text.replace(
-            """,'"')  # right single quote
-        text = text.replace(""",
-            '"',
-        )  # left single quote
-        text = text.replace('"', '"')  # left double quote
-        text = text.replace('"', '"')  # right double quote
-        text = unicodedata.normalize("NFKC", text)  # normalize Unicode
-        return text
+            # IgnoreRequest is an offline cache miss; other errors are
+            # timeouts and connection failures worth another attempt
+            permanent = failure.check(IgnoreRequest) is not None
+        self.handle_missing_course(
+            meta.get("course_url"),
+            repr(failure.value),
+            course_code=meta.get("course_code"),
+            permanent=permanent,
+        )
 
     #    Handles courses with missing data by logging and saving to `not_courses.json`
-    def handle_missing_course(self, url, error_message, missing_fields=None):
+    def handle_missing_course(
+        self, url, error_message, missing_fields=None, course_code=None, permanent=False
+    ):
         missing_course = {
             "url": url,
+            "course_code": course_code,
             "error": error_message,
         }
         if missing_fields:
@@ -75,6 +184,9 @@ class MySpider(scrapy.Spider):
         with open(not_courses_file, "w", encoding="utf-8") as f:
             json.dump(not_courses, f, indent=4)
 
+        self.record_status(
+            course_code, STATUS_FAILED, url=url, permanent=permanent, error=error_message
+        )
         self.logger.warning(f"Missing or invalid course data for URL: {url}")
 
     def parse(self, response):
@@ -82,171 +194,179 @@ class MySpider(scrapy.Spider):
         with open(response_file, "w", encoding="utf-8") as f:
             f.write(response.text)
 
-        try:
-            # Extract course name
-            course_name = response.css(
-                'span[data-course-map-key="courseTitle"]::text'
-            ).get()
-            course_name = course_name.strip() if course_name else None
-
-            course_code = response.css(
-                'dd[data-course-map-key="reqTabCourseCode"]::text'
-            ).get()
-            course_code = course_code.strip() if course_code else None
-
-            if not course_name:
-                raise ValueError("Course name is missing")
-
-            if not course_code:
-                raise ValueError("Course code is missing")
-
-        except Exception as e:
-            self.handle_missing_course(response.url, str(e))
-            return  # Exit early
-
-        # Extract course code from the ATAR/Selection rank section
-        course_code = response.css(
-            'dd[data-course-map-key="reqTabCourseCode"]::text'
-        ).get()
-        course_code = course_code.strip()
-
-        # Extract durations (Domestic and International)
-        durations = response.css("div.duration-icon li[data-course-audience]")
-        duration_data = []
-        for duration in durations:
-            audience = duration.css("::attr(data-course-audience)").get()  # DOM or INT
-            text = duration.css("::text").get().strip()  # Duration text
-            duration_data.append({"audience": audience, "duration": text})
-
-        # Extract main description
-        main_description = response.css("#details-and-units-tab p::text").get()
-
-        # Extract delivery location
-        delivery_location = response.css(
-            'div.col-sm-10 b:contains("Delivery") + ul li::text'
-        ).get()
-
-        # Extract ATAR/Selection Rank
-        atar_rank = response.css("dd.rank.inverted::text").get()
-
-        # Extract QTAC Code
-        qtac_code = response.css(
-            'b[data-course-audience="DOM"]:contains("QTAC code") + ul li::text'
-        ).get()
-
-        # Extract CRICOS Code
-        cricos_code = response.css(
-            'b[data-course-audience="INT"]:contains("CRICOS") + ul li::text'
-        ).get()
-
-        # Extract details and units
-        details_and_units = response.css("#details-and-units-tab ol li::text").getall()
-        seen = set()
-        cleaned_details_and_units = []
-        for detail in details_and_units:
-            stripped_detail = detail.strip()
-            if stripped_detail and stripped_detail not in seen:
-                cleaned_details_and_units.append(stripped_detail)
-                seen.add(stripped_detail)
-
-        # Extract highlights
-        highlights = response.css(
-            'div.container.course-highlights[data-course-audience="DOM"] ul li::text'
-        ).getall()
-        cleaned_highlights = [
-            MySpider.normalize_text(highlight.strip())
-            for highlight in highlights
-            if highlight and highlight.strip()
-        ]
-
-        # Extract all sections dynamically
-        panel = response.css("div.panel-content.row")
-        dynamic_sections = {}
-
-        # Go through all .course-detail-item blocks inside this panel
-        for section in panel.css("div.course-detail-item"):
-            audience = section.attrib.get("data-course-audience", "")
-            if "DOM" not in audience:
-                continue  # Skip if it's not for DOM
-
-            # Extract title
-            title = section.css("h3::text").get()
-            title = title.strip() if title else "Untitled Section"
-
-            # Extract all text including inside <a> tags
-            raw_texts = section.xpath(".//p//text()").getall()
-            content = [
-                MySpider.normalize_text(text.strip())
-                for text in raw_texts
-                if text.strip()
-            ]
-
-            dynamic_sections[title] = content
-
-        # Extract possible careers
-        possible_careers = response.css(
-            'div.course-possible-careers[data-course-map-key="careerOutcomesList"] ul li::text'
-        ).getall()
-        possible_careers = [
-            career.strip() for career in possible_careers if career.strip()
-        ]
-
-        if possible_careers:
-            dynamic_sections["Possible Careers"] = possible_careers
-
-        # Extract JSON-LD and get courseCode + identifier
-        json_ld = response.xpath('//script[@type="application/ld+json"]/text()').get()
-        identifier = json.loads(json_ld).get("identifier", None) if json_ld else None
-
-        # Build the extracted data dictionary
-        extracted_data = {
-            "course_name": course_name,
-            "course_code": course_code,
-            "identifier": identifier,
-            "durations": duration_data,
-            "delivery_location": delivery_location,
-            "atar_rank": atar_rank,
-            "qtac_code": qtac_code,
-            "cricos_code": cricos_code,
-            "main_description": main_description,
-            "details_and_units": cleaned_details_and_units,
-            "highlights": cleaned_highlights,
-            "what_to_expect-careers_and_outcome": dynamic_sections,
-            "url": self.courseLink,
-            "day_obtained": datetime.now().strftime("%Y-%m-%d"),
-        }
-
-        # Save the extracted data to a separate JSON file for each course
-        if course_code:
-            output_file = RAW_DIR / f"{course_code}.json"
+        # Parsing is CPU-bound, so it runs in the parse pool while the
+        # reactor carries on downloading
+        future = self.parse_pool.submit(
+            parse_course_page, response.text, response.meta.get("course_url")
+        )
+        d = deferred_from_future(future)
+        d.addCallbacks(
+            self.handle_parsed,
+            self.handle_parse_error,
+            callbackArgs=(response,),
+            errbackArgs=(response,),
+        )
+        return d
+
+    def handle_parsed(self, result, response):
+        extracted_data, parse_seconds = result
+
+        listed_code = response.meta.get("course_code")
+        missing_fields = find_missing_fields(extracted_data)
+        if missing_fields:
+            self.record_status(
+                listed_code,
+                STATUS_MISSING_FIELD,
+                url=extracted_data["url"],
+                missing_fields=missing_fields,
+            )
         else:
-            output_file = RAW_DIR / f"{course_name.replace(' ', '_').lower()}.json"
-
-        try:
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(extracted_data, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error writing to {output_file}: {e}")
-
-        # Yield the extracted data as output
-        yield extracted_data
-
-
-# Access arguments passed to the script
-course_code = sys.argv[1]  # First argument
-course_title = sys.argv[2]  # Second argument
-
-
-course_title = re.sub(r"\s+", "-", course_title).lower()
-course_title = re.sub(r"-{2,}", "-", course_title)  # Remove extra dashes
-course_title = re.sub(r"[()]", "", course_title)  # Remove parentheses
-
-courseLink = f"https://www.qut.edu.au/courses/{course_title}"
-# courseLink = f"http://127.0.0.1:5500/scripts/responseForCourse.html"
-
-# print(f"Processing course: {course_code} - {courseLink}")
+            self.record_status(listed_code, STATUS_OK, url=extracted_data["url"])
+
+        PARSE_SECONDS.observe(parse_seconds, spider=self.name)
+        ITEMS_TOTAL.inc(spider=self.name)
+
+        # Hand the extracted data to the file and MongoDB pipelines
+        return [extracted_data]
+
+    def handle_parse_error(self, failure, response):
+        failure.trap(CourseParseError)
+        # The page was fetched fine; parsing it again gives the same error
+        self.handle_missing_course(
+            response.url,
+            str(failure.value),
+            course_code=response.meta.get("course_code"),
+            permanent=True,
+        )
+        return []
+
+
+def main():
+    # Access arguments passed to the script
+    parser = argparse.ArgumentParser(description="Scrape QUT course pages.")
+    parser.add_argument("course_code", nargs="?")
+    parser.add_argument("course_title", nargs="?")
+    parser.add_argument(
+        "course_url", nargs="?", help="page URL found by sitemap discovery"
+    )
+    parser.add_argument(
+        "--courses-file",
+        help="crawl every course in a courses.json style file in one process",
+    )
+    parser.add_argument(
+        "--no-file-sink", action="store_true", help="do not write data/raw/<code>.json"
+    )
+    parser.add_argument(
+        "--no-mongo-sink", action="store_true", help="do not write to course_details"
+    )
+    parser.add_argument(
+        "--http-cache",
+        action="store_true",
+        help="reuse responses cached in data/cache/http (see QUT_HTTP_CACHE)",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="only replay cached responses; fail courses that are not cached",
+    )
+    parser.add_argument(
+        "--results-file",
+        help="append each course's outcome to this file as a JSON line",
+    )
+    parser.add_argument(
+        "--throttle-state",
+        help="load the request throttle from this file and save it back at the end",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        help="processes parsing pages (default: inline for one course, "
+        "one per spare core with --courses-file)",
+    )
+    args = parser.parse_args()
+
+    if args.courses_file:
+        with open(args.courses_file, "r", encoding="utf-8") as f:
+            listed = json.load(f)
+        if isinstance(listed, dict):
+            listed = listed.get("list_of_courses", [])
+    else:
+        if not args.course_code or not args.course_title:
+            parser.error("give a course code and title, or --courses-file")
+        listed = [
+            {
+                "courseCode": args.course_code,
+                "course_title": args.course_title,
+                "url": args.course_url,
+            }
+        ]
 
-# Run the spider with the course_link argument
-process = CrawlerProcess()
-process.crawl(MySpider, courseLink=courseLink)
-process.start()
+    listed = [
+        course
+        for course in listed
+        if course.get("courseCode") and course.get("course_title")
+    ]
+    # Use the URL found by sitemap discovery if given, otherwise resolve it
+    # (verified URLs are cached on disk between runs). The resolver pulls in
+    # requests, so it is only imported when a course has no URL. Offline it
+    # only answers from its cache.
+    offline = args.offline or is_offline()
+    resolver = None
+    if not all(course.get("url") for course in listed):
+        from src.course_processor.url_resolver import CourseUrlResolver
+
+        resolver = CourseUrlResolver(offline=offline)
+    courses = []
+    for course in listed:
+        entry = {"courseCode": course["courseCode"], "url": course.get("url")}
+        if not entry["url"]:
+            try:
+                entry["url"] = (
+                    resolver.resolve(course["courseCode"], course["course_title"])
+                    or False
+                )
+            except CacheMiss:
+                entry["url"] = False
+                entry["error"] = "Offline and the course URL is not cached"
+        courses.append(entry)
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
+
+    pipelines = {}
+    if not args.no_file_sink:
+        pipelines[FILE_SINK] = 100
+    if not args.no_mongo_sink:
+        pipelines[MONGO_SINK] = 200
+
+    # Profile the crawl when main.py was started with --profile
+    enable_from_env()
+    stage_name = (
+        f"ECI.{courses[0]['courseCode']}" if len(courses) == 1 else "ECI.batch"
+    )
+
+    parse_workers = args.parse_workers
+    if parse_workers is None:
+        parse_workers = default_workers() if len(courses) > 1 else 0
+
+    # Run the spider with the courses
+    with profile_stage(stage_name):
+        process = CrawlerProcess(
+            settings={
+                "ITEM_PIPELINES": pipelines,
+                "HTTP_CACHE_ENABLED": args.http_cache,
+                "HTTP_CACHE_OFFLINE": offline,
+                "PARSE_WORKERS": parse_workers,
+                "RESULTS_FILE": args.results_file,
+                "THROTTLE_STATE_FILE": args.throttle_state,
+            }
+        )
+        crawler = process.create_crawler(MySpider)
+        process.crawl(crawler, courses=courses)
+        process.start()
+
+    # Exit non-zero when the page could not be scraped so the caller can retry it
+    if crawler.spider is None or crawler.spider.status in (None, STATUS_FAILED):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
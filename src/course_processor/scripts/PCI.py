@@ -6,8 +6,24 @@ from scrapy_splash import SplashRequest
 from scrapy.crawler import CrawlerProcess
 from scrapy.http import HtmlResponse
 import os
+import sys
 import json 
+import argparse
 from datetime import datetime
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+RAW_DIR = PROJECT_ROOT / "data" / "raw"
+COURSES_FILE = RAW_DIR / "courses.json"
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from src.course_processor.sitemap import SITEMAP_URL, iter_course_pages, reconcile
+from src.course_processor.url_resolver import CourseUrlResolver
+from src.utils.http_cache import is_offline
+
+# Replays the course list from data/cache/http when $QUT_HTTP_CACHE is set
+CACHE_MIDDLEWARE = 'src.course_processor.middlewares.DiskCacheMiddleware'
 
 class CourseSpider(scrapy.Spider):
     name = 'courses'
@@ -15,6 +31,7 @@ class CourseSpider(scrapy.Spider):
 
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36',
+        'DOWNLOADER_MIDDLEWARES': {CACHE_MIDDLEWARE: 900},
     }
 
     def start_requests(self):
@@ -57,8 +74,8 @@ class CourseSpider(scrapy.Spider):
             }
 
             # Save the extracted data to a JSON file
-            output_file = 'courses.json'
-            with open(output_file, "w", encoding="utf-8") as f:
+            RAW_DIR.mkdir(parents=True, exist_ok=True)
+            with open(COURSES_FILE, "w", encoding="utf-8") as f:
                 json.dump(extracted_data, f, indent=4)
 
             # Yield the extracted data as output
@@ -66,7 +83,7 @@ class CourseSpider(scrapy.Spider):
 
 # Function to run the spider
 def run_spider():
-    output_file = 'courses.json'
+    output_file = COURSES_FILE
 
     # Check if courses.json exists and delete it
     if os.path.exists(output_file):
@@ -80,4 +97,59 @@ def run_spider():
     process.crawl(CourseSpider)  # Start crawling with the CourseSpider
     process.start()  # Start the crawling process
 
-run_spider()
\ No newline at end of file
+
+# Match the active courses to the course pages in QUT's sitemap
+def run_sitemap_discovery():
+    with open(COURSES_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    courses = data.get('list_of_courses', [])
+
+    # Ambiguous matches are checked against the course code on the page
+    resolver = CourseUrlResolver()
+    matched, unmatched, unlisted = reconcile(
+        courses, iter_course_pages(), verify=resolver.page_matches_code
+    )
+
+    # Record each course's page and last modified date for incremental
+    # crawls. A URL the resolver already verified is kept.
+    for course in courses:
+        page = matched.get(course.get('courseCode'))
+        if page:
+            hit, verified_url = resolver.cached(course['courseCode'])
+            course['url'] = verified_url if hit and verified_url else page['url']
+            course['lastmod'] = page['lastmod']
+    data['sitemap'] = SITEMAP_URL
+    data['sitemap_checked'] = datetime.now().strftime('%Y-%m-%d')
+    data['unlisted_course_pages'] = unlisted
+
+    with open(COURSES_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+
+    # The sitemap URLs are verified, so ECI.py can skip guessing slugs
+    resolver.add_verified({code: page['url'] for code, page in matched.items()})
+
+    print(f"Matched {len(matched)} of {len(courses)} active courses to sitemap pages")
+    print(f"Active courses without a page: {len(unmatched)}")
+    for course in unmatched[:10]:
+        print(f"- {course.get('courseCode')}: {course.get('course_title')}")
+    print(f"Course pages not in the active list: {len(unlisted)}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fetch the list of active QUT courses.')
+    parser.add_argument(
+        '--sitemap',
+        action='store_true',
+        help='add page URLs and lastmod dates from the QUT sitemap to courses.json',
+    )
+    args = parser.parse_args()
+    # The sitemap and the pages checked against it are not in the HTTP cache
+    if args.sitemap and is_offline():
+        parser.error('--sitemap fetches the QUT sitemap and cannot run offline')
+
+    if args.sitemap and COURSES_FILE.exists():
+        run_sitemap_discovery()
+    else:
+        run_spider()
+        if args.sitemap:
+            run_sitemap_discovery()
\ No newline at end of file
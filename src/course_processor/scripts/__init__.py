@@ -0,0 +1,3 @@
+"""
+Scripts run by the crawl: PCI.py (course list) and ECI.py (course pages).
+"""
@@ -1,25 +1,25 @@
 # The purpose of this script is to pull information from the each course information.
 import sys
-import re
 import subprocess
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.course_processor.url_resolver import CourseUrlResolver
 
 if __name__ == "__main__":
     # Access arguments passed to the script
     course_code = sys.argv[1]  # First argument
     course_title = sys.argv[2]  # Second argument
 
-    # Format the course title for the URL
-    formatted_course_title = course_title.lower().replace(" ", "-")
-    formatted_course_title = re.sub(
-        r"-{2,}", "-", formatted_course_title
-    )  # Remove extra dashes
-    formatted_course_title = re.sub(
-        r"[()]", "", formatted_course_title
-    )  # Remove parentheses
-
-    courseLink = f"https://www.qut.edu.au/courses/{formatted_course_title}"
+    # Resolve the course URL, ECI.py reuses the cached result
+    courseLink = CourseUrlResolver().resolve(course_code, course_title)
 
     print(f"Processing course: {course_code} - {courseLink}")
 
     # Call the ECI.py script with the same arguments
-    subprocess.run([sys.executable, "scripts/ECI.py", course_code, course_title])
+    subprocess.run(
+        [sys.executable, str(Path(__file__).parent / "ECI.py"), course_code, course_title]
+    )
@@ -0,0 +1,136 @@
+import gzip
+import logging
+from collections import Counter
+import xml.etree.ElementTree as ET
+
+import requests
+
+from src.course_processor.url_resolver import (
+    COURSES_BASE_URL,
+    USER_AGENT,
+    candidate_slugs,
+    title_tokens,
+    url_slug,
+)
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_URL = "https://www.qut.edu.au/sitemap.xml"
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_sitemap(url, session=None, timeout=30):
+    """Yield (loc, lastmod) for every page in a sitemap.
+
+    The XML is parsed incrementally from the HTTP stream and elements are
+    cleared as soon as they are read, so large sitemaps never sit in memory.
+    Sitemap index files are followed recursively.
+    """
+    session = session or requests.Session()
+    session.headers.setdefault("User-Agent", USER_AGENT)
+
+    with session.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        stream = response.raw
+        if url.endswith(".gz"):
+            stream = gzip.GzipFile(fileobj=stream)
+
+        child_sitemaps = []
+        loc = lastmod = None
+        for _, element in ET.iterparse(stream, events=("end",)):
+            name = _local_name(element.tag)
+            if name == "loc":
+                loc = (element.text or "").strip()
+            elif name == "lastmod":
+                lastmod = (element.text or "").strip() or None
+            elif name == "url":
+                if loc:
+                    yield loc, lastmod
+                loc = lastmod = None
+                element.clear()
+            elif name == "sitemap":
+                if loc:
+                    child_sitemaps.append(loc)
+                loc = lastmod = None
+                element.clear()
+
+    for child in child_sitemaps:
+        try:
+            yield from iter_sitemap(child, session=session, timeout=timeout)
+        except (requests.RequestException, ET.ParseError) as e:
+            logger.warning(f"Could not read sitemap {child}: {e}")
+
+
+def iter_course_pages(sitemap_url=SITEMAP_URL, session=None):
+    """Yield (url, lastmod) for course pages listed in the QUT sitemap."""
+    for loc, lastmod in iter_sitemap(sitemap_url, session=session):
+        if loc.startswith(COURSES_BASE_URL) and url_slug(loc) != "courses":
+            yield loc, lastmod
+
+
+def reconcile(courses, pages, verify=None):
+    """Match active courses to sitemap course pages.
+
+    Returns (matched, unmatched, unlisted): a dict of course code to
+    {"url", "lastmod"}, the courses with no page, and the course pages that
+    belong to no active course.
+
+    Each page goes to at most one course, and exact slug matches are
+    settled before matches on the same title words. When several courses
+    want the same page, or a title matches several pages, the match is
+    ambiguous and ``verify(url, course_code)`` (for example
+    CourseUrlResolver.page_matches_code) must confirm it; without
+    ``verify`` those courses are left unmatched rather than guessed.
+    """
+    by_slug = {}
+    by_tokens = {}
+    for url, lastmod in pages:
+        slug = url_slug(url)
+        by_slug[slug] = {"url": url, "lastmod": lastmod}
+        by_tokens.setdefault(frozenset(title_tokens(slug)), []).append(slug)
+
+    exact, same_words = [], []
+    for course in courses:
+        course_title = course.get("course_title") or ""
+        slug = next(
+            (slug for slug in candidate_slugs(course_title) if slug in by_slug), None
+        )
+        if slug is not None:
+            exact.append((course, [slug]))
+        else:
+            words = frozenset(title_tokens(course_title))
+            same_words.append((course, by_tokens.get(words, [])))
+
+    matched = {}
+    unmatched = []
+    used_slugs = set()
+    for candidates in (exact, same_words):
+        claims = Counter(
+            slug for _, slugs in candidates for slug in slugs if slug not in used_slugs
+        )
+        for course, slugs in candidates:
+            course_code = course.get("courseCode")
+            slugs = [slug for slug in slugs if slug not in used_slugs]
+            slug = slugs[0] if slugs else None
+            if len(slugs) > 1 or (slug and claims[slug] > 1):
+                # Ambiguous: only a page that names this course code will do
+                slug = next(
+                    (
+                        slug
+                        for slug in slugs
+                        if verify and verify(by_slug[slug]["url"], course_code)
+                    ),
+                    None,
+                )
+            if slug is None:
+                unmatched.append(course)
+                continue
+            matched[course_code] = by_slug[slug]
+            used_slugs.add(slug)
+
+    unlisted = [page for slug, page in by_slug.items() if slug not in used_slugs]
+    return matched, unmatched, unlisted
@@ -0,0 +1,221 @@
+import json
+import hashlib
+import logging
+from datetime import datetime
+from pymongo import InsertOne, UpdateOne
+
+from src.utils.mongo_client import get_client
+
+logger = logging.getLogger(__name__)
+
+CHANGE_ADDED = "added"
+CHANGE_CHANGED = "changed"
+CHANGE_REMOVED = "removed"
+
+# Fields that differ on every crawl without the course itself changing
+VOLATILE_FIELDS = ("_id", "import_date", "day_obtained")
+
+BATCH_SIZE = 500
+
+
+def course_content(course_detail):
+    return {
+        key: value
+        for key, value in course_detail.items()
+        if key not in VOLATILE_FIELDS
+    }
+
+
+def content_hash(content):
+    """Stable hash of a course's content, independent of key order."""
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def diff_fields(old, new, prefix=""):
+    """Field-level differences between two versions of a course.
+
+    Nested dicts (the careers and outcome sections) are compared key by
+    key, so a change is reported as e.g.
+    ``what_to_expect-careers_and_outcome.Possible Careers``. Lists of plain
+    values record what was added and removed; anything else records the
+    old and new value.
+    """
+    changes = []
+    for key in sorted(set(old) | set(new)):
+        field = f"{prefix}{key}"
+        before, after = old.get(key), new.get(key)
+        if before == after:
+            continue
+        if isinstance(before, dict) and isinstance(after, dict):
+            changes.extend(diff_fields(before, after, f"{field}."))
+        elif _is_value_list(before) and _is_value_list(after):
+            changes.append(
+                {
+                    "field": field,
+                    "added": [value for value in after if value not in before],
+                    "removed": [value for value in before if value not in after],
+                }
+            )
+        else:
+            changes.append({"field": field, "old": before, "new": after})
+    return changes
+
+
+def _is_value_list(value):
+    return isinstance(value, list) and all(
+        not isinstance(item, (dict, list)) for item in value
+    )
+
+
+class CourseSnapshots:
+    """Version history of course_details, one change record per real change.
+
+    ``course_versions`` holds the latest content and hash of each course.
+    Each crawl compares every course's hash with it: unchanged courses only
+    get ``last_seen`` bumped, and added, changed or removed courses get one
+    document in ``course_changes`` with the field-level differences. The
+    history therefore grows with the amount of change, not with the number
+    of crawls, and ``changes_since`` is a range scan on ``changed_at``.
+    """
+
+    def __init__(
+        self, connection_string=None, database_name="qut_courses", client=None
+    ):
+        self.client = client or get_client(connection_string)
+        self.db = self.client[database_name]
+        self.versions = self.db["course_versions"]
+        self.changes = self.db["course_changes"]
+
+        self.versions.create_index("course_code", unique=True)
+        self.changes.create_index("changed_at")
+        self.changes.create_index([("course_code", 1), ("changed_at", 1)])
+
+    def record(self, course_details, seen_at=None):
+        """Compare a crawl's courses with their last versions.
+
+        Returns counts of added, changed and unchanged courses.
+        """
+        seen_at = seen_at or datetime.now()
+        counts = {CHANGE_ADDED: 0, CHANGE_CHANGED: 0, "unchanged": 0}
+        courses = [c for c in course_details if c.get("course_code")]
+
+        for start in range(0, len(courses), BATCH_SIZE):
+            batch = courses[start : start + BATCH_SIZE]
+            known = {
+                version["course_code"]: version
+                for version in self.versions.find(
+                    {"course_code": {"$in": [c["course_code"] for c in batch]}},
+                    {
+                        "_id": 0,
+                        "course_code": 1,
+                        "content_hash": 1,
+                        "content": 1,
+                        "removed_at": 1,
+                    },
+                )
+            }
+            version_ops, change_ops = [], []
+            for course in batch:
+                code = course["course_code"]
+                content = course_content(course)
+                digest = content_hash(content)
+                previous = known.get(code)
+                returned = bool(previous and previous.get("removed_at"))
+
+                if previous and previous["content_hash"] == digest and not returned:
+                    counts["unchanged"] += 1
+                    version_ops.append(
+                        UpdateOne(
+                            {"course_code": code},
+                            {
+                                "$set": {"last_seen": seen_at},
+                                "$unset": {"removed_at": ""},
+                            },
+                        )
+                    )
+                    continue
+
+                # A course back on the list after being removed counts as added
+                kind = CHANGE_CHANGED if previous and not returned else CHANGE_ADDED
+                changes = diff_fields(previous["content"], content) if previous else []
+                hash_before = previous["content_hash"] if previous else None
+                counts[kind] += 1
+                change_ops.append(
+                    InsertOne(
+                        {
+                            "course_code": code,
+                            "kind": kind,
+                            "changed_at": seen_at,
+                            "hash_before": hash_before,
+                            "hash_after": digest,
+                            "changes": changes,
+                        }
+                    )
+                )
+                version_ops.append(
+                    UpdateOne(
+                        {"course_code": code},
+                        {
+                            "$set": {
+                                "content": content,
+                                "content_hash": digest,
+                                "last_seen": seen_at,
+                                "last_changed": seen_at,
+                            },
+                            "$setOnInsert": {"first_seen": seen_at},
+                            "$unset": {"removed_at": ""},
+                        },
+                        upsert=True,
+                    )
+                )
+
+            if change_ops:
+                self.changes.bulk_write(change_ops, ordered=False)
+            if version_ops:
+                self.versions.bulk_write(version_ops, ordered=False)
+        return counts
+
+    def mark_removed(self, active_codes, seen_at=None):
+        """Record courses that are no longer on the active course list."""
+        seen_at = seen_at or datetime.now()
+        removed = [
+            version["course_code"]
+            for version in self.versions.find(
+                {
+                    "course_code": {"$nin": list(active_codes)},
+                    "removed_at": {"$exists": False},
+                },
+                {"_id": 0, "course_code": 1},
+            )
+        ]
+        if not removed:
+            return 0
+        self.changes.insert_many(
+            [
+                {
+                    "course_code": code,
+                    "kind": CHANGE_REMOVED,
+                    "changed_at": seen_at,
+                    "changes": [],
+                }
+                for code in removed
+            ]
+        )
+        self.versions.update_many(
+            {"course_code": {"$in": removed}}, {"$set": {"removed_at": seen_at}}
+        )
+        return len(removed)
+
+    def changes_since(self, since, course_code=None, kinds=None):
+        """Cursor over change records at or after ``since``, oldest first."""
+        query = {"changed_at": {"$gte": since}}
+        if course_code:
+            query["course_code"] = course_code
+        if kinds:
+            query["kind"] = {"$in": list(kinds)}
+        return self.changes.find(query, {"_id": 0}).sort("changed_at", 1)
+
+    def close(self):
+        # The client is shared by the whole process and closed at exit
+        self.client = self.db = self.versions = self.changes = None
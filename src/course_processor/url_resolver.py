@@ -0,0 +1,240 @@
+import os
+import re
+import json
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import requests
+
+from src.utils.http_cache import CacheMiss
+
+logger = logging.getLogger(__name__)
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+CACHE_DIR = PROJECT_ROOT / "data" / "cache"
+CACHE_FILE = CACHE_DIR / "course_urls.json"
+
+COURSES_BASE_URL = "https://www.qut.edu.au/courses/"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36"
+
+# Verified URLs are trusted for a month, failed lookups are retried daily
+CACHE_TTL = timedelta(days=30)
+NEGATIVE_CACHE_TTL = timedelta(days=1)
+
+
+def slugify_title(course_title):
+    """The slug ECI.py has always used: whitespace to dashes, no parentheses."""
+    slug = re.sub(r"\s+", "-", course_title).lower()
+    slug = re.sub(r"-{2,}", "-", slug)
+    return re.sub(r"[()]", "", slug)
+
+
+def candidate_slugs(course_title):
+    """Return likely URL slugs for a course title, most likely first."""
+    title = course_title.strip().lower()
+    candidates = [
+        slugify_title(course_title),
+        # extract_course_information.py only replaced single spaces
+        re.sub(r"[()]", "", re.sub(r"-{2,}", "-", title.replace(" ", "-"))),
+    ]
+
+    # Spell out ampersands and drop all other punctuation
+    cleaned = title.replace("&", " and ").replace("'", "").replace("’", "")
+    candidates.append(re.sub(r"[^a-z0-9]+", "-", cleaned).strip("-"))
+
+    # Specialised variants such as "(Honours)" often share the parent page
+    without_brackets = re.sub(r"\([^)]*\)", " ", cleaned)
+    candidates.append(re.sub(r"[^a-z0-9]+", "-", without_brackets).strip("-"))
+
+    slugs = []
+    for slug in candidates:
+        if slug and slug not in slugs:
+            slugs.append(slug)
+    return slugs
+
+
+def url_slug(url):
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def title_tokens(text):
+    return set(re.findall(r"[a-z0-9]+", text.lower())) - {"of", "and", "in", "the"}
+
+
+class CourseUrlResolver:
+    """Resolve course codes to verified qut.edu.au course page URLs.
+
+    Candidate slugs are checked with HEAD requests, falling back to the QUT
+    sitemap. Results are cached on disk so later runs skip the lookup.
+    Offline, the cache is used whatever its age and a course that is not in
+    it raises CacheMiss instead of going online.
+    """
+
+    def __init__(
+        self, cache_file=CACHE_FILE, session=None, timeout=10, offline=False
+    ):
+        self.cache_file = Path(cache_file)
+        self.session = session or requests.Session()
+        self.session.headers.setdefault("User-Agent", USER_AGENT)
+        self.timeout = timeout
+        self.offline = offline
+        self.cache = self.load_cache()
+        self._sitemap_urls = None
+
+    def load_cache(self):
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_cache(self):
+        """Merge with the file on disk and replace it atomically."""
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        merged = self.load_cache()
+        merged.update(self.cache)
+        tmp_file = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(merged, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.cache_file)
+        self.cache = merged
+
+    def cached(self, course_code):
+        """Return (hit, url) for a course code from the on-disk cache."""
+        entry = self.cache.get(course_code)
+        if not entry:
+            return False, None
+        ttl = CACHE_TTL if entry.get("url") else NEGATIVE_CACHE_TTL
+        expired = datetime.now() - datetime.fromisoformat(entry["verified_at"]) > ttl
+        if expired and not self.offline:
+            return False, None
+        return True, entry.get("url")
+
+    def remember(self, course_code, course_title, url, method):
+        self.cache[course_code] = {
+            "url": url,
+            "course_title": course_title,
+            "method": method,
+            "verified_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        try:
+            self.save_cache()
+        except OSError as e:
+            logger.warning(f"Could not save course URL cache: {e}")
+
+    def url_exists(self, url):
+        """Cheap existence check; returns the final URL or None."""
+        try:
+            response = self.session.head(
+                url, allow_redirects=True, timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            logger.debug(f"HEAD {url} failed: {e}")
+            return None
+        if response.status_code == 405:
+            # Some pages reject HEAD; fall back to a streamed GET
+            try:
+                response = self.session.get(
+                    url, allow_redirects=True, timeout=self.timeout, stream=True
+                )
+                response.close()
+            except requests.RequestException:
+                return None
+        if response.status_code != 200 or "/courses/" not in response.url:
+            return None
+        return response.url
+
+    def sitemap_course_urls(self):
+        """Course page URLs listed in the QUT sitemap (fetched once)."""
+        from src.course_processor.sitemap import SITEMAP_URL, iter_course_pages
+
+        if self._sitemap_urls is None:
+            self._sitemap_urls = []
+            try:
+                for url, _ in iter_course_pages(session=self.session):
+                    self._sitemap_urls.append(url)
+            except (requests.RequestException, ET.ParseError) as e:
+                logger.warning(f"Could not read sitemap {SITEMAP_URL}: {e}")
+        return self._sitemap_urls
+
+    def add_verified(self, urls_by_code, method="sitemap"):
+        """Seed the cache with URLs already verified elsewhere.
+
+        Codes that already have a verified URL in the cache keep it.
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        for course_code, url in urls_by_code.items():
+            hit, cached_url = self.cached(course_code)
+            if hit and cached_url:
+                continue
+            entry = self.cache.get(course_code, {})
+            self.cache[course_code] = {
+                **entry,
+                "url": url,
+                "method": method,
+                "verified_at": now,
+            }
+        self.save_cache()
+
+    def page_matches_code(self, url, course_code):
+        """Check the page's JSON-LD for the course code as a whole word,
+        so BS05 does not match a page for BS055."""
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException:
+            return False
+        code_pattern = re.compile(rf"\b{re.escape(course_code)}\b")
+        for block in re.findall(
+            r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>',
+            response.text,
+            re.DOTALL,
+        ):
+            if code_pattern.search(block):
+                return True
+        return False
+
+    def find_in_sitemap(self, course_code, course_title):
+        urls = self.sitemap_course_urls()
+        slugs = set(candidate_slugs(course_title))
+        matches = [url for url in urls if url_slug(url) in slugs]
+
+        if not matches:
+            # Fall back to pages whose slug has the same words as the title
+            wanted = title_tokens(course_title)
+            matches = [
+                url
+                for url in urls
+                if title_tokens(url_slug(url)) == wanted
+            ]
+
+        if len(matches) > 1:
+            # Several pages share the title, use JSON-LD to pick the right one
+            for url in matches:
+                if self.page_matches_code(url, course_code):
+                    return url
+        return matches[0] if matches else None
+
+    def resolve(self, course_code, course_title):
+        """Return the verified URL for a course, or None if none was found."""
+        hit, url = self.cached(course_code)
+        if hit:
+            return url
+        if self.offline:
+            raise CacheMiss(f"Offline and no cached URL for {course_code}")
+
+        for slug in candidate_slugs(course_title):
+            url = self.url_exists(COURSES_BASE_URL + slug)
+            if url:
+                self.remember(course_code, course_title, url, "slug")
+                return url
+
+        url = self.find_in_sitemap(course_code, course_title)
+        if url:
+            self.remember(course_code, course_title, url, "sitemap")
+        elif self.sitemap_course_urls():
+            # Only cache a miss when the site was reachable
+            self.remember(course_code, course_title, None, "none")
+        return url
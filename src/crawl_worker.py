@@ -0,0 +1,204 @@
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+SCRIPTS_DIR = Path(__file__).parent / "course_processor" / "scripts"
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from src.utils.log_setup import setup_logging
+from src.utils.work_queue import WorkQueue
+
+KIND_COURSE = "course"
+KIND_CAREERJET_PAGE = "careerjet_page"
+
+
+def enqueue_courses(queue, requeue=False):
+    """Queue every course in data/raw/courses.json."""
+    with open(DATA_DIR / "raw" / "courses.json", "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    items = [
+        (course["courseCode"], course)
+        for course in data.get("list_of_courses", [])
+        if course.get("courseCode") and course.get("course_title")
+    ]
+    return queue.enqueue(KIND_COURSE, items, requeue=requeue)
+
+
+def enqueue_careerjet_pages(queue, max_pages, requeue=False):
+    items = [(str(page), {"page": page}) for page in range(1, max_pages + 1)]
+    return queue.enqueue(KIND_CAREERJET_PAGE, items, requeue=requeue)
+
+
+def crawl_course(course):
+    """Run ECI.py for one course, raising if it did not succeed."""
+    args = [course["courseCode"], course["course_title"]]
+    if course.get("url"):
+        args.append(course["url"])
+
+    process = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / "ECI.py"), *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    if process.returncode != 0:
+        tail = process.stderr.decode(errors="replace").strip().splitlines()[-5:]
+        raise RuntimeError(
+            f"ECI.py exited with error code {process.returncode}: " + " | ".join(tail)
+        )
+    return {"returncode": process.returncode}
+
+
+_careerjet = {}
+
+
+def crawl_careerjet_page(payload):
+    """Scrape one CareerJet results page and save its jobs to MongoDB."""
+    if not _careerjet:
+        # Only workers that handle job pages pay for these imports
+        sys.path.insert(0, str(PROJECT_ROOT / "Job_Board"))
+        from careerjet_scraper import CareerJetScraper
+        from src.utils.mongodb_handler import MongoDBHandler
+
+        _careerjet["scraper"] = CareerJetScraper()
+        _careerjet["handler"] = MongoDBHandler()
+
+    jobs = _careerjet["scraper"].scrape_page(payload["page"])
+    saved = _careerjet["handler"].save_jobs(jobs) if jobs else 0
+    return {"jobs": len(jobs), "saved": saved}
+
+
+HANDLERS = {
+    KIND_COURSE: crawl_course,
+    KIND_CAREERJET_PAGE: crawl_careerjet_page,
+}
+
+
+class LeaseHeartbeat(threading.Thread):
+    """Keeps extending an item's lease while a worker is busy with it."""
+
+    def __init__(self, queue, item):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.item = item
+        self.interval = queue.visibility_timeout.total_seconds() / 3
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            if not self.queue.extend(self.item):
+                logging.warning(f"Lost lease on {self.item['kind']} {self.item['key']}")
+                return
+
+    def stop(self):
+        self.stopped.set()
+
+
+def run_worker(queue, worker_id, kinds=None, exit_when_empty=False, poll_interval=5):
+    logging.info(f"Worker {worker_id} started")
+    processed = 0
+
+    while True:
+        item = queue.claim(worker_id, kinds)
+        if item is None:
+            if exit_when_empty and queue.pending(kinds) == 0:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        logging.info(
+            f"Claimed {item['kind']} {item['key']} (attempt {item['attempts']})"
+        )
+        heartbeat = LeaseHeartbeat(queue, item)
+        heartbeat.start()
+        try:
+            result = HANDLERS[item["kind"]](item["payload"])
+            queue.ack(item, result)
+            logging.info(f"Finished {item['kind']} {item['key']}")
+        except Exception as e:
+            logging.error(f"Failed {item['kind']} {item['key']}: {e}")
+            queue.fail(item, str(e))
+        finally:
+            heartbeat.stop()
+        processed += 1
+
+    logging.info(f"Worker {worker_id} finished after {processed} items")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Distributed crawl workers sharing a MongoDB work queue."
+    )
+    parser.add_argument(
+        "--mongodb-uri", help="defaults to $MONGODB_URI or mongodb://localhost:27017/"
+    )
+    parser.add_argument(
+        "--visibility-timeout",
+        type=int,
+        default=600,
+        help="seconds before an unacknowledged item is handed to another worker",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="add crawl work to the queue")
+    enqueue.add_argument("--courses", action="store_true", help="queue courses.json")
+    enqueue.add_argument(
+        "--careerjet-pages", type=int, default=0, help="queue CareerJet pages 1..N"
+    )
+    enqueue.add_argument(
+        "--requeue", action="store_true", help="queue finished and dead items again"
+    )
+
+    work = commands.add_parser("work", help="claim and process queued items")
+    work.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    work.add_argument(
+        "--kinds",
+        nargs="+",
+        choices=sorted(HANDLERS),
+        help="only process these kinds of work",
+    )
+    work.add_argument(
+        "--exit-when-empty",
+        action="store_true",
+        help="stop once nothing is queued or leased instead of polling",
+    )
+
+    commands.add_parser("status", help="show queue counts")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging("crawl_worker")
+    queue = WorkQueue(args.mongodb_uri, visibility_timeout=args.visibility_timeout)
+
+    if args.command == "enqueue":
+        if args.courses:
+            count = enqueue_courses(queue, requeue=args.requeue)
+            logging.info(f"Queued {count} courses")
+        if args.careerjet_pages:
+            count = enqueue_careerjet_pages(
+                queue, args.careerjet_pages, requeue=args.requeue
+            )
+            logging.info(f"Queued {count} CareerJet pages")
+    elif args.command == "work":
+        run_worker(queue, args.worker_id, args.kinds, args.exit_when_empty)
+    elif args.command == "status":
+        for kind, counts in sorted(queue.counts().items()):
+            print(f"{kind}: {counts}")
+
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
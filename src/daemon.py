@@ -0,0 +1,333 @@
+import sys
+import time
+import random
+import signal
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from src.utils.log_setup import setup_logging
+from src.utils.metrics import METRICS_DIR, REFRESH_RUNS_TOTAL, REFRESH_SECONDS, REGISTRY
+
+logger = logging.getLogger("daemon")
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+DURATION_UNITS = {"s": 1, "m": MINUTE, "h": HOUR, "d": DAY}
+
+# Refreshes due at startup are spread over this many seconds, so they do
+# not all hit MongoDB and the network at once
+STARTUP_SPREAD = 60
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+
+class RefreshFailed(Exception):
+    """A refresh finished without producing any data."""
+
+
+def require(count, what):
+    """Fail the refresh when a step produced nothing (None or 0)."""
+    if not count:
+        raise RefreshFailed(f"No {what}")
+    return count
+
+
+def parse_duration(text):
+    """Seconds in a duration like 90, 90s, 30m, 6h or 7d."""
+    text = text.strip().lower()
+    unit = DURATION_UNITS.get(text[-1:])
+    number = text[:-1] if unit else text
+    try:
+        seconds = float(number) * (unit or 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a duration: {text!r}") from None
+    if seconds < 0:
+        raise argparse.ArgumentTypeError(f"negative duration: {text!r}")
+    return seconds
+
+
+class RefreshJob:
+    """A refresh that runs every ``interval`` seconds, give or take ``jitter``.
+
+    ``refresh`` is a coroutine function. When a run is due while the
+    previous one is still going, the run is skipped rather than queued, so
+    a slow crawl never piles up behind itself. ``stages`` are the pipeline
+    stages the refresh covers; they are stamped as done when it succeeds,
+    so run_full_process.py skips them while they are fresh.
+    """
+
+    def __init__(self, name, refresh, interval, jitter=0.1, stages=()):
+        self.name = name
+        self.refresh = refresh
+        self.interval = interval
+        self.jitter = jitter
+        self.stages = list(stages)
+        self.task = None
+        self.last_status = None
+        self.last_finished = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def next_delay(self, rng=random):
+        spread = self.interval * self.jitter
+        return max(0.0, self.interval + rng.uniform(-spread, spread))
+
+    def start(self, on_success=None):
+        self.task = asyncio.ensure_future(self._run(on_success))
+        return self.task
+
+    async def _run(self, on_success):
+        logger.info(f"Starting the {self.name} refresh")
+        start = time.perf_counter()
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception(f"The {self.name} refresh failed")
+            self.last_status = STATUS_FAILED
+        else:
+            self.last_status = STATUS_OK
+            if on_success:
+                on_success(self)
+        duration = time.perf_counter() - start
+        self.last_finished = time.time()
+        REFRESH_SECONDS.observe(duration, job=self.name)
+        REFRESH_RUNS_TOTAL.inc(job=self.name, status=self.last_status)
+        logger.info(
+            f"The {self.name} refresh finished ({self.last_status}) "
+            f"in {duration:.1f} seconds"
+        )
+        return self.last_status
+
+
+class RefreshDaemon:
+    """Runs refresh jobs on their own schedules in one event loop.
+
+    Everything runs in this process, so module imports, the MongoDB client
+    (src.utils.mongo_client keeps one per process), the course crawl's
+    throttle and the CareerJet HTTP session are set up once and reused by
+    every run instead of once per script.
+    """
+
+    def __init__(self, jobs, pipeline=None, run_at_start=True, rng=random):
+        self.jobs = [job for job in jobs if job.interval > 0]
+        self.pipeline = pipeline
+        self.run_at_start = run_at_start
+        self.rng = rng
+
+    def stamp_stages(self, job):
+        if self.pipeline is None:
+            return
+        for name in job.stages:
+            stamp = self.pipeline.stamp_file(name)
+            stamp.parent.mkdir(parents=True, exist_ok=True)
+            stamp.touch()
+
+    async def schedule(self, job):
+        if self.run_at_start:
+            delay = self.rng.uniform(0, STARTUP_SPREAD)
+        else:
+            delay = job.next_delay(self.rng)
+        while True:
+            logger.info(f"Next {job.name} refresh in {delay / MINUTE:.1f} minutes")
+            await asyncio.sleep(delay)
+            if job.running:
+                logger.warning(
+                    f"Skipping the {job.name} refresh: the previous one is still running"
+                )
+                REFRESH_RUNS_TOTAL.inc(job=job.name, status=STATUS_SKIPPED)
+            else:
+                job.start(self.stamp_stages)
+            delay = job.next_delay(self.rng)
+
+    async def run(self):
+        if not self.jobs:
+            logger.warning("Every refresh is disabled; nothing to do")
+            return
+        schedules = [asyncio.ensure_future(self.schedule(job)) for job in self.jobs]
+        try:
+            await asyncio.gather(*schedules)
+        finally:
+            for schedule in schedules:
+                schedule.cancel()
+            running = [job.task for job in self.jobs if job.running]
+            if running:
+                logger.info(f"Waiting for {len(running)} running refreshes to finish")
+                await asyncio.gather(*running, return_exceptions=True)
+
+
+class Refreshers:
+    """The refreshes, run in-process. Their modules are imported on first
+    use and kept, and blocking scrapers and importers run in the default
+    thread pool so the event loop keeps scheduling.
+
+    The scrapers and importers log their errors and carry on, so each step
+    is checked by what it returns: one that produced nothing fails the
+    refresh, and its stages are not stamped.
+    """
+
+    def __init__(self, job_pages=70):
+        self.job_pages = job_pages
+        self.careerjet = None
+
+    async def in_thread(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def courses(self):
+        from src import main as course_crawl
+        from src.cleanup import cleanup_json_files
+        from src.database.mongodb.import_to_mongodb import import_to_mongodb
+
+        # Only course pages whose sitemap lastmod moved are fetched again.
+        # The crawl raises when no course could be scraped.
+        await course_crawl.crawl(course_crawl.parse_args(["--incremental"]))
+        require(await self.in_thread(import_to_mongodb), "courses imported")
+        await self.in_thread(cleanup_json_files)
+
+    async def occupations(self):
+        from occupations.database.mongodb.import_occupations import (
+            import_occupations_to_mongodb,
+        )
+        from occupations.occupation_scraper import run_scraper
+
+        require(await self.in_thread(run_scraper), "occupations scraped")
+        # Nothing to write is fine when no occupation changed; None is an error
+        if await self.in_thread(import_occupations_to_mongodb) is None:
+            raise RefreshFailed("The occupation import failed")
+
+    async def jobs(self):
+        from Job_Board.import_jobs import import_latest_jobs
+
+        if self.careerjet is None:
+            from dotenv import load_dotenv
+            from Job_Board.careerjet_scraper import CareerJetScraper
+
+            load_dotenv()
+            self.careerjet = CareerJetScraper()
+        require(
+            await self.in_thread(self.careerjet.scrape, self.job_pages), "jobs scraped"
+        )
+        require(await self.in_thread(import_latest_jobs), "jobs imported")
+
+
+def build_jobs(args, refreshers):
+    return [
+        RefreshJob(
+            "courses",
+            refreshers.courses,
+            args.courses,
+            args.jitter,
+            stages=["course_crawl", "course_import", "cleanup"],
+        ),
+        RefreshJob(
+            "occupations",
+            refreshers.occupations,
+            args.occupations,
+            args.jitter,
+            stages=["occupation_scrape", "occupation_import"],
+        ),
+        RefreshJob(
+            "jobs",
+            refreshers.jobs,
+            args.jobs,
+            args.jitter,
+            stages=["job_scrape", "job_import"],
+        ),
+    ]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Keep course, occupation and job data fresh on a schedule."
+    )
+    parser.add_argument(
+        "--courses",
+        type=parse_duration,
+        default=DAY,
+        metavar="INTERVAL",
+        help="how often to refresh courses, e.g. 12h (default 1d, 0 to disable)",
+    )
+    parser.add_argument(
+        "--occupations",
+        type=parse_duration,
+        default=7 * DAY,
+        metavar="INTERVAL",
+        help="how often to refresh occupations (default 7d, 0 to disable)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=parse_duration,
+        default=DAY,
+        metavar="INTERVAL",
+        help="how often to refresh job listings (default 1d, 0 to disable)",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.1,
+        help="randomly move each run by up to this fraction of its interval",
+    )
+    parser.add_argument(
+        "--job-pages", type=int, default=70, help="CareerJet result pages per refresh"
+    )
+    parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="wait one interval before the first refreshes instead of starting now",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="serve Prometheus metrics on this port",
+    )
+    return parser.parse_args(argv)
+
+
+async def run_daemon(args):
+    from src.run_full_process import build_pipeline
+
+    daemon = RefreshDaemon(
+        build_jobs(args, Refreshers(args.job_pages)),
+        pipeline=build_pipeline(),
+        run_at_start=not args.wait,
+    )
+    # Stop on SIGTERM the way Ctrl-C does, letting running refreshes finish
+    task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+    except NotImplementedError:
+        pass  # Windows
+    try:
+        await daemon.run()
+    except asyncio.CancelledError:
+        logger.info("Refresh daemon stopped")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging("daemon")
+
+    metrics_file = METRICS_DIR / "daemon.json"
+    REGISTRY.start_snapshot_writer(metrics_file)
+    if args.metrics_port:
+        REGISTRY.start_http_server(args.metrics_port)
+    try:
+        asyncio.run(run_daemon(args))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        REGISTRY.write_snapshot(metrics_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+import sys
+import time
+import shutil
+import argparse
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+EXPORT_DIR = PROJECT_ROOT / "data" / "exports"
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from src.utils.mongo_client import get_database
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, only needed for exports
+    pa = pq = None
+
+BATCH_SIZE = 5000
+EXPORT_TARGETS = ("courses", "occupations", "jobs")
+CAREERS_SECTION = "Possible Careers"
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise SystemExit(
+            "Parquet export needs pyarrow: pip install pyarrow "
+            "(or pip install -e .[export])"
+        )
+
+
+def course_schema():
+    return pa.schema(
+        [
+            ("course_code", pa.string()),
+            ("course_name", pa.string()),
+            ("identifier", pa.string()),
+            ("duration_domestic", pa.string()),
+            ("duration_international", pa.string()),
+            ("delivery_location", pa.string()),
+            ("atar_rank", pa.string()),
+            ("qtac_code", pa.string()),
+            ("cricos_code", pa.string()),
+            ("main_description", pa.string()),
+            ("details_and_units", pa.list_(pa.string())),
+            ("highlights", pa.list_(pa.string())),
+            ("possible_careers", pa.list_(pa.string())),
+            (
+                "what_to_expect",
+                pa.list_(
+                    pa.struct([("section", pa.string()), ("text", pa.string())])
+                ),
+            ),
+            ("url", pa.string()),
+            ("day_obtained", pa.string()),
+            ("import_date", pa.string()),
+        ]
+    )
+
+
+OCCUPATION_FIELDS = (
+    "code",
+    "title",
+    "skill_level",
+    "assessing_authority",
+    "source",
+    "date_scraped",
+)
+
+
+def occupation_schema():
+    return pa.schema([(name, pa.string()) for name in OCCUPATION_FIELDS])
+
+
+JOB_FIELDS = (
+    "url",
+    "title",
+    "company",
+    "location",
+    "salary",
+    "posted_date",
+    "description",
+    "scraped_at",
+)
+# Jobs are partitioned by these columns, which live in the directory names
+JOB_PARTITIONS = ("scrape_date", "source")
+
+
+def job_schema():
+    return pa.schema([(name, pa.string()) for name in JOB_FIELDS])
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def _text_list(values):
+    if not values:
+        return []
+    if isinstance(values, str):
+        return [values]
+    return [str(value) for value in values]
+
+
+def flatten_course(doc):
+    """One row per course: durations split by audience, careers pulled out.
+
+    ``durations`` is a list of {"audience": "DOM"/"INT", "duration"} and
+    becomes two text columns. ``what_to_expect-careers_and_outcome`` maps a
+    section title to its paragraphs; "Possible Careers" becomes its own list
+    column and the other sections a list of (section, text) pairs.
+    """
+    durations = {"DOM": [], "INT": []}
+    for duration in doc.get("durations") or []:
+        audience = duration.get("audience") or ""
+        for key in durations:
+            if key in audience:
+                durations[key].append(duration.get("duration") or "")
+
+    sections = doc.get("what_to_expect-careers_and_outcome") or {}
+    what_to_expect = [
+        {"section": title, "text": "\n".join(_text_list(content))}
+        for title, content in sections.items()
+        if title != CAREERS_SECTION
+    ]
+
+    return {
+        "course_code": _text(doc.get("course_code")),
+        "course_name": _text(doc.get("course_name")),
+        "identifier": _text(doc.get("identifier")),
+        "duration_domestic": "; ".join(durations["DOM"]) or None,
+        "duration_international": "; ".join(durations["INT"]) or None,
+        "delivery_location": _text(doc.get("delivery_location")),
+        "atar_rank": _text(doc.get("atar_rank")),
+        "qtac_code": _text(doc.get("qtac_code")),
+        "cricos_code": _text(doc.get("cricos_code")),
+        "main_description": _text(doc.get("main_description")),
+        "details_and_units": _text_list(doc.get("details_and_units")),
+        "highlights": _text_list(doc.get("highlights")),
+        "possible_careers": _text_list(sections.get(CAREERS_SECTION)),
+        "what_to_expect": what_to_expect,
+        "url": _text(doc.get("url")),
+        "day_obtained": _text(doc.get("day_obtained")),
+        "import_date": _text(doc.get("import_date")),
+    }
+
+
+def flatten_occupation(doc):
+    return {name: _text(doc.get(name)) for name in OCCUPATION_FIELDS}
+
+
+def flatten_job(doc):
+    row = {name: _text(doc.get(name)) for name in JOB_FIELDS}
+    row["scrape_date"] = (row["scraped_at"] or "unknown")[:10]
+    row["source"] = _text(doc.get("source")) or "unknown"
+    return row
+
+
+def iter_batches(cursor, flatten, batch_size=BATCH_SIZE):
+    """Flattened rows from a cursor, batch_size at a time."""
+    batch = []
+    for doc in cursor:
+        batch.append(flatten(doc))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _replace(tmp_path, path):
+    """Move a finished export into place, replacing the previous one."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+    tmp_path.rename(path)
+
+
+def export_collection(
+    collection, query, flatten, schema, path, batch_size=BATCH_SIZE, compression="zstd"
+):
+    """Stream a collection into one Parquet file, a record batch at a time."""
+    cursor = collection.find(query, {"_id": 0}).batch_size(batch_size)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    rows = 0
+    with pq.ParquetWriter(tmp_path, schema, compression=compression) as writer:
+        for batch in iter_batches(cursor, flatten, batch_size):
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            rows += len(batch)
+    _replace(tmp_path, path)
+    return rows
+
+
+def export_jobs(collection, path, batch_size=BATCH_SIZE, compression="zstd"):
+    """Stream jobs into a Hive-partitioned dataset:
+    <path>/scrape_date=YYYY-MM-DD/source=<source>/part-0.parquet"""
+    schema = job_schema()
+    cursor = collection.find({}, {"_id": 0}).batch_size(batch_size)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+
+    writers = {}
+    rows = 0
+    try:
+        for batch in iter_batches(cursor, flatten_job, batch_size):
+            partitions = {}
+            for row in batch:
+                key = tuple(row.pop(name) for name in JOB_PARTITIONS)
+                partitions.setdefault(key, []).append(row)
+
+            for key, partition_rows in partitions.items():
+                if key not in writers:
+                    directory = tmp_path.joinpath(
+                        *(f"{name}={value}" for name, value in zip(JOB_PARTITIONS, key))
+                    )
+                    directory.mkdir(parents=True, exist_ok=True)
+                    writers[key] = pq.ParquetWriter(
+                        directory / "part-0.parquet", schema, compression=compression
+                    )
+                writers[key].write_batch(
+                    pa.RecordBatch.from_pylist(partition_rows, schema=schema)
+                )
+                rows += len(partition_rows)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    _replace(tmp_path, path)
+    return rows, len(writers)
+
+
+def export_all(
+    targets=EXPORT_TARGETS,
+    output_dir=EXPORT_DIR,
+    batch_size=BATCH_SIZE,
+    compression="zstd",
+):
+    _require_pyarrow()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    db = get_database("qut_courses")
+
+    if "courses" in targets:
+        start = time.perf_counter()
+        rows = export_collection(
+            db["course_details"],
+            {},
+            flatten_course,
+            course_schema(),
+            output_dir / "course_details.parquet",
+            batch_size,
+            compression,
+        )
+        print(f"Exported {rows} courses in {time.perf_counter() - start:.2f}s")
+
+    if "occupations" in targets:
+        start = time.perf_counter()
+        rows = export_collection(
+            db["occupations"],
+            {"code": {"$exists": True}},
+            flatten_occupation,
+            occupation_schema(),
+            output_dir / "occupations.parquet",
+            batch_size,
+            compression,
+        )
+        print(f"Exported {rows} occupations in {time.perf_counter() - start:.2f}s")
+
+    if "jobs" in targets:
+        start = time.perf_counter()
+        rows, partitions = export_jobs(
+            get_database("job_scraper")["jobs"],
+            output_dir / "jobs",
+            batch_size,
+            compression,
+        )
+        print(
+            f"Exported {rows} jobs into {partitions} partitions "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
+    print(f"Parquet files written to {output_dir}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export the data as Parquet.")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        metavar="TARGET",
+        help=f"any of {', '.join(EXPORT_TARGETS)} (default: everything)",
+    )
+    parser.add_argument("--output-dir", default=str(EXPORT_DIR))
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument(
+        "--compression", default="zstd", choices=["zstd", "snappy", "gzip", "none"]
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.targets) - set(EXPORT_TARGETS)
+    if unknown:
+        parser.error(f"unknown export target: {', '.join(sorted(unknown))}")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    export_all(
+        args.targets or EXPORT_TARGETS,
+        args.output_dir,
+        args.batch_size,
+        args.compression,
+    )
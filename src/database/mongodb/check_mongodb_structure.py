@@ -1,10 +1,13 @@
-from pymongo import MongoClient
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+from src.utils.mongo_client import get_database
 
 
 def check_collections_structure():
     # Connect to MongoDB
-    client = MongoClient("mongodb://localhost:27017/")
-    db = client["qut_courses"]
+    db = get_database("qut_courses")
 
     # Check courses collection
     courses_collection = db["courses"]
@@ -24,8 +27,6 @@ def check_collections_structure():
     print(f"\nNumber of courses: {courses_collection.count_documents({})}")
     print(f"Number of course details: {details_collection.count_documents({})}")
 
-    client.close()
-
 
 if __name__ == "__main__":
     check_collections_structure()
@@ -1,33 +1,43 @@
 import os
+import sys
 import json
-import pymongo
-from pymongo import MongoClient
+import argparse
+import logging
+from pymongo import UpdateOne
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+from src.course_processor.snapshots import CourseSnapshots
+from src.utils.metrics import METRICS_DIR, MONGO_WRITE_SECONDS, REGISTRY
+from src.utils.mongo_client import bump_data_version, get_database
+from src.utils.profiling import enable as enable_profiling, enable_from_env, profile_stage
+
 
 def import_to_mongodb():
+    """Import courses.json and the scraped course files.
+
+    Returns the number of listed courses and course details imported.
+    """
     # Get the project root directory
     PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
     DATA_DIR = PROJECT_ROOT / "data"
     RAW_DIR = DATA_DIR / "raw"
 
-    # Connect to MongoDB
-    # If MongoDB is running locally on the default port
-    client = MongoClient("mongodb://localhost:27017/")
-
-    # Create or get the database
-    db = client["qut_courses"]
+    # Connect to MongoDB ($MONGODB_URI, default localhost:27017) and get the database
+    db = get_database("qut_courses")
 
     # Create collections
     courses_collection = db["courses"]
     course_details_collection = db["course_details"]
 
-    # Clear existing data (optional)
+    # Clear existing data (optional). Course details are upserted by course
+    # code instead, since the crawl may already have written them directly.
     courses_collection.delete_many({})
-    course_details_collection.delete_many({})
 
     # Import the main courses list
+    active_codes = None
+    imported = 0
     try:
         courses_file = RAW_DIR / "courses.json"
         with open(courses_file, "r", encoding="utf-8") as file:
@@ -43,7 +53,15 @@ def import_to_mongodb():
 
             # Insert each course
             for course in courses_data.get("list_of_courses", []):
-                courses_collection.insert_one(course)
+                with MONGO_WRITE_SECONDS.time(collection="courses"):
+                    courses_collection.insert_one(course)
+
+            active_codes = [
+                course["courseCode"]
+                for course in courses_data.get("list_of_courses", [])
+                if course.get("courseCode")
+            ]
+            imported += len(courses_data.get("list_of_courses", []))
 
             print(
                 f"Imported {len(courses_data.get('list_of_courses', []))} courses to MongoDB"
@@ -58,6 +76,8 @@ def import_to_mongodb():
         if f.endswith(".json") and f != "courses.json" and f != "not_courses.json"
     ]
 
+    operations = []
+    crawled_details = []
     for file_name in course_files:
         try:
             file_path = RAW_DIR / file_name
@@ -69,13 +89,41 @@ def import_to_mongodb():
                     "%Y-%m-%d %H:%M:%S"
                 )
 
-                # Insert into course_details collection
-                course_details_collection.insert_one(course_detail)
+                # Upsert into course_details collection
+                if course_detail.get("course_code"):
+                    crawled_details.append(course_detail)
+                    operations.append(
+                        UpdateOne(
+                            {"course_code": course_detail["course_code"]},
+                            {"$set": course_detail},
+                            upsert=True,
+                        )
+                    )
+                else:
+                    course_details_collection.insert_one(course_detail)
 
                 print(f"Imported {file_name} to MongoDB")
         except Exception as e:
             print(f"Error importing {file_name}: {e}")
 
+    if operations:
+        with MONGO_WRITE_SECONDS.time(collection="course_details"):
+            course_details_collection.bulk_write(operations, ordered=False)
+        imported += len(operations)
+
+    # Keep a version history: one change record per added, changed or
+    # removed course, with the fields that changed
+    try:
+        snapshots = CourseSnapshots(client=db.client)
+        counts = snapshots.record(crawled_details)
+        removed = snapshots.mark_removed(active_codes) if active_codes else 0
+        print(
+            f"Course changes: {counts['added']} added, {counts['changed']} changed, "
+            f"{counts['unchanged']} unchanged, {removed} removed"
+        )
+    except Exception as e:
+        print(f"Error recording course versions: {e}")
+
     # Import not_courses.json if it exists
     not_courses_file = RAW_DIR / "not_courses.json"
     if not_courses_file.exists():
@@ -93,7 +141,8 @@ def import_to_mongodb():
 
                 # Insert all entries
                 if not_courses:
-                    not_courses_collection.insert_many(not_courses)
+                    with MONGO_WRITE_SECONDS.time(collection="not_courses"):
+                        not_courses_collection.insert_many(not_courses)
 
                 print(f"Imported {len(not_courses)} not processed courses to MongoDB")
         except Exception as e:
@@ -103,10 +152,28 @@ def import_to_mongodb():
     courses_collection.create_index("courseCode")
     course_details_collection.create_index("course_code")
 
+    # Let the API server drop its cached responses for these collections
+    bump_data_version(db, "courses", "course_details", "not_courses")
+
     print("MongoDB import completed successfully!")
     print(f"Database: qut_courses")
     print(f"Collections: courses, course_details, not_courses")
 
+    REGISTRY.write_snapshot(METRICS_DIR / "import_to_mongodb.json")
+    return imported
+
 
 if __name__ == "__main__":
-    import_to_mongodb()
+    parser = argparse.ArgumentParser(description="Import scraped courses into MongoDB.")
+    parser.add_argument(
+        "--profile", action="store_true", help="profile the import into logs/profiles/"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.profile:
+        enable_profiling()
+    else:
+        enable_from_env()
+    with profile_stage("import_to_mongodb"):
+        import_to_mongodb()
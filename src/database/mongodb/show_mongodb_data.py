@@ -1,15 +1,16 @@
-import pymongo
-from pymongo import MongoClient
+import argparse
+import sys
 import json
+from pathlib import Path
 from pprint import pprint
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+from src.utils.mongo_client import get_database
+
 
 def show_mongodb_data():
     # Connect to MongoDB
-    client = MongoClient("mongodb://localhost:27017/")
-
-    # Get the database
-    db = client["qut_courses"]
+    db = get_database("qut_courses")
 
     # Get collections
     courses_collection = db["courses"]
@@ -64,4 +65,5 @@ def show_mongodb_data():
 
 
 if __name__ == "__main__":
+    argparse.ArgumentParser(description="Summarise the course collections in MongoDB.").parse_args()
     show_mongodb_data()
@@ -1,15 +1,16 @@
-import pymongo
-from pymongo import MongoClient
+import sys
 import json
+from pathlib import Path
 from pprint import pprint
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+from src.utils.mongo_client import get_client, get_database, get_uri
+
 
 def check_mongodb_connection():
     try:
         # Try to connect to MongoDB
-        client = MongoClient(
-            "mongodb://localhost:27017/", serverSelectionTimeoutMS=5000
-        )
+        client = get_client()
         client.server_info()  # This will raise an exception if connection fails
         print("Successfully connected to MongoDB!")
         return True
@@ -25,7 +26,7 @@ def show_compass_instructions():
     print("=" * 80)
     print("\nFollow these steps to view your data in MongoDB Compass:")
     print("\n1. Open MongoDB Compass")
-    print("2. Connect to: mongodb://localhost:27017")
+    print(f"2. Connect to: {get_uri()}")
     print("3. Click on the 'qut_courses' database")
     print(
         "4. You'll see three collections: 'courses', 'course_details', and 'not_courses'"
@@ -47,11 +48,8 @@ def show_compass_instructions():
 
 def show_database_summary():
     try:
-        # Connect to MongoDB
-        client = MongoClient("mongodb://localhost:27017/")
-
         # Get the database
-        db = client["qut_courses"]
+        db = get_database("qut_courses")
 
         # Get collections
         courses_collection = db["courses"]
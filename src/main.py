@@ -4,63 +4,84 @@ import asyncio
 import json
 import sys
 import logging
+import argparse
+import uuid
 from datetime import datetime
 from pathlib import Path
 
-# Setup logging
-log_dir = Path(__file__).parent.parent / "logs"
-log_dir.mkdir(exist_ok=True)
-logging.basicConfig(
-    filename=log_dir / f'scraper_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log',
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
-# Also log to console
-console = logging.StreamHandler()
-console.setLevel(logging.INFO)
-logging.getLogger("").addHandler(console)
-
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 SCRIPTS_DIR = Path(__file__).parent / "course_processor" / "scripts"
 
-# Create data directories if they don't exist
-(DATA_DIR / "raw").mkdir(parents=True, exist_ok=True)
-(DATA_DIR / "processed").mkdir(parents=True, exist_ok=True)
-
+sys.path.insert(0, str(PROJECT_ROOT))
+from src.utils.log_setup import setup_logging
+
+# Output of child scripts is logged at DEBUG, so it reaches the log file only
+child_output = logging.getLogger("child_output")
+child_output.setLevel(logging.DEBUG)
+
+from src.course_processor.checkpoint import CrawlJournal
+from src.course_processor.coverage import STATUS_FAILED, STATUS_OK, connect_coverage
+from src.utils.http_cache import CACHE_ENV, OFFLINE, is_offline
+from src.utils.metrics import (
+    COURSE_SECONDS,
+    METRICS_DIR,
+    METRICS_FILE_ENV,
+    REGISTRY,
+    RETRIES_TOTAL,
+)
+from src.utils.profiling import enable as enable_profiling, enable_from_env, profile_stage
+from src.utils.subprocess_stream import run_streaming
+from src.utils.throttle import AdaptiveThrottle
 
-class RateLimiter:
-    def __init__(self, calls_per_second):
-        self.calls_per_second = calls_per_second
-        self.last_call = 0
-        self.lock = asyncio.Lock()
+# Script runs against the QUT site are started at most one a second. The
+# page requests inside them are paced by ECI.py's own throttle, which
+# carries its state from one batch to the next in THROTTLE_STATE_FILE.
+QUT_HOST = "www.qut.edu.au"
+throttle = AdaptiveThrottle(initial_delay=1.0, name="main")
 
-    async def acquire(self):
-        async with self.lock:
-            now = asyncio.get_event_loop().time()
-            time_passed = now - self.last_call
-            if time_passed < 1.0 / self.calls_per_second:
-                await asyncio.sleep(1.0 / self.calls_per_second - time_passed)
-            self.last_call = asyncio.get_event_loop().time()
 
+async def retry_with_throttle(func, host=QUT_HOST, max_retries=3):
+    """Run func until it succeeds, each attempt paced by the host's throttle.
 
-async def retry_with_backoff(func, max_retries=3, initial_delay=1):
+    Nothing is recorded here: how long a script ran or why it exited says
+    little about the site, so only the page requests ECI.py makes adapt
+    its throttle.
+    """
     for attempt in range(max_retries):
+        await throttle.acquire(host)
         try:
             return await func()
         except Exception as e:
             if attempt == max_retries - 1:
                 raise
-            delay = initial_delay * (2**attempt)
-            logging.warning(
-                f"Attempt {attempt + 1} failed, retrying in {delay} seconds..."
-            )
-            await asyncio.sleep(delay)
+            RETRIES_TOTAL.inc(source="main")
+            logging.warning(f"Attempt {attempt + 1} failed, retrying: {e}")
 
 
-# Initialize rate limiter
-rate_limiter = RateLimiter(calls_per_second=1)
+class CrawlFailedError(Exception):
+    """The crawl could not run, or ran without scraping a single course."""
+
+
+class ScriptFailedError(Exception):
+    def __init__(self, result):
+        super().__init__(f"exited with error code {result.returncode}")
+        self.returncode = result.returncode
+        self.stderr = "\n".join(result.stderr_tail)
+
+
+# Retry budgets for a full crawl and for targeted re-crawls of known gaps
+DEFAULT_MAX_RETRIES = 3
+TARGETED_MAX_RETRIES = 5
+# ECI.py reports each course's outcome in a results file here
+RESULTS_DIR = DATA_DIR / "checkpoints"
+# Courses crawled per ECI.py process
+BATCH_SIZE = 50
+# How often the results of a running batch are read into the journal
+RESULTS_POLL_SECONDS = 1.0
+# ECI.py's request throttle, handed from each batch to the next
+THROTTLE_STATE_FILE = RESULTS_DIR / "eci_throttle.json"
 
 
 # Async function for running scripts
@@ -71,63 +92,65 @@ async def run_script(script_name):
         return
 
     async def _run():
-        await rate_limiter.acquire()
-        process = await asyncio.create_subprocess_exec(
-            sys.executable,
-            str(script_path),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        return await run_streaming(
+            [sys.executable, str(script_path)], name=script_name, log=child_output
         )
-        stdout, stderr = await process.communicate()
-        return process.returncode, stdout, stderr
 
     try:
-        returncode, stdout, stderr = await retry_with_backoff(_run)
-        if returncode == 0:
+        result = await retry_with_throttle(_run)
+        logging.info(result.summary())
+        if result.returncode == 0:
             logging.info(f"Script {script_name} completed successfully.")
-            logging.debug(stdout.decode())
         else:
-            logging.error(f"Script {script_name} failed with error code {returncode}.")
-            logging.error(stderr.decode())
+            logging.error(
+                f"Script {script_name} failed with error code {result.returncode}."
+            )
     except Exception as e:
         logging.error(f"Failed to run script {script_name} after retries: {e}")
 
 
-# Function to run a script with arguments
-async def run_script_with_args(script_name, *args):
+# Function to run a script with arguments, returns True if the script succeeded
+async def run_script_with_args(script_name, *args, max_retries=DEFAULT_MAX_RETRIES):
     script_path = SCRIPTS_DIR / script_name
     if not script_path.exists():
         logging.error(f"Script not found: {script_path}")
-        return
+        return False
 
     async def _run():
-        await rate_limiter.acquire()
-        process = await asyncio.create_subprocess_exec(
-            sys.executable,
-            str(script_path),
-            *args,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        # The child writes its crawl metrics here and they are merged below
+        metrics_file = METRICS_DIR / f"child_{uuid.uuid4().hex}.json"
+        # Child output goes to the log file as it arrives (DEBUG keeps the
+        # console quiet); the last stderr lines are reported on failure
+        result = await run_streaming(
+            [sys.executable, str(script_path), *args],
+            name=script_name,
+            log=child_output,
+            stdout_level=logging.DEBUG,
+            stderr_level=logging.DEBUG,
+            env={**os.environ, METRICS_FILE_ENV: str(metrics_file)},
         )
-        stdout, stderr = await process.communicate()
-        return process.returncode, stdout, stderr
+        REGISTRY.merge_file(metrics_file)
+        if script_name == "ECI.py":
+            COURSE_SECONDS.observe(result.elapsed)
+        logging.info(result.summary())
+        if result.returncode != 0:
+            raise ScriptFailedError(result)
+        return result
 
     try:
-        returncode, stdout, stderr = await retry_with_backoff(_run)
-        if returncode == 0:
-            logging.info(
-                f"Script {script_name} completed successfully with args: {args}"
-            )
-            logging.debug(stdout.decode(errors="replace"))
-        else:
-            logging.error(
-                f"Script {script_name} failed with error code {returncode} and args: {args}"
-            )
-            logging.error(stderr.decode(errors="replace"))
+        await retry_with_throttle(_run, max_retries=max_retries)
+        logging.info(f"Script {script_name} completed successfully with args: {args}")
+        return True
+    except ScriptFailedError as e:
+        logging.error(
+            f"Script {script_name} failed with error code {e.returncode} and args: {args}"
+        )
+        logging.error(e.stderr)
     except Exception as e:
         logging.error(
             f"Failed to run script {script_name} with args {args} after retries: {e}"
         )
+    return False
 
 
 # Check if courses.json exists. If it doesn't then get it
@@ -140,67 +163,457 @@ async def check_and_run():
         await run_script("PCI.py")
 
 
+class ResultsTail:
+    """Follows an ECI.py --results-file while the child appends to it.
+
+    ``results`` maps course code -> latest outcome. Each call to read_new
+    passes the outcomes appended since the last call to ``on_result``;
+    a line still being written is left for the next call.
+    """
+
+    def __init__(self, path, on_result=None):
+        self.path = Path(path)
+        self.on_result = on_result
+        self.offset = 0
+        self.results = {}
+
+    def read_new(self):
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        complete = data[: data.rfind(b"\n") + 1]
+        self.offset += len(complete)
+        for line in complete.decode("utf-8").splitlines():
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self.results[result["course_code"]] = result
+            if self.on_result:
+                self.on_result(result)
+
+
+async def run_eci_batch(
+    courses, file_sink=True, parse_workers=None, on_result=None
+):
+    """Crawl a batch of courses in one ECI.py process.
+
+    ``on_result`` is called with each course's outcome as ECI.py records
+    it, so progress is saved while the batch is still running. Returns
+    course code -> latest outcome for every course ECI.py recorded; a
+    course missing from the result was not reached before the child died.
+    Without the file sink the crawl writes to course_details (and the
+    course history) only, so the import pass has no per-course files to
+    read back. Pages are parsed in ECI.py's worker processes while the
+    next ones download, one per spare core unless ``parse_workers`` is set.
+    """
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    batch_id = uuid.uuid4().hex
+    courses_file = RESULTS_DIR / f"eci_courses_{batch_id}.json"
+    results_file = RESULTS_DIR / f"eci_results_{batch_id}.jsonl"
+    args = ["--courses-file", str(courses_file), "--results-file", str(results_file)]
+    args += ["--throttle-state", str(THROTTLE_STATE_FILE)]
+    if not file_sink:
+        args.append("--no-file-sink")
+    if parse_workers is not None:
+        args += ["--parse-workers", str(parse_workers)]
+    tail = ResultsTail(results_file, on_result)
+
+    async def follow():
+        while True:
+            await asyncio.sleep(RESULTS_POLL_SECONDS)
+            tail.read_new()
+
+    follower = None
+    try:
+        with open(courses_file, "w", encoding="utf-8") as f:
+            json.dump(courses, f)
+        follower = asyncio.ensure_future(follow())
+        try:
+            await run_script_with_args("ECI.py", *args, max_retries=1)
+        finally:
+            follower.cancel()
+            tail.read_new()
+        return tail.results
+    finally:
+        courses_file.unlink(missing_ok=True)
+        results_file.unlink(missing_ok=True)
+
+
+async def crawl_courses(
+    courses, max_retries, journal, coverage, parse_workers=None
+):
+    """Crawl courses in batches of BATCH_SIZE until each succeeds or fails for good.
+
+    ECI.py records each course in crawl_status itself and reports its
+    outcome in a results file, marking failures another attempt would
+    repeat (no page, 404, parse errors) as permanent; those are not
+    retried, and the rest are crawled again in the next round. Each
+    outcome is journaled as soon as ECI.py records it, so --resume skips
+    every course that finished before an interruption. Only when the child
+    died before recording a course does this write its status.
+    Returns the numbers of successful and failed courses.
+    """
+    # With MongoDB up the crawl writes course_details directly; courses it
+    # fails to write are saved to data/raw and reported as failed instead
+    file_sink = coverage is None
+
+    def journal_result(result):
+        # A course can be ok and then failed when its MongoDB write fails
+        if result["status"] == STATUS_FAILED:
+            journal.record(result["course_code"], STATUS_FAILED, result.get("error"))
+        else:
+            journal.record(result["course_code"], STATUS_OK)
+
+    successful = failed = 0
+    pending = courses
+    for attempt in range(max_retries):
+        if not pending:
+            break
+        if attempt:
+            RETRIES_TOTAL.inc(len(pending), source="main")
+            logging.warning(
+                f"Retrying {len(pending)} courses ({attempt + 1}/{max_retries})"
+            )
+        last_round = attempt == max_retries - 1
+        retry = []
+        for start in range(0, len(pending), BATCH_SIZE):
+            batch = pending[start : start + BATCH_SIZE]
+            logging.info(
+                f"Crawling courses {start + 1}-{start + len(batch)} of {len(pending)}"
+            )
+            results = await run_eci_batch(
+                batch, file_sink, parse_workers, on_result=journal_result
+            )
+            for course in batch:
+                course_code = course["courseCode"]
+                result = results.get(course_code)
+                if result is not None and result["status"] != STATUS_FAILED:
+                    successful += 1
+                elif not last_round and not (result and result.get("permanent")):
+                    retry.append(course)
+                else:
+                    if result is None:
+                        error = "ECI.py ended without recording a result"
+                        if coverage:
+                            coverage.record(course_code, STATUS_FAILED, error=error)
+                        journal.record(course_code, STATUS_FAILED, error)
+                    failed += 1
+        pending = retry
+    return successful, failed
+
+
+def read_course_codes(path):
+    """Read course codes from a gap report or a plain list of codes.
+
+    Accepts the JSON output of find_filtered_courses.py, find_missing_details.py
+    and coverage_report.py (lists of objects with a course_code), a JSON list
+    of codes, or a text file with one code per line.
+    """
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix != ".json":
+        return [line.strip() for line in text.splitlines() if line.strip()]
+
+    codes = []
+    for entry in json.loads(text):
+        if isinstance(entry, str):
+            codes.append(entry)
+        elif entry.get("course_code") or entry.get("courseCode"):
+            codes.append(entry.get("course_code") or entry.get("courseCode"))
+    return codes
+
+
+def find_missing_course_codes():
+    """Return the codes of courses that still need to be crawled.
+
+    Uses the crawl_status collection when MongoDB is available and falls back
+    to the gap reports saved in data/processed.
+    """
+    coverage = connect_coverage()
+    if coverage:
+        codes = coverage.gap_codes()
+        coverage.close()
+        logging.info(f"Found {len(codes)} courses to re-crawl in crawl_status")
+        return codes
+
+    codes = []
+    for report in ("filtered_courses.json", "courses_with_missing_details.json"):
+        report_file = DATA_DIR / "processed" / report
+        if report_file.exists():
+            codes.extend(read_course_codes(report_file))
+    logging.info(f"Found {len(codes)} courses to re-crawl in data/processed")
+    return codes
+
+
+def filter_unchanged_courses(courses, coverage):
+    """Drop courses whose page has not changed since their last good crawl.
+
+    Uses the sitemap lastmod dates stored in courses.json by PCI.py --sitemap.
+    Courses without a lastmod or without a successful crawl are kept.
+    """
+    if not coverage:
+        logging.warning("Incremental crawl needs MongoDB, crawling all courses")
+        return courses
+
+    last_success = coverage.last_success_dates()
+    changed = []
+    for course in courses:
+        crawled = last_success.get(course.get("courseCode"))
+        lastmod = course.get("lastmod")
+        if crawled and lastmod:
+            try:
+                if datetime.fromisoformat(lastmod[:10]).date() < crawled.date():
+                    continue
+            except ValueError:
+                pass
+        changed.append(course)
+
+    logging.info(
+        f"Incremental crawl: {len(courses) - len(changed)} unchanged courses skipped"
+    )
+    return changed
+
+
 # Function to pull course information from the JSON file and plug into extract course information script
-async def pull_course_information():
+async def pull_course_information(
+    only_codes=None,
+    max_retries=DEFAULT_MAX_RETRIES,
+    incremental=False,
+    resume=False,
+    parse_workers=None,
+):
     courses_file = DATA_DIR / "raw" / "courses.json"
     try:
         with open(courses_file, "r", encoding="utf-8") as file:
             data = json.load(file)
     except (json.JSONDecodeError, FileNotFoundError) as e:
         logging.error(f"Error reading courses file: {e}")
-        return
+        return None
 
     if not isinstance(data, dict) or "list_of_courses" not in data:
         logging.error("Invalid courses data structure")
-        return
+        return None
+
+    # Register every listed course so uncrawled ones show up as gaps
+    coverage = connect_coverage()
+    if coverage:
+        coverage.seed_courses(data["list_of_courses"])
+
+    courses = data["list_of_courses"]
+    if only_codes is not None:
+        wanted = set(only_codes)
+        courses = [course for course in courses if course.get("courseCode") in wanted]
+        unknown = wanted - {course.get("courseCode") for course in courses}
+        if unknown:
+            logging.warning(
+                f"Ignoring course codes not in courses.json: {sorted(unknown)}"
+            )
+
+    if incremental:
+        courses = filter_unchanged_courses(courses, coverage)
+
+    # Progress is journaled per course so an interrupted crawl can be resumed
+    journal = CrawlJournal()
+    if resume:
+        journal.load()
+        completed = journal.completed_codes()
+        courses = [
+            course for course in courses if course.get("courseCode") not in completed
+        ]
+        logging.info(
+            f"Resuming crawl: {len(completed)} courses already done, "
+            f"{len(journal.failed_codes())} failed courses will be retried"
+        )
+    else:
+        journal.start_new()
 
-    total_courses = len(data["list_of_courses"])
+    total_courses = len(courses)
     logging.info(f"Processing {total_courses} courses...")
 
-    successful_courses = 0
+    batch = []
     failed_courses = 0
-
-    for i, course in enumerate(data["list_of_courses"]):
-        try:
-            course_code = course.get("courseCode")
-            course_title = course.get("course_title")
-
-            if not course_code or not course_title:
-                logging.warning(f"Skipping invalid course data at index {i}")
-                failed_courses += 1
-                continue
-
-            logging.info(
-                f"Processing course {i+1}/{total_courses}: {course_code} - {course_title}"
-            )
-            await run_script_with_args("ECI.py", course_code, course_title)
-            successful_courses += 1
-
-        except Exception as e:
-            logging.error(f"Error processing course {i}: {e}")
+    for i, course in enumerate(courses):
+        if not course.get("courseCode") or not course.get("course_title"):
+            logging.warning(f"Skipping invalid course data at index {i}")
             failed_courses += 1
             continue
+        # Pass on the page URL from sitemap discovery when we have one
+        batch.append(
+            {
+                "courseCode": course["courseCode"],
+                "course_title": course["course_title"],
+                "url": course.get("url"),
+            }
+        )
+
+    successful_courses, failed = await crawl_courses(
+        batch, max_retries, journal, coverage, parse_workers
+    )
+    failed_courses += failed
 
     logging.info(
         f"Course processing completed. Successful: {successful_courses}, Failed: {failed_courses}"
     )
 
+    if coverage:
+        logging.info(f"Crawl coverage: {coverage.status_counts()}")
+        coverage.close()
+    return successful_courses, failed_courses
 
-# Main script
-async def main():
-    try:
-        logging.info("Starting course scraping process")
-        # Check if there is a course json file with all the course information.
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape QUT course information.")
+    targets = parser.add_mutually_exclusive_group()
+    targets.add_argument(
+        "--only-missing",
+        action="store_true",
+        help="only crawl courses that are missing, failed or filtered in the last run",
+    )
+    targets.add_argument(
+        "--codes", nargs="+", metavar="CODE", help="only crawl these course codes"
+    )
+    targets.add_argument(
+        "--codes-file",
+        metavar="PATH",
+        help="only crawl the courses listed in a gap report or code list",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue an interrupted crawl, skipping courses that already completed",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="refresh sitemap lastmod dates and skip course pages that have not changed",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        help=f"attempts per course (default {DEFAULT_MAX_RETRIES}, "
+        f"{TARGETED_MAX_RETRIES} for targeted runs)",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        help="processes parsing pages in each ECI.py run (default one per spare core, "
+        "0 parses inline)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="serve Prometheus metrics on this port while the crawl runs",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile each stage, including the ECI.py runs, into logs/profiles/",
+    )
+    parser.add_argument(
+        "--http-cache",
+        action="store_true",
+        help="reuse responses cached in data/cache/http instead of refetching",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="only replay cached responses; courses that are not cached fail",
+    )
+    return parser.parse_args(argv)
+
+
+async def crawl(args):
+    """One crawl as configured by args; errors propagate to the caller.
+
+    Returns the numbers of successful and failed courses. Raises
+    CrawlFailedError when there is no course list or every course failed.
+    """
+    logging.info("Starting course scraping process")
+    # Check if there is a course json file with all the course information.
+    with profile_stage("main.check_and_run"):
         await check_and_run()
 
-        # Run the script to pull course information
-        await pull_course_information()
-        logging.info("Course scraping process completed successfully")
+    if args.incremental:
+        if is_offline():
+            logging.warning("Offline: using the sitemap dates already in courses.json")
+        else:
+            await run_script_with_args("PCI.py", "--sitemap")
+
+    only_codes = None
+    if args.only_missing:
+        only_codes = find_missing_course_codes()
+    elif args.codes:
+        only_codes = args.codes
+    elif args.codes_file:
+        only_codes = read_course_codes(args.codes_file)
+
+    max_retries = args.max_retries
+    if max_retries is None:
+        max_retries = (
+            DEFAULT_MAX_RETRIES if only_codes is None else TARGETED_MAX_RETRIES
+        )
+
+    # Run the script to pull course information
+    with profile_stage("main.pull_course_information"):
+        counts = await pull_course_information(
+            only_codes,
+            max_retries=max_retries,
+            incremental=args.incremental,
+            resume=args.resume,
+            parse_workers=args.parse_workers,
+        )
+    if counts is None:
+        raise CrawlFailedError("No usable courses.json to crawl")
+    successful, failed = counts
+    if failed and not successful:
+        raise CrawlFailedError(f"All {failed} courses failed")
+    logging.info("Course scraping process completed successfully")
+    return counts
+
+
+# Main script
+async def main(args=None):
+    if args is None:
+        args = parse_args([])
+
+    # Create data directories if they don't exist
+    (DATA_DIR / "raw").mkdir(parents=True, exist_ok=True)
+    (DATA_DIR / "processed").mkdir(parents=True, exist_ok=True)
+    # Setup logging: logs/scraper.log (rotated and gzipped) plus the console,
+    # written from a background thread
+    setup_logging("scraper")
+
+    # Crawl metrics: a JSON snapshot every 30 seconds and at the end, plus a
+    # Prometheus endpoint when a port is given
+    metrics_file = METRICS_DIR / "main.json"
+    REGISTRY.start_snapshot_writer(metrics_file)
+    if args.metrics_port:
+        REGISTRY.start_http_server(args.metrics_port)
+    # Child scripts inherit the setting and profile themselves
+    if args.profile:
+        enable_profiling()
+    else:
+        enable_from_env()
+    if args.offline:
+        os.environ[CACHE_ENV] = OFFLINE
+    elif args.http_cache:
+        os.environ[CACHE_ENV] = "1"
+
+    try:
+        await crawl(args)
     except Exception as e:
         logging.error(f"Fatal error in main process: {e}")
         sys.exit(1)
+    finally:
+        logging.info(f"Throttle state: {throttle.snapshot()}")
+        REGISTRY.write_snapshot(metrics_file)
+        logging.info(f"Metrics written to {metrics_file}")
 
 
 # Run the main function
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))
@@ -1,74 +1,134 @@
 import asyncio
-import subprocess
+import argparse
 import sys
-import os
 import time
+import logging
 from pathlib import Path
 
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).parent.parent
 
-
-async def run_script(script_name):
-    """Run a Python script and wait for it to complete."""
-    print(f"\n{'='*80}")
-    print(f"Running {script_name}...")
-    print(f"{'='*80}")
-
-    # Construct the full path to the script
-    script_path = PROJECT_ROOT / "src" / script_name
-
-    process = await asyncio.create_subprocess_exec(
-        sys.executable,
-        str(script_path),
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
+sys.path.insert(0, str(PROJECT_ROOT))
+from src.utils.pipeline import STATUS_BLOCKED, STATUS_FAILED, Pipeline, Stage
+from src.utils.profiling import enable as enable_profiling
+
+logger = logging.getLogger("pipeline")
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+
+def build_stages(resume=False):
+    """The refresh pipeline. Courses, occupations and jobs are independent
+    branches, so they run in parallel and each import follows its scraper."""
+    return [
+        # Courses: crawl -> import -> remove the intermediate JSON files
+        Stage(
+            "course_crawl",
+            "src/main.py",
+            args=["--resume"] if resume else [],
+            outputs=["data/checkpoints/crawl_journal.jsonl"],
+            max_age=DAY,
+        ),
+        Stage(
+            "course_import",
+            "src/database/mongodb/import_to_mongodb.py",
+            depends_on=["course_crawl"],
+        ),
+        Stage("cleanup", "src/cleanup.py", depends_on=["course_import"]),
+        # Skilled occupations
+        Stage(
+            "occupation_scrape",
+            "occupations/occupation_scraper.py",
+            outputs=["occupations/data/raw"],
+            max_age=7 * DAY,
+        ),
+        Stage(
+            "occupation_import",
+            "occupations/database/mongodb/import_occupations.py",
+            depends_on=["occupation_scrape"],
+            inputs=["occupations/data/raw"],
+        ),
+        # Job board
+        Stage(
+            "job_scrape",
+            "Job_Board/careerjet_scraper.py",
+            max_age=DAY,
+        ),
+        Stage(
+            "job_import",
+            "Job_Board/import_jobs.py",
+            depends_on=["job_scrape"],
+        ),
+    ]
+
+
+def build_pipeline(resume=False):
+    return Pipeline(
+        build_stages(resume), PROJECT_ROOT, PROJECT_ROOT / "data" / "pipeline"
     )
 
-    stdout, stderr = await process.communicate()
 
-    if process.returncode == 0:
-        print(f"Script {script_name} completed successfully.")
-        print(stdout.decode())
-    else:
-        print(f"Script {script_name} failed with error code {process.returncode}.")
-        print(stderr.decode())
-
-    return process.returncode
-
-
-async def main():
-    """Run the full process: extract data, import to MongoDB, and clean up."""
+async def main(resume=False, targets=None, force=False):
+    """Run the full refresh pipeline and report how each stage went."""
     start_time = time.time()
 
-    # Step 1: Run the main script to extract all course information
-    result = await run_script("main.py")
-    if result != 0:
-        print("Error extracting course information. Aborting.")
-        return
-
-    # Step 2: Import the data to MongoDB
-    result = await run_script("database/mongodb/import_to_mongodb.py")
-    if result != 0:
-        print("Error importing data to MongoDB. Aborting.")
-        return
-
-    # Step 3: Clean up JSON files
-    result = await run_script("cleanup.py")
-    if result != 0:
-        print("Error cleaning up JSON files. Aborting.")
-        return
+    results = await build_pipeline(resume).run(targets=targets, force=force)
 
-    end_time = time.time()
-    duration = end_time - start_time
+    duration = time.time() - start_time
 
     print(f"\n{'='*80}")
-    print(f"Full process completed in {duration:.2f} seconds.")
+    print("Stage summary:")
+    for name, (status, result) in results.items():
+        detail = f" - {result.summary()}" if result else ""
+        print(f"  {name}: {status}{detail}")
     print(f"{'='*80}")
-    print(f"All course information has been extracted and saved to MongoDB.")
-    print(f"JSON files have been cleaned up.")
+    print(f"Full process completed in {duration:.2f} seconds.")
     print(f"{'='*80}")
 
+    failed = [
+        name
+        for name, (status, _) in results.items()
+        if status in (STATUS_FAILED, STATUS_BLOCKED)
+    ]
+    return 1 if failed else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh all QUT course data.")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue a course crawl that was interrupted part way through",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="run stages even if their outputs are fresh"
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        metavar="STAGE",
+        help="run only these stages and the stages they depend on",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile the crawl, import and scrape stages into logs/profiles/",
+    )
+    parser.add_argument("--list", action="store_true", help="list the stages and exit")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    if args.list:
+        for stage in build_stages():
+            after = f" (after {', '.join(stage.depends_on)})" if stage.depends_on else ""
+            print(f"{stage.name}: {stage.script}{after}")
+        sys.exit(0)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    # Stages inherit the setting through the environment
+    if args.profile:
+        enable_profiling()
+    sys.exit(asyncio.run(main(resume=args.resume, targets=args.only, force=args.force)))
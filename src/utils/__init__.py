@@ -0,0 +1,3 @@
+"""
+Shared helpers: logging, metrics, HTTP caching, throttling and MongoDB access.
+"""
@@ -0,0 +1,166 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+from pathlib import Path
+from urllib.parse import urldefrag
+
+logger = logging.getLogger(__name__)
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+CACHE_DIR = PROJECT_ROOT / "data" / "cache" / "http"
+
+# QUT_HTTP_CACHE=1 turns the cache on, QUT_HTTP_CACHE=offline replays from
+# it and fails on a miss. Child scripts inherit both from main.py.
+CACHE_ENV = "QUT_HTTP_CACHE"
+TTL_ENV = "QUT_HTTP_CACHE_TTL"
+MAX_MB_ENV = "QUT_HTTP_CACHE_MAX_MB"
+OFFLINE = "offline"
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a request is not in the cache."""
+
+
+def is_offline():
+    """True when $QUT_HTTP_CACHE asks to replay the cache only."""
+    return os.environ.get(CACHE_ENV, "").lower() == OFFLINE
+
+
+class HttpCache:
+    """Gzipped HTTP responses on disk, keyed by method, URL and request body.
+
+    Keys describe the request as it goes over the wire, so the Scrapy
+    middleware and the requests-based scrapers share entries for the same
+    page. Entries older than ``ttl`` seconds are refetched, except in
+    offline mode, which only ever replays the cache. When the cache grows
+    past ``max_bytes`` the least recently used entries are removed.
+    """
+
+    def __init__(
+        self,
+        directory=CACHE_DIR,
+        ttl=DEFAULT_TTL,
+        max_bytes=DEFAULT_MAX_BYTES,
+        offline=False,
+    ):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.size = None
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls, enabled=False, offline=False):
+        """The cache configured by $QUT_HTTP_CACHE, or None when it is off."""
+        mode = os.environ.get(CACHE_ENV, "").lower()
+        offline = offline or is_offline()
+        if not (enabled or offline or mode in ("1", "true", "yes")):
+            return None
+        max_mb = int(os.environ.get(MAX_MB_ENV, DEFAULT_MAX_BYTES // 2**20))
+        return cls(
+            ttl=int(os.environ.get(TTL_ENV, DEFAULT_TTL)),
+            max_bytes=max_mb * 2**20,
+            offline=offline,
+        )
+
+    @staticmethod
+    def key(method, url, body=b""):
+        """The cache key of a request. The fragment is dropped (it is never
+        sent) and a missing body is the same as an empty one."""
+        digest = hashlib.sha256()
+        url = urldefrag(url).url
+        for part in (method.upper().encode(), url.encode(), body or b""):
+            digest.update(part)
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def path(self, key):
+        return self.directory / key[:2] / f"{key}.gz"
+
+    def get(self, key):
+        """Return the cached response as a dict, or None on a miss."""
+        path = self.path(key)
+        try:
+            with gzip.open(path, "rb") as f:
+                meta, _, body = f.read().partition(b"\n")
+            entry = json.loads(meta)
+        except FileNotFoundError:
+            entry = None
+        except (OSError, ValueError, EOFError) as e:
+            logger.warning(f"Ignoring corrupt cache entry {path.name}: {e}")
+            entry = None
+
+        if entry is not None and not self.offline:
+            if time.time() - entry["stored_at"] > self.ttl:
+                entry = None
+
+        if entry is None:
+            self.misses += 1
+            if self.offline:
+                raise CacheMiss(f"Not in the HTTP cache: {key}")
+            return None
+
+        self.hits += 1
+        # Touch the file so eviction drops the least recently used entries
+        os.utime(path)
+        entry["body"] = body
+        return entry
+
+    def put(self, key, url, status, headers, body):
+        """Store a response. ``headers`` maps names to lists of values."""
+        meta = {
+            "url": url,
+            "status": status,
+            "headers": headers,
+            "stored_at": time.time(),
+        }
+        if self.size is None:
+            self.size = self._total_size()
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with gzip.open(tmp_file, "wb", compresslevel=6) as f:
+            f.write(json.dumps(meta).encode("utf-8") + b"\n" + body)
+        os.replace(tmp_file, path)
+
+        self.size += path.stat().st_size
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        return [p for p in self.directory.glob("*/*.gz") if p.is_file()]
+
+    def _total_size(self):
+        return sum(p.stat().st_size for p in self._entries())
+
+    def evict(self):
+        """Delete least recently used entries down to 90% of ``max_bytes``."""
+        entries = []
+        for path in self._entries():
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            removed += 1
+        self.size = size
+        logger.info(f"Evicted {removed} entries from the HTTP cache")
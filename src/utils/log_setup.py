@@ -0,0 +1,139 @@
+import os
+import gzip
+import time
+import queue
+import atexit
+import shutil
+import logging
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+LOG_DIR = PROJECT_ROOT / "logs"
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+
+_listener = None
+
+
+def _gzip_namer(name):
+    return f"{name}.gz"
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def rotating_file_handler(
+    path, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, when=None
+):
+    """A file handler that rotates by size (or by time if ``when`` is given,
+    e.g. "midnight") and gzips the rotated files."""
+    if when:
+        handler = TimedRotatingFileHandler(
+            path, when=when, backupCount=backup_count, encoding="utf-8"
+        )
+    else:
+        handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+    handler.namer = _gzip_namer
+    handler.rotator = _gzip_rotator
+    return handler
+
+
+def setup_logging(
+    log_name,
+    level=logging.INFO,
+    console_level=logging.INFO,
+    log_format=LOG_FORMAT,
+    log_dir=LOG_DIR,
+    max_bytes=MAX_BYTES,
+    backup_count=BACKUP_COUNT,
+    when=None,
+):
+    """Log to logs/<log_name>.log (and the console) without blocking the caller.
+
+    The root logger only puts records on a queue; a background listener
+    thread formats them and does the file and console writes. Pass
+    ``console_level=None`` for file-only logging. Calling this again is a
+    no-op, so scripts imported by other scripts keep the caller's setup.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    formatter = logging.Formatter(log_format)
+
+    file_handler = rotating_file_handler(
+        log_dir / f"{log_name}.log", max_bytes, backup_count, when
+    )
+    file_handler.setFormatter(formatter)
+    handlers = [file_handler]
+
+    if console_level is not None:
+        console = logging.StreamHandler()
+        console.setLevel(console_level)
+        console.setFormatter(formatter)
+        handlers.append(console)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Write out anything still queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class ItemLogSampler:
+    """Logs the first few items and then every Nth one instead of every item.
+
+    Messages use %-style arguments so the skipped ones are never formatted.
+    ``summary()`` logs the total count and rate once the loop is done.
+    """
+
+    def __init__(self, logger, label, first=5, every=100, level=logging.INFO):
+        self.logger = logger
+        self.label = label
+        self.first = first
+        self.every = every
+        self.level = level
+        self.count = 0
+        self.started = time.perf_counter()
+
+    def log(self, msg, *args):
+        self.count += 1
+        if self.count <= self.first or self.count % self.every == 0:
+            self.logger.log(
+                self.level, "[%s #%d] " + msg, self.label, self.count, *args
+            )
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        self.logger.info(
+            f"{self.label}: {self.count} items in {elapsed:.1f}s ({rate:.1f}/s)"
+        )
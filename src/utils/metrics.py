@@ -0,0 +1,298 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+METRICS_DIR = PROJECT_ROOT / "logs" / "metrics"
+
+# Child processes write their snapshot here when it is set, so the parent
+# can merge it into its own registry
+METRICS_FILE_ENV = "QUT_METRICS_FILE"
+
+SECONDS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300
+)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+# Whole refreshes take minutes to hours
+REFRESH_BUCKETS = (60, 300, 900, 1800, 3600, 7200, 14400, 28800, 86400)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                {"labels": dict(key), "value": value}
+                for key, value in self.values.items()
+            ]
+
+    def merge(self, series):
+        for entry in series:
+            self.inc(entry["value"], **entry["labels"])
+
+    def prometheus_lines(self):
+        with self.lock:
+            return [
+                f"{self.name}{_format_labels(key)} {value}"
+                for key, value in self.values.items()
+            ]
+
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus style."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def _get(self, key):
+        if key not in self.series:
+            self.series[key] = {
+                "counts": [0] * (len(self.buckets) + 1),
+                "sum": 0.0,
+                "count": 0,
+            }
+        return self.series[key]
+
+    def observe(self, value, **labels):
+        with self.lock:
+            series = self._get(_label_key(labels))
+            index = len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    index = i
+                    break
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                {
+                    "labels": dict(key),
+                    "buckets": list(self.buckets),
+                    "counts": list(series["counts"]),
+                    "sum": series["sum"],
+                    "count": series["count"],
+                }
+                for key, series in self.series.items()
+            ]
+
+    def merge(self, series_list):
+        with self.lock:
+            for entry in series_list:
+                if tuple(entry["buckets"]) != self.buckets:
+                    continue
+                series = self._get(_label_key(entry["labels"]))
+                for i, count in enumerate(entry["counts"]):
+                    series["counts"][i] += count
+                series["sum"] += entry["sum"]
+                series["count"] += entry["count"]
+
+    def prometheus_lines(self):
+        lines = []
+        with self.lock:
+            for key, series in self.series.items():
+                cumulative = 0
+                bounds = list(self.buckets) + ["+Inf"]
+                for bound, count in zip(bounds, series["counts"]):
+                    cumulative += count
+                    labels = _format_labels(key, [("le", bound)])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(key)
+                lines.append(f"{self.name}_sum{labels} {series['sum']}")
+                lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def _register(self, cls, name, help_text, *args):
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = cls(name, help_text, *args)
+            return self.metrics[name]
+
+    def counter(self, name, help_text=""):
+        return self._register(Counter, name, help_text)
+
+    def histogram(self, name, help_text="", buckets=SECONDS_BUCKETS):
+        return self._register(Histogram, name, help_text, buckets)
+
+    def snapshot(self):
+        uptime = time.time() - self.started
+        metrics = {}
+        rates = {}
+        with self.lock:
+            registered = list(self.metrics.items())
+        for name, metric in registered:
+            # Rates come from the series read under the metric's lock
+            series = metric.snapshot()
+            metrics[name] = {
+                "type": metric.kind,
+                "help": metric.help,
+                "series": series,
+            }
+            if metric.kind == "counter" and uptime > 0:
+                total = sum(point["value"] for point in series)
+                rates[f"{name}_per_second"] = total / uptime
+        return {"uptime_seconds": uptime, "metrics": metrics, "rates": rates}
+
+    def merge(self, snapshot):
+        """Add the counts from another process's snapshot."""
+        for name, data in snapshot.get("metrics", {}).items():
+            if data["type"] == "counter":
+                self.counter(name, data["help"]).merge(data["series"])
+            elif data["type"] == "histogram" and data["series"]:
+                buckets = data["series"][0]["buckets"]
+                self.histogram(name, data["help"], buckets).merge(data["series"])
+
+    def merge_file(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.merge(json.load(f))
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not merge metrics from {path}: {e}")
+
+    def to_prometheus(self):
+        lines = []
+        for name, metric in list(self.metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.prometheus_lines())
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_file, path)
+
+    def write_child_snapshot(self):
+        """Write the snapshot to $QUT_METRICS_FILE when a parent asked for it."""
+        path = os.environ.get(METRICS_FILE_ENV)
+        if path:
+            self.write_snapshot(path)
+
+    def start_snapshot_writer(self, path, interval=30):
+        """Write a JSON snapshot every ``interval`` seconds from a daemon thread."""
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write_snapshot(path)
+                except OSError as e:
+                    logger.warning(f"Could not write metrics snapshot: {e}")
+
+        threading.Thread(target=loop, name="metrics-snapshot", daemon=True).start()
+
+    def start_http_server(self, port, host="127.0.0.1"):
+        """Serve the Prometheus text format on http://host:port/metrics."""
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(
+            target=server.serve_forever, name="metrics-http", daemon=True
+        ).start()
+        logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+        return server
+
+
+# Process-wide registry shared by all instrumented code
+REGISTRY = Registry()
+
+FETCH_SECONDS = REGISTRY.histogram("crawl_fetch_seconds", "Time to download a page")
+PARSE_SECONDS = REGISTRY.histogram("crawl_parse_seconds", "Time to parse a page")
+RESPONSE_BYTES = REGISTRY.histogram(
+    "crawl_response_bytes", "Size of downloaded pages", BYTES_BUCKETS
+)
+ITEMS_TOTAL = REGISTRY.counter("crawl_items_total", "Items extracted")
+RETRIES_TOTAL = REGISTRY.counter("crawl_retries_total", "Retried requests or scripts")
+COURSE_SECONDS = REGISTRY.histogram(
+    "crawl_course_seconds", "Wall-clock time of one ECI.py run"
+)
+MONGO_WRITE_SECONDS = REGISTRY.histogram(
+    "mongo_write_seconds", "Latency of MongoDB writes"
+)
+THROTTLE_WAIT_SECONDS = REGISTRY.histogram(
+    "throttle_wait_seconds", "Time spent waiting on the per-host throttle"
+)
+CIRCUIT_OPENS_TOTAL = REGISTRY.counter(
+    "circuit_opens_total", "Times a host's circuit breaker opened"
+)
+REFRESH_RUNS_TOTAL = REGISTRY.counter(
+    "daemon_refresh_runs_total", "Scheduled refreshes by outcome (ok, failed, skipped)"
+)
+REFRESH_SECONDS = REGISTRY.histogram(
+    "daemon_refresh_seconds", "Wall-clock time of one scheduled refresh", REFRESH_BUCKETS
+)
@@ -0,0 +1,108 @@
+import os
+import atexit
+import logging
+import threading
+from datetime import datetime
+from importlib.util import find_spec
+
+from pymongo import MongoClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URI = "mongodb://localhost:27017/"
+
+# Every setting can be overridden from the environment, e.g.
+# MONGODB_URI=mongodb://db:27017/ MONGODB_MAX_POOL_SIZE=20 python src/main.py
+URI_ENV = "MONGODB_URI"
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _write_concern():
+    w = os.environ.get("MONGODB_W", "1")
+    return int(w) if w.isdigit() else w
+
+
+def _default_compressors():
+    """Wire compressors in order of preference, skipping missing libraries."""
+    compressors = []
+    if find_spec("zstandard"):
+        compressors.append("zstd")
+    if find_spec("snappy"):
+        compressors.append("snappy")
+    compressors.append("zlib")
+    return ",".join(compressors)
+
+
+def client_options():
+    """Keyword arguments for MongoClient, read from the environment."""
+    return {
+        "maxPoolSize": _env_int("MONGODB_MAX_POOL_SIZE", 50),
+        "minPoolSize": _env_int("MONGODB_MIN_POOL_SIZE", 0),
+        "maxIdleTimeMS": _env_int("MONGODB_MAX_IDLE_TIME_MS", 60000),
+        "serverSelectionTimeoutMS": _env_int("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        "connectTimeoutMS": _env_int("MONGODB_CONNECT_TIMEOUT_MS", 5000),
+        "socketTimeoutMS": _env_int("MONGODB_SOCKET_TIMEOUT_MS", 60000),
+        "compressors": os.environ.get("MONGODB_COMPRESSORS", _default_compressors()),
+        "w": _write_concern(),
+        "readPreference": os.environ.get("MONGODB_READ_PREFERENCE", "primary"),
+        "retryWrites": True,
+        "appname": "qut-course-scraper",
+    }
+
+
+def get_uri(uri=None):
+    return uri or os.environ.get(URI_ENV, DEFAULT_URI)
+
+
+def get_client(uri=None):
+    """The process-wide MongoClient for ``uri`` (default $MONGODB_URI).
+
+    MongoClient is thread-safe and pools its connections, so every module
+    shares one client per URI instead of opening its own. Do not close it;
+    the clients are closed when the process exits.
+    """
+    uri = get_uri(uri)
+    with _lock:
+        client = _clients.get(uri)
+        if client is None:
+            client = MongoClient(uri, **client_options())
+            _clients[uri] = client
+        return client
+
+
+def get_database(name="qut_courses", uri=None):
+    return get_client(uri)[name]
+
+
+# Importers bump a counter per collection they change, so readers that
+# cache query results (src/api_server.py) know when to drop them
+DATA_VERSIONS = "data_versions"
+
+
+def bump_data_version(db, *collection_names):
+    now = datetime.now()
+    for name in collection_names:
+        db[DATA_VERSIONS].update_one(
+            {"_id": name},
+            {"$inc": {"version": 1}, "$set": {"updated_at": now}},
+            upsert=True,
+        )
+
+
+def data_versions(db):
+    """Current version of every collection that has been imported."""
+    return {doc["_id"]: doc["version"] for doc in db[DATA_VERSIONS].find()}
+
+
+@atexit.register
+def close_clients():
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
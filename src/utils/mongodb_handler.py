@@ -1,7 +1,9 @@
 import logging
 from datetime import datetime
-from pymongo import MongoClient
-from pymongo.errors import ConnectionError, OperationFailure
+from pymongo.errors import ConnectionFailure, OperationFailure
+
+from src.utils.metrics import MONGO_WRITE_SECONDS
+from src.utils.mongo_client import get_client
 
 logger = logging.getLogger(__name__)
 
@@ -9,12 +11,12 @@ logger = logging.getLogger(__name__)
 class MongoDBHandler:
     def __init__(
         self,
-        connection_string="mongodb://localhost:27017/",
+        connection_string=None,
         database_name="job_scraper",
     ):
         """Initialize MongoDB connection"""
         try:
-            self.client = MongoClient(connection_string)
+            self.client = get_client(connection_string)
             self.db = self.client[database_name]
             self.jobs_collection = self.db.jobs
 
@@ -23,7 +25,7 @@ class MongoDBHandler:
             self.jobs_collection.create_index([("title", 1), ("company", 1)])
 
             logger.info("Successfully connected to MongoDB")
-        except ConnectionError as e:
+        except ConnectionFailure as e:
             logger.error(f"Failed to connect to MongoDB: {str(e)}")
             raise
 
@@ -35,14 +37,15 @@ class MongoDBHandler:
                 job_data["scraped_at"] = datetime.now().isoformat()
 
             # Use URL as unique identifier
-            if "url" in job_data:
-                result = self.jobs_collection.update_one(
-                    {"url": job_data["url"]}, {"$set": job_data}, upsert=True
-                )
-                return result.upserted_id or result.modified_count
-            else:
-                result = self.jobs_collection.insert_one(job_data)
-                return result.inserted_id
+            with MONGO_WRITE_SECONDS.time(collection="jobs"):
+                if "url" in job_data:
+                    result = self.jobs_collection.update_one(
+                        {"url": job_data["url"]}, {"$set": job_data}, upsert=True
+                    )
+                    return result.upserted_id or result.modified_count
+                else:
+                    result = self.jobs_collection.insert_one(job_data)
+                    return result.inserted_id
         except Exception as e:
             logger.error(f"Error saving job to MongoDB: {str(e)}")
             return None
@@ -80,9 +83,5 @@ class MongoDBHandler:
             return []
 
     def close(self):
-        """Close MongoDB connection"""
-        try:
-            self.client.close()
-            logger.info("MongoDB connection closed")
-        except Exception as e:
-            logger.error(f"Error closing MongoDB connection: {str(e)}")
+        """Release the handler; the shared MongoDB client is closed at exit"""
+        self.client = self.db = self.jobs_collection = None
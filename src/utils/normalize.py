@@ -0,0 +1,39 @@
+import unicodedata
+from functools import lru_cache
+
+# Typographic quotes and their ASCII equivalents. Applied with str.replace
+# rather than str.translate: translate looks every character up in the
+# table once the text is not ASCII, and is several times slower here.
+TYPOGRAPHIC_QUOTES = (
+    ("‘", "'"),  # left single quote
+    ("’", "'"),  # right single quote
+    ("‚", "'"),  # single low-9 quote
+    ("‛", "'"),  # single high-reversed-9 quote
+    ("“", '"'),  # left double quote
+    ("”", '"'),  # right double quote
+    ("„", '"'),  # double low-9 quote
+    ("‟", '"'),  # double high-reversed-9 quote
+)
+
+# Course pages repeat the same boilerplate paragraphs across courses
+CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _normalize_unicode(text):
+    for quote, ascii_quote in TYPOGRAPHIC_QUOTES:
+        if quote in text:
+            text = text.replace(quote, ascii_quote)
+    return unicodedata.normalize("NFKC", text)
+
+
+def normalize_text(text):
+    """Replace typographic quotes with ASCII ones and NFKC-normalize text.
+
+    Plain ASCII text is already normalized and is returned as is (checking
+    that is constant time in CPython); anything else has its quotes
+    replaced and goes through NFKC once, and the result is memoized.
+    """
+    if not text or text.isascii():
+        return text
+    return _normalize_unicode(text)
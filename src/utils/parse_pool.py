@@ -0,0 +1,95 @@
+import os
+import time
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+
+def timed_call(func, *args):
+    """Run func in a worker and return its result with the seconds it took."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class ParsePool:
+    """Runs CPU-bound parsing in worker processes, off the fetching thread.
+
+    ``submit`` returns a future of ``(result, seconds)``. At most
+    ``max_pending`` parses are in flight; past that ``submit`` blocks
+    until one finishes, so a fetcher that outruns the parsers waits instead
+    of piling pages up in memory. ``max_pending=0`` leaves the bound to the
+    caller. With ``workers=0`` everything is parsed inline in the calling
+    thread, which is cheaper for a single page.
+
+    The functions must live in an importable module so the workers can
+    unpickle them, and a script using the pool must only start its work
+    under ``if __name__ == "__main__"``, or spawned workers would rerun it.
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = default_workers() if workers is None else workers
+        if max_pending is None:
+            max_pending = max(1, self.workers) * 2
+        self.max_pending = max_pending
+        self.slots = threading.BoundedSemaphore(max_pending) if max_pending else None
+        self.executor = ProcessPoolExecutor(self.workers) if self.workers else None
+
+    def submit(self, func, *args):
+        if self.executor is None:
+            future = Future()
+            try:
+                future.set_result(timed_call(func, *args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        if self.slots is None:
+            return self.executor.submit(timed_call, func, *args)
+
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(timed_call, func, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def shutdown(self, wait=True):
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=not wait)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def deferred_from_future(future):
+    """A Twisted Deferred that fires on the reactor thread with the future's result."""
+    from twisted.internet import defer, reactor
+
+    if future.done():
+        try:
+            return defer.succeed(future.result())
+        except Exception as e:
+            return defer.fail(e)
+
+    d = defer.Deferred()
+
+    def fire(done):
+        try:
+            result = done.result()
+        except Exception as e:
+            reactor.callFromThread(d.errback, e)
+        else:
+            reactor.callFromThread(d.callback, result)
+
+    future.add_done_callback(fire)
+    return d
@@ -0,0 +1,164 @@
+import sys
+import time
+import asyncio
+import logging
+from pathlib import Path
+
+from src.utils.subprocess_stream import run_streaming
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_FRESH = "fresh"
+STATUS_BLOCKED = "blocked"
+
+
+class Stage:
+    """One step of the pipeline: a Python script plus what it reads and writes.
+
+    ``inputs`` and ``outputs`` are files or directories relative to the
+    project root. A stage is skipped as fresh when its outputs exist, its
+    last successful run is newer than all its inputs and upstream stages,
+    and (if ``max_age`` is set) that run is less than ``max_age`` seconds old.
+    """
+
+    def __init__(
+        self,
+        name,
+        script,
+        args=(),
+        depends_on=(),
+        inputs=(),
+        outputs=(),
+        max_age=None,
+    ):
+        self.name = name
+        self.script = script
+        self.args = list(args)
+        self.depends_on = list(depends_on)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.max_age = max_age
+
+
+def _latest_mtime(path):
+    """Newest modification time of a file or of any file under a directory."""
+    if not path.exists():
+        return None
+    if path.is_file():
+        return path.stat().st_mtime
+    mtimes = [p.stat().st_mtime for p in path.rglob("*") if p.is_file()]
+    return max(mtimes, default=path.stat().st_mtime)
+
+
+class Pipeline:
+    """Runs stages as a DAG: each stage starts as soon as its dependencies end."""
+
+    def __init__(self, stages, root, stamp_dir):
+        self.stages = {stage.name: stage for stage in stages}
+        self.root = Path(root)
+        self.stamp_dir = Path(stamp_dir)
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a dependency cycle through {name}")
+            if name not in self.stages:
+                raise ValueError(f"Unknown pipeline stage: {name}")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def with_dependencies(self, targets):
+        """The target stages plus everything upstream of them."""
+        selected = set()
+
+        def add(name):
+            if name not in self.stages:
+                raise ValueError(f"Unknown pipeline stage: {name}")
+            if name not in selected:
+                selected.add(name)
+                for dependency in self.stages[name].depends_on:
+                    add(dependency)
+
+        for target in targets:
+            add(target)
+        return [name for name in self.order if name in selected]
+
+    def stamp_file(self, name):
+        return self.stamp_dir / f"{name}.done"
+
+    def is_fresh(self, stage):
+        stamp = self.stamp_file(stage.name)
+        if not stamp.exists():
+            return False
+        finished = stamp.stat().st_mtime
+        if stage.max_age is not None and time.time() - finished > stage.max_age:
+            return False
+        if any(not (self.root / output).exists() for output in stage.outputs):
+            return False
+
+        upstream = [self.root / path for path in stage.inputs]
+        upstream += [self.stamp_file(name) for name in stage.depends_on]
+        for path in upstream:
+            mtime = _latest_mtime(path)
+            if mtime is not None and mtime > finished:
+                return False
+        return True
+
+    async def _run_stage(self, stage, force, futures, results):
+        statuses = [await futures[name] for name in stage.depends_on]
+        if any(status in (STATUS_FAILED, STATUS_BLOCKED) for status in statuses):
+            logger.warning(f"Skipping {stage.name}: an upstream stage failed")
+            results[stage.name] = (STATUS_BLOCKED, None)
+            return STATUS_BLOCKED
+
+        if not force and self.is_fresh(stage):
+            logger.info(f"Skipping {stage.name}: outputs are fresh")
+            results[stage.name] = (STATUS_FRESH, None)
+            return STATUS_FRESH
+
+        logger.info(f"Starting {stage.name}")
+        result = await run_streaming(
+            [sys.executable, str(self.root / stage.script), *stage.args],
+            name=stage.name,
+            log=logger,
+            cwd=str(self.root),
+        )
+        if result.returncode == 0:
+            self.stamp_dir.mkdir(parents=True, exist_ok=True)
+            self.stamp_file(stage.name).touch()
+            status = STATUS_OK
+        else:
+            if result.stderr_tail:
+                logger.error("\n".join(result.stderr_tail))
+            status = STATUS_FAILED
+        logger.info(result.summary())
+        results[stage.name] = (status, result)
+        return status
+
+    async def run(self, targets=None, force=False):
+        """Run the selected stages (default: all); returns name -> (status, result)."""
+        names = self.with_dependencies(targets) if targets else self.order
+        results = {}
+        futures = {}
+        for name in names:
+            # Dependencies come first in topological order, so they already exist
+            futures[name] = asyncio.ensure_future(
+                self._run_stage(self.stages[name], force, futures, results)
+            )
+        await asyncio.gather(*futures.values())
+        return {name: results[name] for name in names}
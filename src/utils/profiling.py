@@ -0,0 +1,138 @@
+import os
+import re
+import sys
+import time
+import pstats
+import cProfile
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+PROFILES_DIR = PROJECT_ROOT / "logs" / "profiles"
+
+# Set by enable() and inherited by child scripts, which then profile
+# themselves into the same directory
+PROFILE_DIR_ENV = "QUT_PROFILE_DIR"
+
+SAMPLE_INTERVAL = 0.005
+TOP_N = 30
+
+_profile_dir = None
+
+
+def enable(output_dir=None):
+    """Turn profiling on for this process and the scripts it starts."""
+    global _profile_dir
+    if output_dir is None:
+        output_dir = PROFILES_DIR / datetime.now().strftime("%Y%m%d_%H%M%S")
+    _profile_dir = Path(output_dir)
+    _profile_dir.mkdir(parents=True, exist_ok=True)
+    os.environ[PROFILE_DIR_ENV] = str(_profile_dir)
+    logger.info(f"Profiling enabled, writing profiles to {_profile_dir}")
+    return _profile_dir
+
+
+def enable_from_env():
+    """Turn profiling on when a parent process asked for it."""
+    if _profile_dir is None and os.environ.get(PROFILE_DIR_ENV):
+        enable(os.environ[PROFILE_DIR_ENV])
+    return _profile_dir is not None
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer to build collapsed stacks.
+
+    The output is the format flamegraph.pl and speedscope read: one line per
+    distinct stack, frames from the root down joined by ";", then the count.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _output_stem(name):
+    """A file name stem for the stage that does not clash with earlier runs."""
+    stem = re.sub(r"[^\w.-]+", "_", name)
+    candidate = _profile_dir / stem
+    counter = 1
+    # Stage names contain dots, so add suffixes by hand, not with_suffix()
+    while Path(f"{candidate}.prof").exists():
+        counter += 1
+        candidate = _profile_dir / f"{stem}.{counter}"
+    return candidate
+
+
+@contextmanager
+def _profile(name, top_n):
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident())
+    start = time.perf_counter()
+    sampler.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        elapsed = time.perf_counter() - start
+
+        stem = _output_stem(name)
+        # .prof for snakeviz/pstats, .collapsed for flame graphs, .txt summary
+        profiler.dump_stats(f"{stem}.prof")
+        sampler.write(f"{stem}.collapsed")
+        with open(f"{stem}.txt", "w", encoding="utf-8") as f:
+            f.write(f"Stage {name}: {elapsed:.2f}s\n\n")
+            stats = pstats.Stats(profiler, stream=f)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top_n)
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(top_n)
+        logger.info(f"Profile for {name} ({elapsed:.2f}s) written to {stem}.txt")
+
+
+def profile_stage(name, top_n=TOP_N):
+    """Profile the code in a ``with`` block when profiling is enabled.
+
+    Writes <name>.prof, <name>.collapsed and a top-N <name>.txt summary to the
+    profile directory. When profiling is off this is a no-op context manager.
+    """
+    if _profile_dir is None:
+        return nullcontext()
+    return _profile(name, top_n)
@@ -0,0 +1,72 @@
+import time
+import hashlib
+from collections import Counter, OrderedDict
+
+
+class CachedResponse:
+    def __init__(self, body, tags, expires):
+        self.body = body
+        self.tags = frozenset(tags)
+        self.expires = expires
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+class ResponseCache:
+    """LRU cache of encoded response bodies with a time-to-live.
+
+    Each entry is tagged with the collections it was built from, so an
+    import of one collection only drops the responses that depend on it.
+    Every invalidation bumps its tags' generation; a response built before
+    an invalidation of its tags is returned but not stored.
+    Not thread-safe: it is meant to be used from a single event loop.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.generations = Counter()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry.expires < time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def generation(self, tags):
+        """A token that changes whenever any of the tags is invalidated."""
+        return tuple(self.generations[tag] for tag in tags)
+
+    def put(self, key, body, tags=(), generation=None):
+        """Store a response built when the tags were at ``generation``.
+
+        Returns the entry, which is not stored if the tags have been
+        invalidated since then.
+        """
+        entry = CachedResponse(body, tags, time.monotonic() + self.ttl)
+        if generation is not None and generation != self.generation(tags):
+            return entry
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, *tags):
+        """Drop every entry built from any of the given collections."""
+        tags = set(tags)
+        self.generations.update(tags)
+        stale = [key for key, entry in self.entries.items() if entry.tags & tags]
+        for key in stale:
+            del self.entries[key]
+        return len(stale)
+
+    def clear(self):
+        self.entries.clear()
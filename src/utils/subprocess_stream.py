@@ -0,0 +1,125 @@
+import sys
+import time
+import asyncio
+import logging
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Longest line kept from a child process; longer lines are dropped
+LINE_LIMIT = 64 * 1024
+RSS_POLL_INTERVAL = 0.5
+
+
+class StageResult:
+    def __init__(self, name, returncode, elapsed, peak_rss_kb, stderr_tail):
+        self.name = name
+        self.returncode = returncode
+        self.elapsed = elapsed
+        self.peak_rss_kb = peak_rss_kb
+        self.stderr_tail = stderr_tail
+
+    @property
+    def peak_rss_mb(self):
+        return None if self.peak_rss_kb is None else self.peak_rss_kb / 1024
+
+    def summary(self):
+        rss = "n/a" if self.peak_rss_kb is None else f"{self.peak_rss_mb:.1f} MB"
+        return f"{self.name}: exit {self.returncode}, {self.elapsed:.2f}s, peak RSS {rss}"
+
+
+def read_peak_rss_kb(pid):
+    """Peak resident set size of a running process from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+async def _watch_rss(pid, peak):
+    while True:
+        rss = read_peak_rss_kb(pid)
+        if rss is not None:
+            peak[0] = max(peak[0] or 0, rss)
+        await asyncio.sleep(RSS_POLL_INTERVAL)
+
+
+async def _pump(stream, emit, tail):
+    while True:
+        try:
+            line = await stream.readline()
+        except ValueError:
+            # Line longer than LINE_LIMIT; asyncio has already discarded it
+            emit("[output line too long, skipped]")
+            continue
+        if not line:
+            return
+        text = line.decode(errors="replace").rstrip()
+        emit(text)
+        if tail is not None:
+            tail.append(text)
+
+
+async def run_streaming(
+    args,
+    name=None,
+    log=None,
+    stdout_level=logging.INFO,
+    stderr_level=logging.INFO,
+    tail_lines=50,
+    **kwargs,
+):
+    """Run a command, streaming its output line by line into a logger.
+
+    Output is never accumulated: each line is logged as it arrives and only
+    the last ``tail_lines`` lines of stderr are kept for error reports.
+    Returns a StageResult with exit code, wall-clock time and peak RSS.
+    """
+    log = log or logger
+    name = name or str(args[0])
+    start = time.perf_counter()
+
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=LINE_LIMIT,
+        **kwargs,
+    )
+
+    def emitter(level):
+        return lambda text: log.log(level, "[%s] %s", name, text)
+
+    stderr_tail = deque(maxlen=tail_lines)
+    peak = [None]
+    watcher = asyncio.ensure_future(_watch_rss(process.pid, peak))
+    try:
+        await asyncio.gather(
+            _pump(process.stdout, emitter(stdout_level), None),
+            _pump(process.stderr, emitter(stderr_level), stderr_tail),
+        )
+        returncode = await process.wait()
+    finally:
+        watcher.cancel()
+        if process.returncode is None:
+            process.kill()
+
+    peak_rss_kb = peak[0]
+    if peak_rss_kb is None and resource is not None:
+        # No /proc: fall back to the largest child this process has waited on
+        peak_rss_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        if sys.platform == "darwin":
+            peak_rss_kb //= 1024
+
+    return StageResult(
+        name, returncode, time.perf_counter() - start, peak_rss_kb, list(stderr_tail)
+    )
@@ -0,0 +1,280 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from src.utils.metrics import CIRCUIT_OPENS_TOTAL, THROTTLE_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean the site wants us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+def host_of(url):
+    """The host part of a URL, or the value itself when it is not a URL."""
+    return urlsplit(url).netloc or url
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        until = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (until - now).total_seconds())
+
+
+class HostState:
+    def __init__(self, delay):
+        self.delay = delay
+        self.next_at = 0.0
+        self.blocked_until = 0.0
+        self.baseline = None
+        self.latency = None
+        self.outcomes = deque()
+        self.failures = 0
+        self.circuit = CIRCUIT_CLOSED
+        self.cooldown = 0.0
+        self.probing = False
+
+    @property
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class AdaptiveThrottle:
+    """Per-host request pacing that adapts to how the site is coping.
+
+    Each host has a delay between requests, adjusted AIMD-style on the
+    request rate: every healthy response adds ``increase`` requests per
+    second, while a failure, a 429/503 or a response much slower than
+    usual (``latency_factor`` times the fastest smoothed latency seen)
+    multiplies the rate by ``decrease``. A Retry-After header holds the
+    host back for as long as it asks.
+
+    After ``failure_threshold`` consecutive failures, or an error rate of
+    ``error_rate_threshold`` over the last ``window`` requests, the host's
+    circuit opens and nothing is sent for ``cooldown`` seconds. Then one
+    probe request goes through: success closes the circuit, failure opens
+    it again for twice as long, up to ``max_cooldown``.
+
+    Thread-safe, so one instance can pace both threads and coroutines.
+    """
+
+    def __init__(
+        self,
+        initial_delay=1.0,
+        min_delay=0.25,
+        max_delay=60.0,
+        increase=0.1,
+        decrease=0.5,
+        latency_factor=2.0,
+        failure_threshold=5,
+        error_rate_threshold=0.5,
+        window=20,
+        cooldown=30.0,
+        max_cooldown=600.0,
+        name="throttle",
+        clock=time.monotonic,
+    ):
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.window = window
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.name = name
+        self.clock = clock
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostState(self.initial_delay)
+        return state
+
+    def reserve(self, host):
+        """Claim the next request slot for a host.
+
+        Returns how many seconds the caller must wait before sending it.
+        """
+        with self.lock:
+            state = self._state(host)
+            now = self.clock()
+            start = max(now, state.next_at, state.blocked_until)
+            if state.circuit == CIRCUIT_OPEN:
+                # The first request after the cooldown is the probe
+                state.circuit = CIRCUIT_HALF_OPEN
+                state.probing = True
+                logger.info(f"{self.name}: probing {host} after the cooldown")
+            state.next_at = start + state.delay
+            return start - now
+
+    def wait(self, host):
+        """Block until a request to host may be sent."""
+        delay = self.reserve(host)
+        THROTTLE_WAIT_SECONDS.observe(delay, throttle=self.name)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire(self, host):
+        """Wait, without blocking the event loop, until host may be sent to."""
+        delay = self.reserve(host)
+        THROTTLE_WAIT_SECONDS.observe(delay, throttle=self.name)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record(self, host, latency, ok=True, status=None, retry_after=None):
+        """Feed back the outcome of a request.
+
+        ``ok`` is False for errors; a 429 or 503 ``status`` counts as an
+        error whatever ``ok`` says. ``retry_after`` is the Retry-After
+        header value or a number of seconds.
+        """
+        if status in THROTTLE_STATUSES:
+            ok = False
+        if isinstance(retry_after, str):
+            retry_after = parse_retry_after(retry_after)
+
+        with self.lock:
+            state = self._state(host)
+            now = self.clock()
+            if latency is not None:
+                state.latency = (
+                    latency
+                    if state.latency is None
+                    else 0.7 * state.latency + 0.3 * latency
+                )
+                if state.baseline is None or state.latency < state.baseline:
+                    state.baseline = state.latency
+
+            state.outcomes.append(ok)
+            while len(state.outcomes) > self.window:
+                state.outcomes.popleft()
+
+            slow = (
+                latency is not None
+                and state.baseline
+                and state.latency > state.baseline * self.latency_factor
+            )
+            rate = 1.0 / state.delay
+            if ok and not slow:
+                rate += self.increase
+            else:
+                rate *= self.decrease
+            state.delay = min(self.max_delay, max(self.min_delay, 1.0 / rate))
+            if not ok:
+                # Back off from now, not from when the failed request started
+                state.next_at = max(state.next_at, now + state.delay)
+
+            if retry_after:
+                retry_after = min(retry_after, self.max_cooldown)
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+                logger.warning(
+                    f"{self.name}: {host} asked us to wait {retry_after:.0f}s"
+                )
+
+            if ok:
+                state.failures = 0
+                if state.circuit != CIRCUIT_CLOSED:
+                    logger.info(f"{self.name}: {host} recovered, circuit closed")
+                state.circuit = CIRCUIT_CLOSED
+                state.probing = False
+                state.cooldown = 0.0
+                return
+
+            state.failures += 1
+            tripped = state.failures >= self.failure_threshold or (
+                len(state.outcomes) >= self.window / 2
+                and state.error_rate >= self.error_rate_threshold
+            )
+            if state.probing or (state.circuit == CIRCUIT_CLOSED and tripped):
+                self._open(host, state, now)
+
+    def _open(self, host, state, now):
+        state.cooldown = min(
+            self.max_cooldown,
+            state.cooldown * 2 if state.cooldown else self.base_cooldown,
+        )
+        state.circuit = CIRCUIT_OPEN
+        state.probing = False
+        state.blocked_until = max(state.blocked_until, now + state.cooldown)
+        state.outcomes.clear()
+        CIRCUIT_OPENS_TOTAL.inc(throttle=self.name)
+        logger.warning(
+            f"{self.name}: circuit open for {host} after {state.failures} "
+            f"failures, pausing {state.cooldown:.0f}s"
+        )
+
+    def dump(self):
+        """Per-host delay, cooldown and hold-off, for restore in another process.
+
+        Hold-offs are stored as wall-clock times, since the clock is only
+        meaningful inside this process.
+        """
+        with self.lock:
+            now, wall = self.clock(), time.time()
+            return {
+                host: {
+                    "delay": state.delay,
+                    "circuit": state.circuit,
+                    "cooldown": state.cooldown,
+                    "blocked_until": wall
+                    + max(0.0, max(state.blocked_until, state.next_at) - now),
+                }
+                for host, state in self.hosts.items()
+            }
+
+    def restore(self, hosts):
+        """Carry on from the state another throttle dumped.
+
+        A circuit that was not closed comes back open, so the first request
+        after its hold-off is a probe.
+        """
+        with self.lock:
+            now, wall = self.clock(), time.time()
+            for host, saved in hosts.items():
+                state = self._state(host)
+                state.delay = min(self.max_delay, max(self.min_delay, saved["delay"]))
+                state.cooldown = saved.get("cooldown", 0.0)
+                state.blocked_until = now + max(0.0, saved["blocked_until"] - wall)
+                if saved.get("circuit", CIRCUIT_CLOSED) != CIRCUIT_CLOSED:
+                    state.circuit = CIRCUIT_OPEN
+
+    def snapshot(self):
+        """Current delay, latency, error rate and circuit state per host."""
+        with self.lock:
+            return {
+                host: {
+                    "delay": round(state.delay, 3),
+                    "latency": state.latency,
+                    "error_rate": round(state.error_rate, 3),
+                    "circuit": state.circuit,
+                }
+                for host, state in self.hosts.items()
+            }
@@ -0,0 +1,180 @@
+import uuid
+import logging
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from src.utils.mongo_client import get_client
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_DEAD = "dead"
+
+
+def utc_now():
+    """Lease times are compared across workers, so they are always UTC."""
+    return datetime.now(timezone.utc)
+
+
+class WorkQueue:
+    """Crawl work queue in a MongoDB collection with lease semantics.
+
+    Items are claimed atomically with ``find_one_and_update``. A claimed item
+    is leased to one worker until ``available_at``; if the worker crashes
+    and never acks, the lease expires and another worker picks it up.
+    Queued and leased items share one rule: claimable when ``available_at``
+    is in the past.
+    """
+
+    def __init__(
+        self,
+        connection_string=None,
+        database_name="qut_courses",
+        collection_name="work_queue",
+        visibility_timeout=600,
+        max_attempts=5,
+        client=None,
+    ):
+        self.client = client or get_client(connection_string)
+        self.collection = self.client[database_name][collection_name]
+        self.visibility_timeout = timedelta(seconds=visibility_timeout)
+        self.max_attempts = max_attempts
+
+        self.collection.create_index([("kind", 1), ("key", 1)], unique=True)
+        self.collection.create_index([("status", 1), ("available_at", 1)])
+
+    def enqueue(self, kind, items, requeue=False):
+        """Add items given as (key, payload) pairs.
+
+        Items already in the queue are left alone unless ``requeue`` is set,
+        in which case finished and dead items are queued again.
+        """
+        now = utc_now()
+        operations = []
+        for key, payload in items:
+            fresh = {
+                "status": STATUS_QUEUED,
+                "attempts": 0,
+                "available_at": now,
+                "enqueued_at": now,
+            }
+            if requeue:
+                operations.append(
+                    UpdateOne(
+                        {"kind": kind, "key": key, "status": {"$ne": STATUS_LEASED}},
+                        {"$set": {**fresh, "payload": payload}, "$unset": {"error": ""}},
+                        upsert=True,
+                    )
+                )
+            else:
+                operations.append(
+                    UpdateOne(
+                        {"kind": kind, "key": key},
+                        {"$setOnInsert": {**fresh, "payload": payload}},
+                        upsert=True,
+                    )
+                )
+        if not operations:
+            return 0
+        # A requeue of a leased item hits the unique index; that item stays as is
+        try:
+            result = self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            return e.details.get("nUpserted", 0) + e.details.get("nModified", 0)
+        return result.upserted_count + result.modified_count
+
+    def claim(self, worker_id, kinds=None):
+        """Lease the next available item to a worker, or return None."""
+        while True:
+            now = utc_now()
+            query = {
+                "status": {"$in": [STATUS_QUEUED, STATUS_LEASED]},
+                "available_at": {"$lte": now},
+            }
+            if kinds:
+                query["kind"] = {"$in": list(kinds)}
+
+            item = self.collection.find_one_and_update(
+                query,
+                {
+                    "$set": {
+                        "status": STATUS_LEASED,
+                        "worker": worker_id,
+                        "lease_id": uuid.uuid4().hex,
+                        "leased_at": now,
+                        "available_at": now + self.visibility_timeout,
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("available_at", 1)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if item is None or item["attempts"] <= self.max_attempts:
+                return item
+
+            # Crashed too many times while leased, give up on it
+            self._finish(item, STATUS_DEAD, error="lease expired too many times")
+
+    def extend(self, item):
+        """Push the lease out again; returns False if the lease was lost."""
+        result = self.collection.update_one(
+            {"_id": item["_id"], "lease_id": item["lease_id"]},
+            {"$set": {"available_at": utc_now() + self.visibility_timeout}},
+        )
+        return result.modified_count == 1
+
+    def ack(self, item, result=None):
+        return self._finish(item, STATUS_DONE, result=result)
+
+    def fail(self, item, error, retry_delay=30):
+        """Release a failed item for a retry with backoff, or mark it dead."""
+        if item["attempts"] >= self.max_attempts:
+            return self._finish(item, STATUS_DEAD, error=error)
+
+        delay = retry_delay * (2 ** (item["attempts"] - 1))
+        result = self.collection.update_one(
+            {"_id": item["_id"], "lease_id": item["lease_id"]},
+            {
+                "$set": {
+                    "status": STATUS_QUEUED,
+                    "error": error,
+                    "available_at": utc_now() + timedelta(seconds=delay),
+                },
+                "$unset": {"worker": "", "lease_id": ""},
+            },
+        )
+        return result.modified_count == 1
+
+    def _finish(self, item, status, **fields):
+        update = {"status": status, "finished_at": utc_now()}
+        update.update({k: v for k, v in fields.items() if v is not None})
+        result = self.collection.update_one(
+            {"_id": item["_id"], "lease_id": item["lease_id"]},
+            {"$set": update, "$unset": {"lease_id": ""}},
+        )
+        if result.modified_count != 1:
+            logger.warning(
+                f"Lease on {item['kind']} {item['key']} was lost before it finished"
+            )
+        return result.modified_count == 1
+
+    def counts(self):
+        counts = {}
+        group = {"_id": {"kind": "$kind", "status": "$status"}, "n": {"$sum": 1}}
+        for row in self.collection.aggregate([{"$group": group}]):
+            counts.setdefault(row["_id"]["kind"], {})[row["_id"]["status"]] = row["n"]
+        return counts
+
+    def pending(self, kinds=None):
+        """Number of items that are queued or leased."""
+        query = {"status": {"$in": [STATUS_QUEUED, STATUS_LEASED]}}
+        if kinds:
+            query["kind"] = {"$in": list(kinds)}
+        return self.collection.count_documents(query)
+
+    def close(self):
+        # The client is shared by the whole process and closed at exit
+        self.client = self.collection = None
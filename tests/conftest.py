@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The modules import each other as src.*, occupations.* and Job_Board.*
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
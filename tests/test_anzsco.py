@@ -0,0 +1,80 @@
+import pytest
+
+from occupations.anzsco import AnzscoIndex, hierarchy_fields, level_of
+
+OCCUPATIONS = [
+    {"code": "261311", "title": "Analyst Programmer"},
+    {"code": "261312", "title": "Developer Programmer"},
+    {"code": "261313", "title": "Software Engineer"},
+    {"code": "2613", "title": "Software and Applications Programmers"},
+    {"code": "263111", "title": "Computer Network and Systems Engineer"},
+    {"code": "254499", "title": "Registered Nurses nec"},
+    {"code": "not-a-code", "title": "Ignored"},
+]
+
+
+@pytest.fixture
+def index():
+    return AnzscoIndex.from_occupations(OCCUPATIONS)
+
+
+def test_levels():
+    assert level_of("2") == "major_group"
+    assert level_of("2613") == "unit_group"
+    assert level_of("261313") == "occupation"
+    assert level_of("26131") is None
+    assert level_of("ABC") is None
+    assert hierarchy_fields("261313") == {
+        "level": "occupation",
+        "major_group": "2",
+        "sub_major_group": "26",
+        "minor_group": "261",
+        "unit_group": "2613",
+    }
+
+
+def test_groups_are_added_from_prefixes(index):
+    assert "not-a-code" not in index
+    assert "261" in index
+    assert index.node("261") == {"code": "261", "title": None, "level": "minor_group"}
+    assert index.node("2613")["title"] == "Software and Applications Programmers"
+
+
+def test_range_is_the_whole_subtree(index):
+    assert index.range("2613") == ["2613", "261311", "261312", "261313"]
+    assert index.range("26") == [
+        "26",
+        "261",
+        "2613",
+        "261311",
+        "261312",
+        "261313",
+        "263",
+        "2631",
+        "263111",
+    ]
+    # A prefix is not a neighbouring code: 2631 is not under 263111
+    assert index.range("263111") == ["263111"]
+    assert index.range("3") == []
+
+
+def test_descendants_and_counts(index):
+    assert [o["code"] for o in index.occupations_under("26")] == [
+        "261311",
+        "261312",
+        "261313",
+        "263111",
+    ]
+    assert [d["code"] for d in index.descendants("261", level="unit_group")] == ["2613"]
+    assert index.count("2") == 5
+    assert index.count("261313") == 1
+    assert index.rollup() == {"2": 5}
+    assert index.rollup("sub_major_group") == {"25": 1, "26": 4}
+
+
+def test_save_and_load(index, tmp_path):
+    path = tmp_path / "anzsco_index.json"
+    index.save(path)
+    loaded = AnzscoIndex.load(path)
+    assert loaded.codes == index.codes
+    assert loaded.titles == index.titles
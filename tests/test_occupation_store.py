@@ -0,0 +1,77 @@
+import pytest
+
+from occupations.occupation_store import OccupationStore
+
+SOURCE = "Skilled Occupation List"
+ENGINEER = {"code": "261313", "title": "Software Engineer"}
+NURSE = {"code": "254499", "title": "Registered Nurses nec"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OccupationStore(tmp_path / "occupations.db")
+    yield store
+    store.close()
+
+
+def test_first_scrape_adds_everything(store):
+    counts = store.record(SOURCE, [ENGINEER, NURSE], seen_at="2025-05-01T00:00:00")
+    assert counts == {"added": 2, "changed": 0, "unchanged": 0, "stale": 0}
+    assert store.sources()[SOURCE]["count"] == 2
+
+
+def test_volatile_fields_do_not_count_as_changes(store):
+    store.record(
+        SOURCE,
+        [{**ENGINEER, "date_scraped": "2025-05-01"}],
+        seen_at="2025-05-01T00:00:00",
+    )
+    counts = store.record(
+        SOURCE,
+        [{**ENGINEER, "date_scraped": "2025-05-08"}],
+        seen_at="2025-05-08T00:00:00",
+    )
+    assert counts == {"added": 0, "changed": 0, "unchanged": 1, "stale": 0}
+    assert list(store.changed_since("2025-05-08T00:00:00")) == []
+
+
+def test_changed_and_stale_occupations(store):
+    store.record(SOURCE, [ENGINEER, NURSE], seen_at="2025-05-01T00:00:00")
+    counts = store.record(
+        SOURCE,
+        [{**ENGINEER, "caveat": "Not for regional visas"}],
+        seen_at="2025-05-08T00:00:00",
+    )
+    assert counts == {"added": 0, "changed": 1, "unchanged": 0, "stale": 1}
+    assert store.stale() == [(SOURCE, "254499", "2025-05-08T00:00:00")]
+
+    changed = {o["code"]: o for o in store.changed_since("2025-05-08T00:00:00")}
+    assert set(changed) == {"261313", "254499"}
+    assert changed["261313"]["caveat"] == "Not for regional visas"
+    assert changed["261313"]["first_seen"] == "2025-05-01T00:00:00"
+    assert changed["261313"]["source_name"] == SOURCE
+    assert changed["254499"]["stale"] is True
+    assert changed["261313"]["stale"] is False
+
+
+def test_stale_occupation_comes_back(store):
+    store.record(SOURCE, [NURSE], seen_at="2025-05-01T00:00:00")
+    store.record(SOURCE, [], seen_at="2025-05-08T00:00:00")
+    assert len(store.stale(SOURCE)) == 1
+
+    counts = store.record(SOURCE, [NURSE], seen_at="2025-05-15T00:00:00")
+    assert counts["changed"] == 1
+    assert store.stale() == []
+
+
+def test_partial_scrape_marks_nothing_stale(store):
+    store.record(SOURCE, [NURSE], seen_at="2025-05-01T00:00:00")
+    store.upsert(SOURCE, [ENGINEER], seen_at="2025-05-08T00:00:00")
+    assert store.stale() == []
+
+
+def test_meta(store):
+    assert store.get_meta("last_import") is None
+    store.set_meta("last_import", "2025-05-01T00:00:00")
+    store.set_meta("last_import", "2025-05-08T00:00:00")
+    assert store.get_meta("last_import") == "2025-05-08T00:00:00"
@@ -0,0 +1,81 @@
+from src.course_processor.sitemap import reconcile
+from src.course_processor.url_resolver import COURSES_BASE_URL
+
+
+def page(slug, lastmod="2025-05-01"):
+    return COURSES_BASE_URL + slug, lastmod
+
+
+def course(code, title):
+    return {"courseCode": code, "course_title": title}
+
+
+BUSINESS = [
+    course("BS05", "Bachelor of Business"),
+    course("BS06", "Bachelor of Business"),
+]
+
+
+def codes(courses):
+    return [c["courseCode"] for c in courses]
+
+
+def test_exact_slugs_match():
+    matched, unmatched, unlisted = reconcile(
+        [course("IN01", "Bachelor of Information Technology")],
+        [page("bachelor-of-information-technology"), page("master-of-laws")],
+    )
+    assert matched == {
+        "IN01": {
+            "url": COURSES_BASE_URL + "bachelor-of-information-technology",
+            "lastmod": "2025-05-01",
+        }
+    }
+    assert unmatched == []
+    assert [p["url"] for p in unlisted] == [COURSES_BASE_URL + "master-of-laws"]
+
+
+def test_courses_sharing_a_page_are_not_guessed():
+    matched, unmatched, unlisted = reconcile(BUSINESS, [page("bachelor-of-business")])
+    assert matched == {}
+    assert codes(unmatched) == ["BS05", "BS06"]
+    assert len(unlisted) == 1
+
+
+def test_verify_settles_courses_sharing_a_page():
+    checked = []
+
+    def verify(url, course_code):
+        checked.append(course_code)
+        return course_code == "BS06"
+
+    matched, unmatched, unlisted = reconcile(
+        BUSINESS, [page("bachelor-of-business")], verify=verify
+    )
+    assert list(matched) == ["BS06"]
+    assert codes(unmatched) == ["BS05"]
+    assert unlisted == []
+    assert checked == ["BS05", "BS06"]
+
+
+def test_title_matching_several_pages_needs_verify():
+    # No slug of this title exists, but two pages have the same title words
+    courses = [course("BS99", "Business, Bachelor of")]
+    pages = [page("bachelor-of-business"), page("business-bachelor")]
+
+    matched, unmatched, _ = reconcile(courses, pages)
+    assert matched == {}
+    assert codes(unmatched) == ["BS99"]
+
+    matched, unmatched, unlisted = reconcile(
+        courses, pages, verify=lambda url, code: url.endswith("business-bachelor")
+    )
+    assert matched["BS99"]["url"] == COURSES_BASE_URL + "business-bachelor"
+    assert [p["url"] for p in unlisted] == [COURSES_BASE_URL + "bachelor-of-business"]
+
+
+def test_exact_matches_win_over_same_words():
+    courses = [course("BS98", "Business Bachelor"), BUSINESS[0]]
+    matched, unmatched, _ = reconcile(courses, [page("bachelor-of-business")])
+    assert list(matched) == ["BS05"]
+    assert codes(unmatched) == ["BS98"]
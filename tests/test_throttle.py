@@ -0,0 +1,116 @@
+import pytest
+
+from src.utils.throttle import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    AdaptiveThrottle,
+)
+
+HOST = "www.qut.edu.au"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def circuit(throttle):
+    return throttle.snapshot()[HOST]["circuit"]
+
+
+def test_circuit_opens_probes_and_closes(clock):
+    throttle = AdaptiveThrottle(failure_threshold=3, cooldown=30, clock=clock)
+    for _ in range(3):
+        throttle.reserve(HOST)
+        throttle.record(HOST, 0.1, ok=False)
+    assert circuit(throttle) == CIRCUIT_OPEN
+
+    # Nothing goes out until the cooldown is over, then one probe
+    assert throttle.reserve(HOST) == pytest.approx(30)
+    assert circuit(throttle) == CIRCUIT_HALF_OPEN
+
+    clock.now += 30
+    throttle.record(HOST, 0.1, ok=True)
+    assert circuit(throttle) == CIRCUIT_CLOSED
+
+
+def test_failed_probe_doubles_the_cooldown(clock):
+    throttle = AdaptiveThrottle(failure_threshold=1, cooldown=30, clock=clock)
+    throttle.record(HOST, 0.1, ok=False)
+    clock.now += throttle.reserve(HOST)
+
+    throttle.record(HOST, 0.1, ok=False)
+    assert circuit(throttle) == CIRCUIT_OPEN
+    assert throttle.reserve(HOST) == pytest.approx(60)
+
+
+def test_error_rate_opens_the_circuit(clock):
+    throttle = AdaptiveThrottle(
+        failure_threshold=5, error_rate_threshold=0.5, window=10, clock=clock
+    )
+    # Never two failures in a row, but three in five requests
+    for ok in (False, True, False, True):
+        throttle.record(HOST, 0.1, ok=ok)
+    assert circuit(throttle) == CIRCUIT_CLOSED
+    throttle.record(HOST, 0.1, ok=False)
+    assert circuit(throttle) == CIRCUIT_OPEN
+
+
+def test_rate_grows_additively_and_shrinks_multiplicatively(clock):
+    throttle = AdaptiveThrottle(
+        initial_delay=1.0, min_delay=0.1, increase=0.5, decrease=0.5, clock=clock
+    )
+    throttle.record(HOST, 0.1, ok=True)
+    throttle.record(HOST, 0.1, ok=True)
+    assert throttle.hosts[HOST].delay == pytest.approx(1 / 2.0)
+
+    throttle.record(HOST, 0.1, ok=False)
+    assert throttle.hosts[HOST].delay == pytest.approx(1 / 1.0)
+
+    for _ in range(50):
+        throttle.record(HOST, 0.1, ok=True)
+    assert throttle.hosts[HOST].delay == pytest.approx(0.1)
+
+
+def test_slow_responses_back_off(clock):
+    throttle = AdaptiveThrottle(initial_delay=1.0, decrease=0.5, clock=clock)
+    throttle.record(HOST, 0.1, ok=True)
+    delay = throttle.hosts[HOST].delay
+
+    throttle.record(HOST, 2.0, ok=True)
+    assert throttle.hosts[HOST].delay == pytest.approx(delay * 2)
+
+
+def test_requests_are_spaced_by_the_delay(clock):
+    throttle = AdaptiveThrottle(initial_delay=1.0, clock=clock)
+    assert throttle.reserve(HOST) == 0
+    assert throttle.reserve(HOST) == pytest.approx(1.0)
+    assert throttle.reserve(HOST) == pytest.approx(2.0)
+    assert throttle.reserve("other.example.com") == 0
+
+
+def test_retry_after_holds_the_host_back(clock):
+    throttle = AdaptiveThrottle(initial_delay=1.0, clock=clock)
+    throttle.record(HOST, 0.1, status=429, retry_after="10")
+    assert throttle.reserve(HOST) == pytest.approx(10)
+    assert throttle.hosts[HOST].outcomes[-1] is False
+
+
+def test_restore_carries_the_hold_off_and_open_circuit(clock):
+    throttle = AdaptiveThrottle(failure_threshold=1, cooldown=30, clock=clock)
+    throttle.record(HOST, 0.1, ok=False)
+
+    restored = AdaptiveThrottle(clock=FakeClock())
+    restored.restore(throttle.dump())
+    assert restored.hosts[HOST].circuit == CIRCUIT_OPEN
+    assert restored.reserve(HOST) == pytest.approx(30, abs=1)
+    assert restored.hosts[HOST].circuit == CIRCUIT_HALF_OPEN